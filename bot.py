@@ -1,19 +1,28 @@
 # bot.py
 import os
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import random
+from typing import Dict, Tuple
+
+from utils.startup import TIMELINE, WARMUPS, import_dependencies   # first, so the timeline starts at launch
 
 import discord
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
+from utils.tree_sync import sync_tree
+
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env")
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 if not TOKEN:
     raise SystemExit("DISCORD_TOKEN missing in .env")
+DEV_GUILD_ID = int(os.getenv("DEV_GUILD_ID") or 0) or None   # sync commands to this guild only (instant)
+FORCE_SYNC = os.getenv("FORCE_SYNC", "").lower() in ("1", "true", "yes")
 
 intents = discord.Intents.default()
 intents.members = True
@@ -37,14 +46,30 @@ COGS = [
     "cogs.guess_the_song",  
     "cogs.radio",
     "cogs.blackjack",
+    "cogs.leaderboard",
 ]
 
+# extension -> extensions that must finish loading before it; everything else loads concurrently
+COG_DEPENDS: Dict[str, Tuple[str, ...]] = {}
+
+# dependency imports run here, off the event loop; one thread so imports never race each other
+IMPORTER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import")
+
+_tree_synced = False
+
 @bot.event
 async def on_ready():
-    try:
-        await bot.tree.sync()
-    except Exception:
-        pass
+    # on_ready fires again after gateway reconnects; the tree only needs checking once per process
+    global _tree_synced
+    if not _tree_synced:
+        TIMELINE.mark("gateway ready")
+        try:
+            print(await sync_tree(bot.tree, bot.application_id or bot.user.id, DEV_GUILD_ID, FORCE_SYNC))
+            _tree_synced = True
+        except Exception as e:
+            print(f"Command sync failed: {e}")
+        TIMELINE.mark("commands checked")
+        print("Startup timeline:\n" + TIMELINE.report(WARMUPS))
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
     if not rotate_presence.is_running():
         rotate_presence.start()
@@ -71,15 +96,32 @@ async def rotate_presence():
     except Exception:
         pass
 
+async def load_cog(ext: str, loaded: Dict[str, asyncio.Event]):
+    for dep in COG_DEPENDS.get(ext, ()):
+        await loaded[dep].wait()
+    try:
+        # timed inside the thread: waiting behind another extension's imports doesn't count
+        seconds = await asyncio.get_running_loop().run_in_executor(IMPORTER, import_dependencies, ext)
+        TIMELINE.record(ext, "import", seconds)
+        t = time.perf_counter()
+        await bot.load_extension(ext)
+        TIMELINE.record(ext, "load", time.perf_counter() - t)
+        print(f"Loaded {ext}")
+    except Exception as e:
+        print(f"Error loading {ext}: {e}")
+    finally:
+        loaded[ext].set()
+
 async def load_cogs():
-    for ext in COGS:
-        try:
-            await bot.load_extension(ext)
-            print(f"Loaded {ext}")
-        except Exception as e:
-            print(f"Error loading {ext}: {e}")
+    loaded = {ext: asyncio.Event() for ext in COGS}
+    await asyncio.gather(*(load_cog(ext, loaded) for ext in COGS))
+    TIMELINE.mark("extensions loaded")
+
+def _warmup_done(job):
+    print(f"[startup] warm-up {job.describe()} (+{(time.perf_counter() - TIMELINE.t0) * 1000:.0f}ms)")
 
 async def main():
+    WARMUPS.on_done = _warmup_done
     async with bot:
         await load_cogs()
         await bot.start(TOKEN)
@@ -1,183 +1,267 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
 import discord
 from discord.ext import commands
 from discord import app_commands
 from utils.common import DATA_DIR, make_embed
+from utils.blackjack_engine import Table, Hand, Shoe, card_label, MAX_SEATS
+from utils import blackjack_odds
+from utils.stats import STATS
+
+DEFAULT_DECKS = 6
+PENETRATION = 0.75  # cut card position
+
+TABLE_IDLE_TTL = 3600.0  # seconds without a round before a channel's shoe is dropped
+
+# One table (shoe + seats) per channel, shared by everyone playing there,
+# kept in LRU order so idle ones are at the front.
+TABLES: "OrderedDict[int, Table]" = OrderedDict()
+ACTIVE_ROUNDS: Dict[int, "Blackjack"] = {}
+
+def evict_idle_tables(now: Optional[float] = None) -> int:
+    cutoff = (time.monotonic() if now is None else now) - TABLE_IDLE_TTL
+    dropped = 0
+    while TABLES:
+        channel_id, table = next(iter(TABLES.items()))
+        if table.used > cutoff or channel_id in ACTIVE_ROUNDS:
+            break
+        del TABLES[channel_id]
+        dropped += 1
+    return dropped
+
+def get_table(channel_id: int, decks: Optional[int] = None) -> Table:
+    evict_idle_tables()
+    table = TABLES.get(channel_id)
+    if table is None or (decks and table.shoe.decks != decks and not table.in_round):
+        table = TABLES[channel_id] = Table(decks or DEFAULT_DECKS, PENETRATION)
+    TABLES.move_to_end(channel_id)
+    return table
 
 class Blackjack(discord.ui.View):
-    def __init__(self, inter: discord.Interaction):
+    def __init__(self, inter: discord.Interaction, table: Table):
         super().__init__(timeout=300.0)
         self.inter = inter
         self.player = inter.user
         self.dealer = "Dealer"
-        self.deck = self.create_deck()
-        self.player_hand = []
-        self.dealer_hand = []
+        self.table = table
+        self.players: Dict[int, discord.abc.User] = {inter.user.id: inter.user}
         self.game_over = False
 
         # Initial deal
-        self.player_hand.append(self.draw_card())
-        self.dealer_hand.append(self.draw_card())
-        self.player_hand.append(self.draw_card())
-        self.dealer_hand.append(self.draw_card())
+        self.table.start_round([self.player.id])
+
+    @property
+    def deck(self) -> Shoe:
+        return self.table.shoe
+
+    @property
+    def dealer_hand(self) -> Hand:
+        return self.table.dealer
+
+    @property
+    def player_hand(self) -> Hand:
+        return self.table.hands[self.player.id]
 
     async def start(self):
         initial_state = self.state_text(hide_dealer_card=True)
         em = make_embed("🎰 Blackjack Game Started!", initial_state, discord.Color.gold())
-        em.set_footer(text="Good luck! 🍀")
+        em.set_footer(text=f"Good luck! 🍀 · Others can press Join before the first move (max {MAX_SEATS}).")
         await self.inter.response.send_message(embed=em, view=self)
 
     @discord.ui.button(label="🃏 Hit", style=discord.ButtonStyle.green)
     async def hit_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.hit(interaction)
-    
+
     @discord.ui.button(label="✋ Stand", style=discord.ButtonStyle.red)
     async def stand_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.stand(interaction)
 
-    def get_card_emoji(self, card):
+    @discord.ui.button(label="➕ Join", style=discord.ButtonStyle.secondary)
+    async def join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.join(interaction)
+
+    @discord.ui.button(label="💡 Hint", style=discord.ButtonStyle.blurple)
+    async def hint_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.hint(interaction)
+
+    def get_card_emoji(self, card: int) -> str:
         """Convert card to emoji representation"""
-        rank, suit = card
-        
-        # Suit emojis
-        suit_emojis = {
-            'Hearts': '♥️',
-            'Diamonds': '♦️',
-            'Clubs': '♣️',
-            'Spades': '♠️'
-        }
-        
-        # Rank display
-        rank_display = {
-            'J': 'J',
-            'Q': 'Q', 
-            'K': 'K',
-            'A': 'A'
-        }
-        
-        display_rank = rank_display.get(rank, rank)
-        suit_emoji = suit_emojis.get(suit, suit)
-        
-        return f"`{display_rank}{suit_emoji}`"
-    
+        return card_label(card)
+
+    def _hand_status(self, value: int) -> str:
+        if value == 21:
+            return " 🎯"
+        if value > 21:
+            return " 💥"
+        return ""
+
     def state_text(self, hide_dealer_card=False):
-        player_cards = " ".join([self.get_card_emoji(card) for card in self.player_hand])
-        player_value = self.hand_value(self.player_hand)
-        
+        dealer = self.table.dealer
         if hide_dealer_card:
-            visible_card = self.get_card_emoji(self.dealer_hand[0])
+            visible_card = self.get_card_emoji(dealer.cards[0])
             dealer_cards = f"{visible_card} `🂠`"
             dealer_value = "?"
+            dealer_status = ""
         else:
-            dealer_cards = " ".join([self.get_card_emoji(card) for card in self.dealer_hand])
-            dealer_value = self.hand_value(self.dealer_hand)
-        
-        # Add value indicators with emojis
-        player_status = ""
-        if player_value == 21:
-            player_status = " 🎯"
-        elif player_value > 21:
-            player_status = " 💥"
-        
-        dealer_status = ""
-        if not hide_dealer_card:
-            if dealer_value == 21:
-                dealer_status = " 🎯"
-            elif dealer_value > 21:
-                dealer_status = " 💥"
-        
+            dealer_cards = " ".join(self.get_card_emoji(card) for card in dealer.cards)
+            dealer_value = dealer.value()
+            dealer_status = self._hand_status(dealer_value)
+
+        seats = []
+        multi = len(self.table.hands) > 1
+        for uid, hand in self.table.hands.items():
+            value = hand.value()
+            cards = " ".join(self.get_card_emoji(card) for card in hand.cards)
+            who = "Your Hand" if not multi else f"{self.players[uid].display_name}'s Hand"
+            done = " ✋" if multi and self.table.done[uid] and value <= 21 else ""
+            seats.append(f"👤 **{who}** (Value: **{value}**){self._hand_status(value)}{done}\n{cards}")
+
         return (f"🎰 **BLACKJACK** 🎰\n\n"
-                f"👤 **Your Hand** (Value: **{player_value}**){player_status}\n"
-                f"{player_cards}\n\n"
-                f"🤖 **Dealer's Hand** (Value: **{dealer_value}**){dealer_status}\n"
+                + "\n\n".join(seats) +
+                f"\n\n🤖 **Dealer's Hand** (Value: **{dealer_value}**){dealer_status}\n"
                 f"{dealer_cards}")
-    
-    
-    def create_deck(self):
-        suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        deck = [(f"{rank}", f"{suit}") for suit in suits for rank in ranks]
-        import random
-        random.shuffle(deck)
-        return deck
-    
-    def draw_card(self):
-        return self.deck.pop()
-    
-    def hand_value(self, hand):
-        value = 0
-        aces = 0
-        for card in hand:
-            rank = card[0]
-            if rank in ['J', 'Q', 'K']:
-                value += 10
-            elif rank == 'A':
-                aces += 1
-                value += 11
-            else:
-                value += int(rank)
-        while value > 21 and aces:
-            value -= 10
-            aces -= 1
-        return value
-    
-    async def stand(self, interaction: discord.Interaction):
-        while self.hand_value(self.dealer_hand) < 17:
-            self.dealer_hand.append(self.draw_card())
-        self.game_over = True
-        await self.end_game(interaction)
 
-    async def hit(self, interaction: discord.Interaction):
+    async def _guard(self, interaction: discord.Interaction) -> bool:
         if self.game_over:
             await interaction.response.send_message("🚫 Game is already over.", ephemeral=True)
-            return
-        self.player_hand.append(self.draw_card())
-        if self.hand_value(self.player_hand) > 21:
+            return False
+        if interaction.user.id not in self.table.hands:
+            await interaction.response.send_message("You're not at this table — press **Join** next round.", ephemeral=True)
+            return False
+        if self.table.done[interaction.user.id]:
+            await interaction.response.send_message("You're done this round; waiting for the others.", ephemeral=True)
+            return False
+        return True
+
+    async def _update(self, interaction: discord.Interaction):
+        if self.table.all_done():
             self.game_over = True
             await self.end_game(interaction)
-        else:
-            state = self.state_text(hide_dealer_card=True)
-            em = make_embed("🎰 Blackjack - Your Turn", state, discord.Color.gold())
-            em.set_footer(text="Choose your next move! 🤔")
-            await interaction.response.edit_message(embed=em, view=self)
-    
+            return
+        state = self.state_text(hide_dealer_card=True)
+        em = make_embed("🎰 Blackjack - Your Turn", state, discord.Color.gold())
+        em.set_footer(text="Choose your next move! 🤔")
+        await interaction.response.edit_message(embed=em, view=self)
+
+    async def join(self, interaction: discord.Interaction):
+        if not self.table.can_join(interaction.user.id):
+            msg = "You're already seated." if interaction.user.id in self.table.hands else "Joining is closed for this round."
+            await interaction.response.send_message(msg, ephemeral=True)
+            return
+        self.table.join(interaction.user.id)
+        self.players[interaction.user.id] = interaction.user
+        await self._update(interaction)
+
+    async def stand(self, interaction: discord.Interaction):
+        if not await self._guard(interaction):
+            return
+        self.table.stand(interaction.user.id)
+        await self._update(interaction)
+
+    async def hit(self, interaction: discord.Interaction):
+        if not await self._guard(interaction):
+            return
+        self.table.hit(interaction.user.id)
+        await self._update(interaction)
+
+    async def hint(self, interaction: discord.Interaction):
+        if not await self._guard(interaction):
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        hand = self.table.hands[interaction.user.id]
+        # copy the state out here: other seats can Hit (and draw from the shoe) while the thread runs
+        state = blackjack_odds.snapshot(hand, self.dealer_hand, self.deck)
+        value, unseen = hand.value(), self.deck.remaining() + 1
+        h = await asyncio.to_thread(blackjack_odds.hint, state)
+        def line(name: str, o: blackjack_odds.Odds, bust: str) -> str:
+            return (f"**{name}** — win **{o.win:.1%}** · push {o.push:.1%} · lose {o.lose:.1%}"
+                    f" · {bust} {o.bust:.1%}")
+        desc = "\n".join([
+            f"👤 Your hand: **{value}** vs dealer showing {self.get_card_emoji(self.dealer_hand.cards[0])}",
+            line("✋ Stand", h.stand, "dealer busts"),
+            line("🃏 Hit", h.hit, "you bust"),
+            f"\n💡 Best move: **{h.best}**",
+        ])
+        em = make_embed("🎰 Blackjack Hint", desc, discord.Color.blurple())
+        em.set_footer(text=("Exact odds" if h.exact else "Simulated odds") +
+                           f" over the {unseen} unseen cards · Hit assumes you keep playing well")
+        await interaction.followup.send(embed=em, ephemeral=True)
+
+    def _result_line(self, outcome: int, hand: Hand) -> str:
+        if hand.is_bust():
+            return "💥 You bust! Dealer wins."
+        if outcome > 0:
+            return "🎉 Dealer busts! You win!" if self.table.dealer.is_bust() else "🏆 You win!"
+        if outcome < 0:
+            return "😔 Dealer wins!"
+        return "🤝 It's a tie!"
+
+    def _seat_result(self, outcome: int, hand: Hand) -> str:
+        if hand.is_bust():
+            return "💥 busts"
+        if outcome > 0:
+            return "🎉 wins (dealer busts)" if self.table.dealer.is_bust() else "🏆 wins"
+        return "😔 loses" if outcome < 0 else "🤝 push"
+
     async def end_game(self, interaction: discord.Interaction):
-        player_value = self.hand_value(self.player_hand)
-        dealer_value = self.hand_value(self.dealer_hand)
-        
-        if player_value > 21:
-            result = "💥 You bust! Dealer wins."
-            color = discord.Color.red()
-            emoji = "😞"
-        elif dealer_value > 21:
-            result = "🎉 Dealer busts! You win!"
-            color = discord.Color.green()
-            emoji = "🎊"
-        elif player_value > dealer_value:
-            result = "🏆 You win!"
-            color = discord.Color.green()
-            emoji = "🎉"
-        elif player_value < dealer_value:
-            result = "😔 Dealer wins!"
-            color = discord.Color.red()
-            emoji = "💔"
+        results = self.table.finish()
+        ACTIVE_ROUNDS.pop(interaction.channel_id, None)
+        for uid, outcome in results.items():
+            STATS.record("blackjack", interaction.guild_id, uid, outcome, outcome)
+        self.stop()
+
+        if len(results) == 1:
+            outcome = results[self.player.id]
+            result = self._result_line(outcome, self.player_hand)
+            if outcome > 0:
+                color, emoji = discord.Color.green(), ("🎊" if self.table.dealer.is_bust() else "🎉")
+            elif outcome < 0:
+                color, emoji = discord.Color.red(), ("😞" if self.player_hand.is_bust() else "💔")
+            else:
+                color, emoji = discord.Color.orange(), "🤷‍♂️"
         else:
-            result = "🤝 It's a tie!"
-            color = discord.Color.orange()
-            emoji = "🤷‍♂️"
+            lines = [f"{self.players[uid].mention}: {self._seat_result(o, self.table.hands[uid])}"
+                     for uid, o in results.items()]
+            result = "\n".join(lines)
+            wins = sum(1 for o in results.values() if o > 0)
+            color, emoji = (discord.Color.green(), "🎉") if wins else (discord.Color.red(), "💔")
 
         state = self.state_text(hide_dealer_card=False)
-        final_text = f"{state}\n\n**{result}**"
+        final_text = f"{state}\n\n**{result}**" if len(results) == 1 else f"{state}\n\n{result}"
         em = make_embed(f"🎰 Game Over! {emoji}", final_text, color)
-        em.set_footer(text="Thanks for playing! 🎲")
+        left = self.table.shoe.remaining()
+        em.set_footer(text=f"Thanks for playing! 🎲 · {left} cards left in the shoe"
+                           + (" · reshuffling next round" if self.table.shoe.needs_shuffle() else ""))
         await interaction.response.edit_message(embed=em, view=None)
 
+    async def on_timeout(self):
+        self.table.in_round = False
+        if ACTIVE_ROUNDS.get(self.inter.channel_id) is self:
+            ACTIVE_ROUNDS.pop(self.inter.channel_id, None)
+
 class BlackjackCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-    @app_commands.command(name="blackjack", description="Play a game of Blackjack")
-    async def blackjack(self, inter: discord.Interaction):
-        game = Blackjack(inter)
+    @app_commands.command(name="blackjack", description="Play Blackjack; everyone in the channel shares one table and shoe")
+    @app_commands.describe(decks="Decks in this channel's shoe (1-8, default 6); applies when no round is running")
+    async def blackjack(self, inter: discord.Interaction, decks: Optional[app_commands.Range[int, 1, 8]] = None):
+        current = ACTIVE_ROUNDS.get(inter.channel_id)
+        if current is not None and not current.is_finished():
+            if current.table.can_join(inter.user.id):
+                current.table.join(inter.user.id)
+                current.players[inter.user.id] = inter.user
+                await inter.response.send_message("You joined the round in progress — use the buttons on the table message.", ephemeral=True)
+                if current.inter:
+                    em = make_embed("🎰 Blackjack - Your Turn", current.state_text(hide_dealer_card=True), discord.Color.gold())
+                    await current.inter.edit_original_response(embed=em, view=current)
+            else:
+                await inter.response.send_message("A round is already in progress in this channel.", ephemeral=True)
+            return
+        game = Blackjack(inter, get_table(inter.channel_id, decks))
+        ACTIVE_ROUNDS[inter.channel_id] = game
         await game.start()
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(BlackjackCog(bot))
\ No newline at end of file
+    await bot.add_cog(BlackjackCog(bot))
@@ -1,45 +1,55 @@
 # cogs/clone.py
 import re
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
+from utils.webhooks import WebhookCapReached, WebhookPool
+
+# one reusable webhook per channel, shared by every clone there
+WEBHOOKS = WebhookPool()
 
 class Clone(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        self.evict_webhooks.start()
+
+    async def cog_unload(self):
+        self.evict_webhooks.cancel()
+
+    @tasks.loop(minutes=10)
+    async def evict_webhooks(self):
+        await WEBHOOKS.evict_idle()
+
     @app_commands.command(name="clone", description="Clone a user's display name and send a message via webhook (requires Manage Webhooks).")
     async def clone_cmd(self, inter: discord.Interaction, target_user: discord.Member, message: str):
         try:
-            webhook = await inter.channel.create_webhook(name=target_user.display_name)
             avatar_url = target_user.display_avatar.url
-            await webhook.send(content=message, username=target_user.display_name, avatar_url=avatar_url)
-            await webhook.delete()
+            await WEBHOOKS.send(inter.channel, self.bot.user, content=message, username=target_user.display_name, avatar_url=avatar_url)
             await inter.response.send_message("Message sent via webhook.", ephemeral=True)
         except discord.Forbidden:
             await inter.response.send_message("Missing permission to manage webhooks here.", ephemeral=True)
+        except WebhookCapReached as e:
+            await inter.response.send_message(f"{e}; delete one to use /clone here.", ephemeral=True)
         except Exception as e:
             await inter.response.send_message(f"Error: {e}", ephemeral=True)
 
     @app_commands.command(name="clone-embed", description="Clone a user's display name and send an embed via webhook (requires Manage Webhooks).")
     async def clone_embed_cmd(self, inter: discord.Interaction, target_user: discord.Member, title: str, description: str = "", color: str = None):
-        webhook = None
         try:
-            webhook = await inter.channel.create_webhook(name=target_user.display_name)
             avatar_url = target_user.display_avatar.url
             color_val = int(color, 16) if color and re.match(r'^[0-9a-fA-F]{6}$', color) else 0x3498db
             embed = discord.Embed(title=title, description=description, color=color_val)
             embed.set_author(name=target_user.display_name, icon_url=avatar_url)
-            await webhook.send(embed=embed, username=target_user.display_name, avatar_url=avatar_url)
+            await WEBHOOKS.send(inter.channel, self.bot.user, embed=embed, username=target_user.display_name, avatar_url=avatar_url)
             await inter.response.send_message("Embed sent via webhook.", ephemeral=True)
         except discord.Forbidden:
             await inter.response.send_message("Missing permission to manage webhooks here.", ephemeral=True)
+        except WebhookCapReached as e:
+            await inter.response.send_message(f"{e}; delete one to use /clone-embed here.", ephemeral=True)
         except Exception as e:
             await inter.response.send_message(f"Error: {e}", ephemeral=True)
-        finally:
-            if webhook:
-                try: await webhook.delete()
-                except Exception: pass
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Clone(bot))
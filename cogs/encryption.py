@@ -1,9 +1,123 @@
 # cogs/encryption.py
-from typing import Optional
+import base64
+import hashlib
+import io
+import re
+import secrets
+import tempfile
+from collections import OrderedDict
+from typing import Dict, Optional
 import discord
 from discord.ext import commands
 from discord import app_commands
-from utils.crypto import encrypt_strong, decrypt_strong
+from utils.crypto import (
+    encrypt_strong, decrypt_strong, strong_ciphertext_len, encrypt_stream, decrypt_stream, kdf_cache_stats,
+    generate_keypair, normalize_public_key, encrypt_to_recipients, decrypt_with_private_key,
+    is_recipient_ciphertext,
+)
+from utils.common import download_attachment, load_json_state, save_json_state
+from utils.admission import KDFAdmission
+
+EMBED_DESC_MAX = 4096
+INLINE_RESULT_MAX = 1900        # longer decrypted text is returned as a file
+DEFAULT_UPLOAD_LIMIT = 10 * 1024 * 1024
+ENC_SUFFIX = ".sc"
+TEXT_FILENAME = "message.txt"
+ENCRYPT_DESC = ":lock: `{ct}`\n\n🔐 Need to read it? Click **Decrypt** and enter the seed."
+
+# Decrypt buttons carry "sc:<kind>:<ref>" in their custom_id, kind t = inline
+# ciphertext (ref = truncated SHA-256 of it), f = attached .sc file.
+# One DynamicItem handles every button, so nothing per message is kept alive
+# and buttons survive restarts.
+CIPHER_STORE_MAX = 2048
+EMBED_CIPHER_RE = re.compile(r":lock: `([A-Za-z0-9_=-]+)`")
+_CIPHER_STORE: "OrderedDict[str, str]" = OrderedDict()  # ref -> ciphertext, recent posts only
+
+def cipher_ref(ciphertext: str) -> str:
+    digest = hashlib.sha256(ciphertext.encode("ascii")).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+def _remember(ref: str, ciphertext: str):
+    _CIPHER_STORE[ref] = ciphertext
+    _CIPHER_STORE.move_to_end(ref)
+    while len(_CIPHER_STORE) > CIPHER_STORE_MAX:
+        _CIPHER_STORE.popitem(last=False)
+
+def _lookup(ref: str, message: Optional[discord.Message]) -> Optional[str]:
+    ct = _CIPHER_STORE.get(ref)
+    if ct is not None:
+        return ct
+    # after a restart (or eviction) re-read it from the embed itself
+    for emb in (message.embeds if message else []):
+        m = EMBED_CIPHER_RE.search(emb.description or "")
+        if m and cipher_ref(m.group(1)) == ref:
+            _remember(ref, m.group(1))
+            return m.group(1)
+    return None
+
+# Every scrypt run (encrypt or decrypt attempt) goes through this, so wrong-seed
+# spam is rate limited per user/guild and can't stall the event loop.
+KDF_ADMISSION = KDFAdmission()
+
+async def _run_kdf(inter: discord.Interaction, fn, *args, refund_on_success: bool = False):
+    result = await KDF_ADMISSION.submit(inter.user.id, inter.guild_id, fn, *args)
+    if refund_on_success:
+        # successful decrypts aren't spam; only failed attempts use up the budget
+        KDF_ADMISSION.refund(inter.user.id, inter.guild_id)
+    return result
+
+# Registered X25519 public keys for /encrypt-to: str(user_id) -> base64url key
+PUBKEYS_FILE = "public_keys.json"
+PUBKEYS: Dict[str, str] = load_json_state(PUBKEYS_FILE, {})
+MENTION_RE = re.compile(r"<@!?(\d+)>")
+
+def _register_key(user_id: int, public_key: str):
+    PUBKEYS[str(user_id)] = public_key
+    save_json_state(PUBKEYS_FILE, PUBKEYS)
+
+async def _decrypt_any(inter: discord.Interaction, ciphertext: str, secret: str) -> str:
+    if is_recipient_ciphertext(ciphertext):
+        # ECDH + AEAD takes microseconds; no KDF budget needed
+        return decrypt_with_private_key(ciphertext, secret)
+    return await _run_kdf(inter, decrypt_strong, ciphertext, secret, refund_on_success=True)
+
+def _upload_limit(inter: discord.Interaction) -> int:
+    return getattr(inter.guild, "filesize_limit", None) or DEFAULT_UPLOAD_LIMIT
+
+def _encrypt_file(src, passphrase: str):
+    out = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    size = encrypt_stream(src, out, passphrase)
+    out.seek(0)
+    return out, size
+
+def _decrypt_file(src, passphrase: str, max_output: int):
+    out = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        size = decrypt_stream(src, out, passphrase, max_output=max_output)
+    except Exception:
+        out.close()
+        raise
+    out.seek(0)
+    return out, size
+
+def _plain_name(filename: str) -> str:
+    return filename[:-len(ENC_SUFFIX)] if filename.endswith(ENC_SUFFIX) else filename + ".dec"
+
+async def send_decrypted_file(interaction: discord.Interaction, attachment: discord.Attachment, passphrase: str, hidden: bool = True):
+    """Decrypt an SS1 attachment off the event loop and send the result to the caller."""
+    await interaction.response.defer(ephemeral=hidden, thinking=True)
+    src = await download_attachment(attachment)
+    try:
+        out, size = await _run_kdf(interaction, _decrypt_file, src, passphrase, _upload_limit(interaction), refund_on_success=True)
+    finally:
+        src.close()
+    with out:
+        name = _plain_name(attachment.filename)
+        if name == TEXT_FILENAME and size <= INLINE_RESULT_MAX:
+            text = out.read().decode("utf-8", errors="replace")
+            await interaction.followup.send(f":unlock: **Decrypted:** {text}", ephemeral=hidden)
+        else:
+            await interaction.followup.send(":unlock: **Decrypted file:**", file=discord.File(out, filename=name), ephemeral=hidden)
 
 class DecryptModal(discord.ui.Modal, title="Decrypt Message"):
     seed: discord.ui.TextInput = discord.ui.TextInput(
@@ -13,67 +127,217 @@ class DecryptModal(discord.ui.Modal, title="Decrypt Message"):
         required=True,
         max_length=200,
     )
-    def __init__(self, ciphertext: str):
+    def __init__(self, ciphertext: Optional[str] = None, attachment: Optional[discord.Attachment] = None):
         super().__init__()
         self.ciphertext = ciphertext
+        self.attachment = attachment
+        if ciphertext and is_recipient_ciphertext(ciphertext):
+            self.seed.label = "Private Key"
+            self.seed.placeholder = "Your private key from /key-generate"
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            plaintext = decrypt_strong(self.ciphertext, self.seed.value)
-            await interaction.response.send_message(f":unlock: **Decrypted:** {plaintext}", ephemeral=True)
+            if self.attachment is not None:
+                await send_decrypted_file(interaction, self.attachment, self.seed.value)
+                return
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            plaintext = await _decrypt_any(interaction, self.ciphertext, self.seed.value)
+            await interaction.followup.send(f":unlock: **Decrypted:** {plaintext}", ephemeral=True)
         except Exception as e:
-            await interaction.response.send_message(f"Decryption failed: {e}", ephemeral=True)
+            if interaction.response.is_done():
+                await interaction.followup.send(f"Decryption failed: {e}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"Decryption failed: {e}", ephemeral=True)
 
-class DecryptView(discord.ui.View):
-    def __init__(self, ciphertext: str):
-        super().__init__(timeout=600.0)
-        self.ciphertext = ciphertext
-    @discord.ui.button(label="Decrypt", style=discord.ButtonStyle.primary)
-    async def decrypt_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(DecryptModal(self.ciphertext))
+class DecryptButton(discord.ui.DynamicItem[discord.ui.Button], template=r"sc:(?P<kind>[tf]):(?P<ref>[A-Za-z0-9_-]{22})"):
+    def __init__(self, kind: str, ref: str):
+        super().__init__(discord.ui.Button(label="Decrypt", style=discord.ButtonStyle.primary, custom_id=f"sc:{kind}:{ref}"))
+        self.kind = kind
+        self.ref = ref
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str], /):
+        return cls(match["kind"], match["ref"])
+
+    async def callback(self, interaction: discord.Interaction):
+        if self.kind == "f":
+            atts = interaction.message.attachments if interaction.message else []
+            if not atts:
+                await interaction.response.send_message("Encrypted file not found on this message.", ephemeral=True)
+                return
+            await interaction.response.send_modal(DecryptModal(attachment=atts[0]))
+            return
+        ciphertext = _lookup(self.ref, interaction.message)
+        if ciphertext is None:
+            await interaction.response.send_message("Ciphertext not found on this message.", ephemeral=True)
+            return
+        await interaction.response.send_modal(DecryptModal(ciphertext))
+
+def decrypt_view(kind: str, ref: str) -> discord.ui.View:
+    view = discord.ui.View(timeout=None)
+    view.add_item(DecryptButton(kind, ref))
+    return view
 
 class Encryption(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        self.bot.add_dynamic_items(DecryptButton)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(DecryptButton)
+        KDF_ADMISSION.shutdown()
+
+    async def _post_encrypted_file(self, inter: discord.Interaction, src, filename: str, seed: str, anonymous: bool):
+        out, size = await _run_kdf(inter, _encrypt_file, src, seed)
+        with out:
+            if size > _upload_limit(inter):
+                raise ValueError("encrypted file is larger than this server's upload limit")
+            emb = discord.Embed(
+                description=f":lock: Encrypted file `{filename}` ({size:,} bytes)\n\n🔐 Need to read it? Click **Decrypt** and enter the seed.",
+                color=discord.Color.blurple()
+            )
+            if not anonymous:
+                emb.set_author(name=inter.user.display_name, icon_url=inter.user.display_avatar.url)
+            emb.set_footer(text="Decrypt opens a private modal; result is sent ephemerally to you.")
+            await inter.channel.send(embed=emb, file=discord.File(out, filename=filename),
+                                    view=decrypt_view("f", secrets.token_urlsafe(16)))
+
     @app_commands.command(
         name="encrypt",
         description="Encrypt text (Base64URL) and post an embed with your avatar/name + Decrypt button."
     )
     @app_commands.describe(
         hidden="If true, the ack is hidden (default: True).",
-        anonymous="If true, the embed won't show your name/avatar (default: False)."
+        anonymous="If true, the embed won't show your name/avatar (default: False).",
+        file="Optional file to encrypt instead of (or as well as) the message; sent as an attachment."
     )
-    async def encrypt_cmd(self, inter: discord.Interaction, seed: str, message: str, hidden: Optional[bool] = True, anonymous: Optional[bool] = False):
+    async def encrypt_cmd(self, inter: discord.Interaction, seed: str, message: Optional[str] = None, hidden: Optional[bool] = True, anonymous: Optional[bool] = False, file: Optional[discord.Attachment] = None):
         await inter.response.defer(ephemeral=bool(hidden))
+        if file is None and not message:
+            await inter.followup.send("Give a message or a file to encrypt.", ephemeral=True)
+            return
         try:
-            ciphertext = encrypt_strong(message, seed)
-            emb = discord.Embed(
-                description=f":lock: `{ciphertext}`\n\n🔐 Need to read it? Click **Decrypt** and enter the seed.",
-                color=discord.Color.blurple()
-            )
-            
-            if not anonymous:
-                avatar_url = inter.user.display_avatar.url
-                emb.set_author(name=inter.user.display_name, icon_url=avatar_url)
-            
-            emb.set_footer(text="Decrypt opens a private modal; result is sent ephemerally to you.")
-            view = DecryptView(ciphertext)
-            
-            # Send as a new message to the channel instead of a reply
-            await inter.channel.send(embed=emb, view=view)
+            if file is not None:
+                src = await download_attachment(file)
+                with src:
+                    await self._post_encrypted_file(inter, src, file.filename + ENC_SUFFIX, seed, bool(anonymous))
+            if message:
+                # decide embed vs attachment up front so each message runs scrypt once
+                if len(ENCRYPT_DESC.format(ct="")) + strong_ciphertext_len(message) > EMBED_DESC_MAX:
+                    # too long for an embed: compress + stream-encrypt into an attachment
+                    with io.BytesIO(message.encode("utf-8")) as src:
+                        await self._post_encrypted_file(inter, src, TEXT_FILENAME + ENC_SUFFIX, seed, bool(anonymous))
+                else:
+                    ciphertext = await _run_kdf(inter, encrypt_strong, message, seed)
+                    emb = discord.Embed(description=ENCRYPT_DESC.format(ct=ciphertext), color=discord.Color.blurple())
+
+                    if not anonymous:
+                        avatar_url = inter.user.display_avatar.url
+                        emb.set_author(name=inter.user.display_name, icon_url=avatar_url)
+
+                    emb.set_footer(text="Decrypt opens a private modal; result is sent ephemerally to you.")
+                    ref = cipher_ref(ciphertext)
+                    _remember(ref, ciphertext)
+                    view = decrypt_view("t", ref)
+
+                    # Send as a new message to the channel instead of a reply
+                    await inter.channel.send(embed=emb, view=view)
             # Confirm to user ephemerally
             await inter.followup.send("✅ Encrypted message sent!", ephemeral=True)
         except Exception as e:
             await inter.followup.send(f"Error during encryption: {e}", ephemeral=True)
 
     @app_commands.command(name="decrypt", description="Decrypt a Base64URL ciphertext from /encrypt (hidden by default).")
-    @app_commands.describe(hidden="If true, only you see the result (default: True)")
+    @app_commands.describe(
+        seed="The seed, or your private key for /encrypt-to messages",
+        hidden="If true, only you see the result (default: True)"
+    )
     async def decrypt_cmd(self, inter: discord.Interaction, seed: str, message: str, hidden: Optional[bool] = True):
+        await inter.response.defer(ephemeral=bool(hidden))
+        try:
+            out = await _decrypt_any(inter, message, seed)
+            await inter.followup.send(f":unlock: {out}", ephemeral=bool(hidden))
+        except Exception as e:
+            await inter.followup.send(f"Error: {e}", ephemeral=bool(hidden))
+
+    @app_commands.command(name="decrypt-file", description="Decrypt an encrypted .sc file from /encrypt (hidden by default).")
+    @app_commands.describe(hidden="If true, only you see the result (default: True)")
+    async def decrypt_file_cmd(self, inter: discord.Interaction, seed: str, file: discord.Attachment, hidden: Optional[bool] = True):
+        try:
+            await send_decrypted_file(inter, file, seed, bool(hidden))
+        except Exception as e:
+            if inter.response.is_done():
+                await inter.followup.send(f"Error: {e}", ephemeral=bool(hidden))
+            else:
+                await inter.response.send_message(f"Error: {e}", ephemeral=bool(hidden))
+
+    @app_commands.command(name="key-generate", description="Create a keypair for /encrypt-to; the private key is shown only to you.")
+    async def key_generate_cmd(self, inter: discord.Interaction):
+        priv, pub = generate_keypair()
+        _register_key(inter.user.id, pub)
+        await inter.response.send_message(
+            f"🔑 Public key registered.\n**Private key (save it, it is not stored):** `{priv}`\n"
+            "Use it as the key when decrypting messages sent to you with /encrypt-to.",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="key-register", description="Register your own X25519 public key (Base64URL) for /encrypt-to.")
+    async def key_register_cmd(self, inter: discord.Interaction, public_key: str):
         try:
-            out = decrypt_strong(message, seed)
-            await inter.response.send_message(f":unlock: {out}", ephemeral=bool(hidden))
+            pub = normalize_public_key(public_key)
+        except ValueError as e:
+            await inter.response.send_message(f"Error: {e}", ephemeral=True)
+            return
+        _register_key(inter.user.id, pub)
+        await inter.response.send_message("🔑 Public key registered.", ephemeral=True)
+
+    @app_commands.command(name="encrypt-to", description="Encrypt a message to users' registered keys (no seed needed; fast decrypt).")
+    @app_commands.describe(
+        recipients="Mention one or more users (they need /key-generate or /key-register first)",
+        hidden="If true, the ack is hidden (default: True).",
+        anonymous="If true, the embed won't show your name/avatar (default: False)."
+    )
+    async def encrypt_to_cmd(self, inter: discord.Interaction, recipients: str, message: str, hidden: Optional[bool] = True, anonymous: Optional[bool] = False):
+        ids = list(dict.fromkeys(int(m) for m in MENTION_RE.findall(recipients)))
+        if not ids:
+            await inter.response.send_message("Mention at least one recipient.", ephemeral=True)
+            return
+        missing = [uid for uid in ids if str(uid) not in PUBKEYS]
+        if missing:
+            who = ", ".join(f"<@{uid}>" for uid in missing)
+            await inter.response.send_message(f"No registered key for: {who}", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=bool(hidden))
+        try:
+            ciphertext = encrypt_to_recipients(message, [PUBKEYS[str(uid)] for uid in ids])
+            desc = (f":lock: `{ciphertext}`\n\n🔐 For {', '.join(f'<@{uid}>' for uid in ids)}: "
+                    "click **Decrypt** and enter your private key.")
+            if len(desc) > EMBED_DESC_MAX:
+                raise ValueError("message too long for an embed")
+            emb = discord.Embed(description=desc, color=discord.Color.blurple())
+            if not anonymous:
+                emb.set_author(name=inter.user.display_name, icon_url=inter.user.display_avatar.url)
+            emb.set_footer(text="Decrypt opens a private modal; result is sent ephemerally to you.")
+            ref = cipher_ref(ciphertext)
+            _remember(ref, ciphertext)
+            await inter.channel.send(embed=emb, view=decrypt_view("t", ref))
+            await inter.followup.send("✅ Encrypted message sent!", ephemeral=True)
         except Exception as e:
-            await inter.response.send_message(f"Error: {e}", ephemeral=bool(hidden))
+            await inter.followup.send(f"Error during encryption: {e}", ephemeral=True)
+
+    @app_commands.command(name="encryption-stats", description="KDF admission and key-cache metrics.")
+    @app_commands.default_permissions(manage_guild=True)
+    async def encryption_stats_cmd(self, inter: discord.Interaction):
+        a = KDF_ADMISSION.stats()
+        c = kdf_cache_stats()
+        text = (
+            f"**KDF queue:** {a['queued']} queued · {a['running']} running · peak {a['peak_queued']}\n"
+            f"**Admitted:** {a['admitted']} · completed {a['completed']} · failed {a['failed']} · avg wait {a['avg_wait_ms']:.0f} ms\n"
+            f"**Rejected:** user {a['rejected_user']} · guild {a['rejected_guild']} · queue full {a['rejected_queue']}\n"
+            f"**Key cache:** {c['entries']} entries · hit rate {c['hit_rate']:.0%} ({c['hits']}/{c['hits'] + c['misses']})"
+        )
+        await inter.response.send_message(embed=discord.Embed(title="Encryption stats", description=text, color=discord.Color.blurple()), ephemeral=True)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Encryption(bot))
@@ -10,6 +10,7 @@ from discord.ext import commands
 from discord import app_commands
 from utils.music import get_guess_song_pack
 from utils.common import make_embed
+from utils.stats import record_scores
 
 FFMPEG_OPTIONS = {
     "options": "-vn -filter:a \"atrim=0:15,asetpts=N/SR/TB\""  # play first 15 seconds
@@ -119,6 +120,7 @@ class GuessSongGame:
                 description="Thanks for playing!",
                 color=discord.Color.dark_gold()
             ).add_field(name="Final Scores", value=self.scoreboard(), inline=False))
+            record_scores("guess-song", self.guild.id, self.scores)
             self.active = False
             if self.vc and self.vc.is_connected():
                 await self.vc.disconnect(force=True)
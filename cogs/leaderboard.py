@@ -0,0 +1,53 @@
+# cogs/leaderboard.py
+from typing import Optional
+import discord
+from discord.ext import commands
+from discord import app_commands
+from utils.common import make_embed
+from utils.stats import STATS, GLOBAL, ALL_GAMES
+
+GAMES = {
+    ALL_GAMES: "All games",
+    "trivia": "Trivia",
+    "rps": "Rock–Paper–Scissors",
+    "tictactoe": "Tic-Tac-Toe",
+    "blackjack": "Blackjack",
+    "guess-song": "Guess the Song",
+}
+
+class Leaderboard(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_unload(self):
+        await STATS.close()   # flush anything still queued
+
+    @app_commands.command(name="leaderboard", description="Top players by points, for this server or everywhere.")
+    @app_commands.describe(game="Which game (default: all games)", scope="This server or all servers")
+    @app_commands.choices(
+        game=[app_commands.Choice(name=v, value=k) for k, v in GAMES.items()],
+        scope=[app_commands.Choice(name="This server", value="guild"), app_commands.Choice(name="Global", value="global")],
+    )
+    async def leaderboard_cmd(self, inter: discord.Interaction, game: Optional[app_commands.Choice[str]] = None,
+                              scope: Optional[app_commands.Choice[str]] = None):
+        key = game.value if game else ALL_GAMES
+        is_global = (scope and scope.value == "global") or inter.guild_id is None
+        guild = GLOBAL if is_global else inter.guild_id
+        rows = await STATS.leaderboard(key, guild, 10)
+        mine = await STATS.rank_of(key, guild, inter.user.id)
+
+        medal = ["🥇", "🥈", "🥉"]
+        lines = []
+        for idx, r in enumerate(rows, start=1):
+            prefix = medal[idx-1] if idx <= 3 else f"{idx}."
+            lines.append(f"{prefix} <@{r.user_id}> — **{r.points}** pts · {r.wins}W/{r.draws}D/{r.losses}L")
+        where = "Global" if is_global else (inter.guild.name if inter.guild else "Server")
+        em = make_embed(f"🏆 Leaderboard – {GAMES[key]} · {where}", "\n".join(lines) or "No games recorded yet.",
+                        discord.Color.gold())
+        if mine:
+            rank, r = mine
+            em.add_field(name="You", value=f"#{rank} — **{r.points}** pts · {r.played} played", inline=False)
+        await inter.response.send_message(embed=em)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Leaderboard(bot))
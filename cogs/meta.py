@@ -12,7 +12,11 @@ SECTIONS = {
     ),
     "Encryption": (
         "• `/encrypt seed:<text> message:<text>` – secure AEAD, public embed w/ Decrypt button\n"
+        "• `/encrypt seed:<text> file:<upload>` – encrypt a file (long messages become files too)\n"
         "• `/decrypt seed:<text> message:<base64>` – manual decrypt (hidden by default)\n"
+        "• `/decrypt-file seed:<text> file:<.sc upload>` – decrypt an encrypted file\n"
+        "• `/key-generate` `/key-register` – set up a keypair for recipient encryption\n"
+        "• `/encrypt-to recipients:<@users> message:<text>` – encrypt to users' keys, no seed\n"
     ),
     "Messaging": (
         "• `/clone target_user message` – send via webhook as display name\n"
@@ -22,17 +26,21 @@ SECTIONS = {
         "• `/server-mute|unmute|deafen|undeafen`\n"
         "• `/disconnect-voice` `/move-voice` `/change-nickname`\n"
         "• `/print-bot-permissions` `/court user seconds`\n"
+        "• `/bulk-voice action channel|role [to_channel]` `/bulk-nickname channel|role [nickname]` – whole channel/role at once\n"
     ),
     "Games": (
         "• `/rps [opponent]` – quick match w/ rematch & victory embed\n"
-        "• `/tictactoe opponent` – button grid, win/draw embed\n"
+        "• `/rps-tournament [best_of] [pick_timeout]` – knockout bracket for up to 256 players in one message\n"
+        "• `/tictactoe [opponent] [size] [win_length]` – 3×3 to 5×5 grid; no opponent = play the bot\n"
+        "• `/blackjack [decks]` – shared per-channel table & shoe; others can Join before the first move; 💡 Hint shows Hit vs Stand odds\n"
         "• `/trivia [questions] [timer] [category]` – Kahoot-style timed trivia\n"
         "• `/guess-song [count]` – Guess the Song in VC (artist, song, album)\n"
+        "• `/leaderboard [game] [scope]` – top players here or globally, plus your rank\n"
     ),
     "Morse & Tests": (
-        "• `/morse-encrypt` • `/morse-decrypt`\n"
+        "• `/morse-encrypt` • `/morse-decrypt [code] [audio]` • `/morse-audio [wpm] [tone] [voice]`\n"
         "• `/truth` • `/dare` – from data files\n"
-        "• `/ricepurity [anonymous]` – interactive test\n"
+        "• `/ricepurity [anonymous] [per_page]` – interactive test, a page of questions at a time\n"
     ),
     "Audio/Radio": (
         "• `/radio station:<name>` – play a curated radio\n"
@@ -1,13 +1,66 @@
 # cogs/moderation.py
 import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.bulk import BulkExecutor, BulkResult
+from utils.scheduler import SCHEDULER, Entry
+
+UNJAIL = "unjail"
+REMOVE_CONCURRENCY = 8   # role removals in flight per batch; discord.py queues per route beyond that
+PROGRESS_EVERY = 1.5     # seconds between edits of the bulk progress message
+
+VOICE_ACTIONS = {
+    "mute": "muted", "unmute": "unmuted", "deafen": "deafened", "undeafen": "undeafened",
+    "move": "moved", "disconnect": "disconnected",
+}
+
+def _bulk_targets(inter: discord.Interaction, channel: Optional[discord.VoiceChannel], role: Optional[discord.Role],
+                  in_voice: bool) -> List[discord.Member]:
+    members = list(channel.members) if channel else list(role.members) if role else []
+    return [m for m in members if m.id != inter.client.user.id and (not in_voice or m.voice)]
+
+def _progress_text(label: str, r: BulkResult) -> str:
+    bar_len = 20
+    filled = bar_len * (r.done + len(r.failed)) // max(r.total, 1)
+    text = f"{label}: `{'█' * filled}{'░' * (bar_len - filled)}` {r.done}/{r.total}"
+    if r.failed:
+        text += f" · {len(r.failed)} failed"
+    if r.rate_limited:
+        text += f" · {r.rate_limited} rate-limited (retried)"
+    return text
 
 class Moderation(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        await SCHEDULER.start(self._run_due)
+
+    async def cog_unload(self):
+        await SCHEDULER.close()
+
+    async def _run_due(self, batch: List[Entry]) -> List[Entry]:
+        """Scheduler handler: lift every jail that fell due together; returns the ones to retry."""
+        await self.bot.wait_until_ready()
+        sem = asyncio.Semaphore(REMOVE_CONCURRENCY)
+        failed: List[Entry] = []
+
+        async def unjail(e: Entry):
+            async with sem:
+                try:
+                    # by id, so it works whether or not the member is cached
+                    await self.bot.http.remove_role(e.guild_id, e.user_id, e.target_id, reason="Court time elapsed")
+                except (discord.NotFound, discord.Forbidden):
+                    pass   # member left, role deleted, or we lost the permission: nothing to retry
+                except discord.HTTPException:
+                    failed.append(e)
+
+        await asyncio.gather(*(unjail(e) for e in batch if e.kind == UNJAIL))
+        return failed
+
     @app_commands.command(name="server-mute", description="Server mute a user.")
     async def server_mute(self, inter: discord.Interaction, target_user: discord.Member):
         await target_user.edit(mute=True)
@@ -43,6 +96,82 @@ class Moderation(commands.Cog):
         await target_user.edit(nick=new_nickname)
         await inter.response.send_message(f"{target_user.mention} nickname changed to **{new_nickname}**.", ephemeral=True)
 
+    async def _run_bulk(self, inter: discord.Interaction, members: List[discord.Member], label: str,
+                        action: Callable[[discord.Member], Awaitable]):
+        """Edit every member through a BulkExecutor, with one ephemeral message showing progress."""
+        if not members:
+            await inter.response.send_message("Nobody to act on.", ephemeral=True)
+            return
+        await inter.response.send_message(f"{label}: starting on {len(members)} members…", ephemeral=True)
+        state = {"result": None, "dirty": False}
+
+        def progress(r: BulkResult):
+            state["result"], state["dirty"] = r, True
+
+        async def ticker():
+            while True:
+                await asyncio.sleep(PROGRESS_EVERY)
+                if state["dirty"]:
+                    state["dirty"] = False
+                    try:
+                        await inter.edit_original_response(content=_progress_text(label, state["result"]))
+                    except discord.HTTPException:
+                        pass
+
+        tick = asyncio.create_task(ticker())
+        try:
+            # member edits share a per-guild route bucket, so that's the bucket key
+            r = await BulkExecutor().run(members, action, bucket=lambda m: m.guild.id, progress=progress)
+        finally:
+            tick.cancel()
+        text = _progress_text(label, r) + f"\nDone in {r.elapsed:.1f}s."
+        if r.failed:
+            text += "\nFailed: " + ", ".join(m.mention for m, _ in r.failed[:10])
+            text += f" (first error: {r.failed[0][1]})"
+        await inter.edit_original_response(content=text)
+
+    @app_commands.command(name="bulk-voice", description="Mute, deafen, move or disconnect everyone in a voice channel or role.")
+    @app_commands.describe(action="What to do", channel="Everyone in this voice channel",
+                           role="Everyone with this role who is in voice", to_channel="Where to move them (for move)")
+    @app_commands.choices(action=[app_commands.Choice(name=a, value=a) for a in VOICE_ACTIONS])
+    @app_commands.default_permissions(mute_members=True, move_members=True)
+    @app_commands.guild_only()
+    async def bulk_voice(self, inter: discord.Interaction, action: app_commands.Choice[str],
+                         channel: Optional[discord.VoiceChannel] = None, role: Optional[discord.Role] = None,
+                         to_channel: Optional[discord.VoiceChannel] = None):
+        if (channel is None) == (role is None):
+            await inter.response.send_message("Pick either a `channel` or a `role`.", ephemeral=True)
+            return
+        if action.value == "move" and to_channel is None:
+            await inter.response.send_message("Moving needs a `to_channel`.", ephemeral=True)
+            return
+        reason = f"bulk-voice {action.value} by {inter.user}"
+        edits = {
+            "mute": dict(mute=True), "unmute": dict(mute=False),
+            "deafen": dict(deafen=True), "undeafen": dict(deafen=False),
+            "move": dict(voice_channel=to_channel), "disconnect": dict(voice_channel=None),
+        }[action.value]
+        members = _bulk_targets(inter, channel, role, in_voice=True)
+        if action.value == "move":
+            members = [m for m in members if m.voice.channel != to_channel]
+        label = f"{VOICE_ACTIONS[action.value].capitalize()} {(channel or role).mention}"
+        await self._run_bulk(inter, members, label, lambda m: m.edit(reason=reason, **edits))
+
+    @app_commands.command(name="bulk-nickname", description="Set (or clear) the nickname of everyone in a voice channel or role.")
+    @app_commands.describe(channel="Everyone in this voice channel", role="Everyone with this role",
+                           nickname="New nickname; leave empty to reset")
+    @app_commands.default_permissions(manage_nicknames=True)
+    @app_commands.guild_only()
+    async def bulk_nickname(self, inter: discord.Interaction, channel: Optional[discord.VoiceChannel] = None,
+                            role: Optional[discord.Role] = None, nickname: Optional[str] = None):
+        if (channel is None) == (role is None):
+            await inter.response.send_message("Pick either a `channel` or a `role`.", ephemeral=True)
+            return
+        reason = f"bulk-nickname by {inter.user}"
+        members = [m for m in _bulk_targets(inter, channel, role, in_voice=False) if m.nick != nickname]
+        label = f"Renamed {(channel or role).mention}"
+        await self._run_bulk(inter, members, label, lambda m: m.edit(nick=nickname, reason=reason))
+
     @app_commands.command(name="print-bot-permissions", description="Print bot guild permissions.")
     async def print_perms(self, inter: discord.Interaction):
         await inter.response.send_message(f"Bot permissions: `{inter.guild.me.guild_permissions}`", ephemeral=True)
@@ -54,12 +183,9 @@ class Moderation(commands.Cog):
             await inter.response.send_message("Role 'Jail' not found.", ephemeral=True)
             return
         await user.add_roles(role, reason=f"Court by {inter.user} for {seconds}s")
+        # the un-jail is persisted, so it still happens if the bot restarts in between
+        await SCHEDULER.schedule(UNJAIL, inter.guild.id, user.id, role.id, time.time() + seconds)
         await inter.response.send_message(f"Sending {user.mention} to court for {seconds} seconds.", ephemeral=True)
-        await asyncio.sleep(seconds)
-        try:
-            await user.remove_roles(role, reason="Court time elapsed")
-        except Exception:
-            pass
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Moderation(bot))
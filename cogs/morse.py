@@ -1,22 +1,16 @@
 # cogs/morse.py
+import asyncio
+import io
+from typing import Iterator, Optional
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.common import download_attachment
+from utils.morse import MORSE_CODE, REV_MORSE, VOICE_RATE, decode_audio, get_keyer
 
-MORSE_CODE = {
-    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..',  'E': '.',   'F': '..-.',
-    'G': '--.','H': '....','I': '..',   'J': '.---', 'K': '-.-',  'L': '.-..',
-    'M': '--', 'N': '-.',  'O': '---',  'P': '.--.', 'Q': '--.-', 'R': '.-.',
-    'S': '...', 'T': '-',  'U': '..-',  'V': '...-', 'W': '.--',  'X': '-..-',
-    'Y': '-.--','Z': '--..',
-    '1': '.----','2': '..---','3': '...--','4': '....-','5': '.....',
-    '6': '-....','7': '--...','8': '---..','9': '----.','0': '-----',
-    ',': '--..--','.' : '.-.-.-','?':'..--..','/':'-..-.','-':'-....-',
-    '(': '-.--.', ')':'-.--.-', '!':'-.-.--', ':':'---...',';':'-.-.-.',
-    "'":'.----.','@':'.--.-.','&':'.-...','=':'-...-','+':'.-.-.',
-    '_':'..--.-','"':'.-..-.','$':'...-..-', ' ':'/'
-}
-REV_MORSE = {v.strip(): k for k, v in MORSE_CODE.items()}
+MAX_AUDIO_SECONDS = 15 * 60   # voice playback cap
+MAX_DECODE_BYTES = 50 * 2**20  # uploads to /morse-decrypt
+WAV_HEADER = 44
 
 def morse_encrypt(msg: str) -> str:
     return ' '.join(MORSE_CODE.get(ch, '?') for ch in msg.upper())
@@ -30,6 +24,17 @@ def morse_decrypt(code: str) -> str:
         else: out.append(REV_MORSE.get(t, '�'))
     return ''.join(out)
 
+class MorseSource(discord.AudioSource):
+    """Streams a message into voice one 20 ms frame at a time from the keyer's cached buffers."""
+    def __init__(self, frames: Iterator[bytes]):
+        self._frames = frames
+
+    def read(self) -> bytes:
+        return next(self._frames, b"")
+
+    def is_opus(self) -> bool:
+        return False
+
 class Morse(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -38,9 +43,78 @@ class Morse(commands.Cog):
     async def morse_enc_cmd(self, inter: discord.Interaction, message: str):
         await inter.response.send_message(morse_encrypt(message), ephemeral=False)
 
-    @app_commands.command(name="morse-decrypt", description="Convert Morse to text.")
-    async def morse_dec_cmd(self, inter: discord.Interaction, code: str):
-        await inter.response.send_message(morse_decrypt(code), ephemeral=True)
+    @app_commands.command(name="morse-decrypt", description="Convert Morse to text, from dots and dashes or an audio file.")
+    @app_commands.describe(code="Dots and dashes, letters separated by spaces and words by /",
+                           audio="A recording of Morse tones (WAV, or anything ffmpeg reads)")
+    async def morse_dec_cmd(self, inter: discord.Interaction, code: Optional[str] = None,
+                            audio: Optional[discord.Attachment] = None):
+        if audio is None:
+            if not code:
+                await inter.response.send_message("Give me some `code` or an `audio` file.", ephemeral=True)
+                return
+            await inter.response.send_message(morse_decrypt(code), ephemeral=True)
+            return
+        if audio.size > MAX_DECODE_BYTES:
+            await inter.response.send_message(f"Audio files are limited to {MAX_DECODE_BYTES // 2**20} MiB.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True, thinking=True)
+        fp = await download_attachment(audio)
+        try:
+            text = await asyncio.to_thread(decode_audio, fp)
+        except Exception as e:
+            await inter.followup.send(f"Couldn't decode that audio: {e}", ephemeral=True)
+            return
+        finally:
+            fp.close()
+        await inter.followup.send(f"**Decoded:** {text[:1900]}" if text else "No Morse found in that audio.", ephemeral=True)
+
+    @app_commands.command(name="morse-audio", description="Play text as Morse in your voice channel, or attach it as a WAV file.")
+    @app_commands.describe(message="Text to send", wpm="Speed in words per minute (default 20)",
+                           tone="Tone in Hz (default 600)", voice="Play it in your voice channel instead of attaching a file")
+    async def morse_audio_cmd(self, inter: discord.Interaction, message: str,
+                              wpm: app_commands.Range[int, 5, 60] = 20,
+                              tone: app_commands.Range[int, 300, 1200] = 600,
+                              voice: Optional[bool] = False):
+        if not any(ch in MORSE_CODE for ch in message.upper() if not ch.isspace()):
+            await inter.response.send_message("Nothing in that message can be sent as Morse.", ephemeral=True)
+            return
+        if voice:
+            await self._play(inter, message, wpm, tone)
+            return
+        keyer = get_keyer(wpm, tone)
+        size = keyer.pcm_size(message) + WAV_HEADER
+        limit = inter.guild.filesize_limit if inter.guild else 10 * 1024 * 1024
+        if size > limit:
+            # counted from the codes, so an oversized message is never rendered
+            await inter.response.send_message(f"That's {size / 2**20:.1f} MiB of audio, over the upload limit. "
+                                              "Try a higher wpm, a shorter message, or `voice:true`.", ephemeral=True)
+            return
+        await inter.response.defer()
+        data = await asyncio.to_thread(keyer.wav, message)
+        await inter.followup.send(f"`{morse_encrypt(message)[:1900]}`",
+                                  file=discord.File(io.BytesIO(data), filename="morse.wav"))
+
+    async def _play(self, inter: discord.Interaction, message: str, wpm: int, tone: int):
+        if not isinstance(inter.user, discord.Member) or not inter.user.voice or not inter.user.voice.channel:
+            await inter.response.send_message("Join a voice channel first.", ephemeral=True)
+            return
+        keyer = get_keyer(wpm, tone, VOICE_RATE, 2)
+        seconds = keyer.duration(message)
+        if seconds > MAX_AUDIO_SECONDS:
+            await inter.response.send_message(f"That would play for {seconds / 60:.0f} minutes; the limit is "
+                                              f"{MAX_AUDIO_SECONDS // 60}. Try a higher wpm or a shorter message.", ephemeral=True)
+            return
+        vc = inter.guild.voice_client
+        if vc and vc.is_connected() and vc.is_playing():
+            await inter.response.send_message("Something is already playing in voice.", ephemeral=True)
+            return
+        await inter.response.defer()
+        if vc and vc.channel != inter.user.voice.channel:
+            await vc.move_to(inter.user.voice.channel)
+        if not vc or not vc.is_connected():
+            vc = await inter.user.voice.channel.connect(self_deaf=True)
+        vc.play(MorseSource(keyer.frames(message)))
+        await inter.followup.send(f"📻 Keying {seconds:.0f}s of Morse at {wpm} wpm in {vc.channel.mention}.")
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Morse(bot))
@@ -1,5 +1,4 @@
 # cogs/radio.py
-import json
 import random
 from pathlib import Path
 from typing import Optional, Set
@@ -7,22 +6,15 @@ from typing import Optional, Set
 import discord
 from discord.ext import commands
 from discord import app_commands
-from utils.common import DATA_DIR, make_embed
+from utils.common import make_embed
+from utils.content import CONTENT
 
 FFMPEG_OPTS_RADIO = {
     "before_options": "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5",
     "options": "-vn"
 }
 
-STATIONS_FILE = DATA_DIR / "radio" / "radio_stations.json"
-
-def load_stations():
-    try:
-        return json.loads(STATIONS_FILE.read_text(encoding="utf-8"))
-    except Exception:
-        return []
-
-STATIONS = load_stations()  # [{name,url},...]
+# stations ([{name,url},...]) live in data/radio/ and hot-reload through CONTENT
 
 class RadioView(discord.ui.View):
     def __init__(self, cog: 'Radio', current_station: dict, voice_channel: discord.VoiceChannel, message: discord.Message = None):
@@ -35,7 +27,8 @@ class RadioView(discord.ui.View):
         self.station_votes: dict[str, Set[int]] = {}
         
         # Add 3 random other stations as buttons
-        other_stations = [s for s in STATIONS if s['name'] != current_station['name']]
+        stations = CONTENT.get("stations", voice_channel.guild.id)
+        other_stations = [s for s in stations if s['name'] != current_station['name']]
         random_stations = random.sample(other_stations, min(3, len(other_stations)))
         
         for station in random_stations:
@@ -223,7 +216,10 @@ class RadioView(discord.ui.View):
 class Radio(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-    
+
+    async def cog_load(self):
+        CONTENT.start()
+
     async def switch_station(self, guild: discord.Guild, station: dict):
         """Switch to a new station without breaking the connection"""
         vc = guild.voice_client
@@ -252,7 +248,7 @@ class Radio(commands.Cog):
             await inter.response.send_message("Join a voice channel first.", ephemeral=True)
             return
 
-        station_obj = next((s for s in STATIONS if s["name"].lower() == station.lower()), None)
+        station_obj = next((s for s in CONTENT.get("stations", inter.guild_id) if s["name"].lower() == station.lower()), None)
         if not station_obj:
             await inter.response.send_message("Station not found.", ephemeral=True)
             return
@@ -319,7 +315,7 @@ class Radio(commands.Cog):
     async def radio_autocomplete(self, inter: discord.Interaction, current: str):
         q = (current or "").lower()
         opts = []
-        for s in STATIONS:
+        for s in CONTENT.get("stations", inter.guild_id):
             if not q or q in s["name"].lower():
                 opts.append(app_commands.Choice(name=s["name"], value=s["name"]))
             if len(opts) >= 25:
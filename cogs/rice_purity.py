@@ -1,82 +1,169 @@
 # cogs/rice_purity.py
 from typing import Optional
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from utils.common import DATA_DIR, make_embed
+from utils.common import make_embed
+from utils.content import CONTENT
+from utils.histogram import HistogramStore
 
-RICE_FILE = DATA_DIR / "rice_purity" / "rice_purity_questions.txt"
+# questions live in data/rice_purity/ and hot-reload through CONTENT
 
-def _load_questions(path):
-    try:
-        return [ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
-    except FileNotFoundError:
-        return []
+PER_PAGE = 10        # questions per message; a select menu takes at most 25 options
+LINE_MAX = 380       # per question in the embed, so a full page stays under the description limit
 
-QUESTIONS = _load_questions(RICE_FILE)
+# score distribution per guild and across all servers; anonymous runs count too
+SCORES = HistogramStore("purity_hist.json")
+
+def _ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+def _clip(text: str, n: int) -> str:
+    return text if len(text) <= n else text[:n - 1] + "…"
 
 class RicePurityView(discord.ui.View):
-    def __init__(self, inter: discord.Interaction, anonymous: bool):
+    """
+    Shows a page of questions at a time. Ticking the ones you've done in the
+    multi-select (or pressing All/None) records the page and moves on with a
+    single edit_message, so a 100-question test is ~10 API calls, not ~200.
+    Answers are one int bitset: bit i set = "yes" to question i.
+    """
+    def __init__(self, inter: discord.Interaction, anonymous: bool, per_page: int = PER_PAGE):
         super().__init__(timeout=300.0)
         self.inter = inter
-        self.idx = 0
-        self.score = 100
         self.anon = anonymous
+        self.per_page = per_page
+        self.page = 0
+        self.answers = 0
         self.msg: Optional[discord.Message] = None
+        # fixed for this run, so a reload mid-test can't shift the questions
+        self.questions = CONTENT.get("rice_purity", inter.guild_id)
+        self.pages = -(-len(self.questions) // per_page)
 
-    async def show_q(self):
-        if self.idx >= len(QUESTIONS):
-            who = "Anonymous User" if self.anon else self.inter.user.mention
-            text = f"{who}'s Rice Purity score is: **{self.score}** 😈"
-            if self.msg:
-                await self.msg.edit(embed=make_embed("Rice Purity – Result", text, discord.Color.brand_red()), view=None)
-            else:
-                await self.inter.followup.send(text, ephemeral=self.anon)
-            return
-        q = QUESTIONS[self.idx]
+    @property
+    def score(self) -> int:
+        return 100 - self.answers.bit_count()
+
+    def _bounds(self):
+        start = self.page * self.per_page
+        return start, min(start + self.per_page, len(self.questions))
+
+    def _mask(self) -> int:
+        start, end = self._bounds()
+        return ((1 << (end - start)) - 1) << start
+
+    def _set_page(self, picked: int):
+        """picked: bits relative to the page start."""
+        start, _ = self._bounds()
+        self.answers = (self.answers & ~self._mask()) | (picked << start)
+
+    def _render(self) -> discord.Embed:
+        start, end = self._bounds()
+        lines = [f"**{i + 1}.** {_clip(self.questions[i], LINE_MAX)}" for i in range(start, end)]
         em = discord.Embed(
-            title=f"Rice Purity Test ({self.idx+1}/{len(QUESTIONS)})",
-            description=q,
+            title=f"Rice Purity Test (page {self.page + 1}/{self.pages})",
+            description="Have you ever…\n\n" + "\n".join(lines),
             color=discord.Color.pink()
         )
         em.set_author(name=f"Requested by {self.inter.user.display_name}", icon_url=self.inter.user.display_avatar.url)
-        if self.msg is None:
-            self.msg = await self.inter.followup.send(embed=em, view=self, ephemeral=self.anon)
-        else:
-            await self.msg.edit(embed=em, view=self)
-
-    @discord.ui.button(label="Yes", style=discord.ButtonStyle.success)
-    async def yes(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        self.score -= 1
-        self.idx += 1
-        await self.show_q()
-
-    @discord.ui.button(label="No", style=discord.ButtonStyle.danger)
-    async def no(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        self.idx += 1
-        await self.show_q()
-
-    @discord.ui.button(label="Stop", style=discord.ButtonStyle.secondary)
-    async def stop(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
-        await interaction.followup.send("Rice Purity Test stopped.", ephemeral=True)
-        if self.msg:
-            await self.msg.edit(view=None)
+        em.set_footer(text=f"Questions {start + 1}–{end} of {len(self.questions)} · pick the ones you've done, or use All/None")
+        self.pick.options = [
+            discord.SelectOption(label=_clip(f"{i + 1}. {self.questions[i]}", 100), value=str(i - start),
+                                 default=bool(self.answers >> i & 1))
+            for i in range(start, end)
+        ]
+        self.pick.max_values = end - start
+        self.back.disabled = self.page == 0
+        return em
+
+    def _result(self) -> discord.Embed:
+        who = "Anonymous User" if self.anon else self.inter.user.mention
+        score = self.score
+        glob, guild = SCORES.add(self.inter.guild_id, score)
+        text = f"{who}'s Rice Purity score is: **{score}** 😈\n"
+        if guild is not None:
+            text += f"\nThat's the **{_ordinal(round(guild.percentile(score)))} percentile** in this server ({guild.total:,} tests)"
+        text += f"\n**{_ordinal(round(glob.percentile(score)))} percentile** across all servers ({glob.total:,} tests)"
+        return make_embed("Rice Purity – Result", text, discord.Color.brand_red())
+
+    async def start(self):
+        self.msg = await self.inter.followup.send(embed=self._render(), view=self, ephemeral=self.anon)
+
+    async def _advance(self, interaction: discord.Interaction, picked: int):
+        self._set_page(picked)
+        self.page += 1
+        if self.page >= self.pages:
+            self.stop()
+            await interaction.response.edit_message(embed=self._result(), view=None)
+            return
+        await interaction.response.edit_message(embed=self._render(), view=self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.inter.user.id:
+            await interaction.response.send_message("This isn't your test — run /ricepurity to take your own.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.select(placeholder="Select everything you've done on this page", min_values=0, max_values=1,
+                       options=[discord.SelectOption(label="…")], row=0)
+    async def pick(self, interaction: discord.Interaction, select: discord.ui.Select):
+        picked = 0
+        for v in select.values:
+            picked |= 1 << int(v)
+        await self._advance(interaction, picked)
+
+    @discord.ui.button(label="None of these", style=discord.ButtonStyle.danger, row=1)
+    async def none_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._advance(interaction, 0)
+
+    @discord.ui.button(label="All of these", style=discord.ButtonStyle.success, row=1)
+    async def all_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        start, end = self._bounds()
+        await self._advance(interaction, (1 << (end - start)) - 1)
+
+    @discord.ui.button(label="Back", style=discord.ButtonStyle.secondary, row=1)
+    async def back(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await interaction.response.edit_message(embed=self._render(), view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary, row=1)
+    async def next_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # keeps this page's answers as they are (the select only fires on a change, e.g. after Back)
+        start, _ = self._bounds()
+        await self._advance(interaction, (self.answers & self._mask()) >> start)
+
+    @discord.ui.button(label="Stop", style=discord.ButtonStyle.secondary, row=1)
+    async def stop_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.edit_message(content="Rice Purity Test stopped.", embed=None, view=None)
 
 class RicePurity(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        CONTENT.start()
+        self.save_scores.start()
+
+    async def cog_unload(self):
+        self.save_scores.cancel()
+        SCORES.save()
+
+    @tasks.loop(minutes=10)
+    async def save_scores(self):
+        SCORES.save()
+
     @app_commands.command(name="ricepurity", description="Take the Rice Purity Test (reads data file).")
-    async def ricepurity_cmd(self, inter: discord.Interaction, anonymous: Optional[bool] = False):
-        if not QUESTIONS:
+    @app_commands.describe(per_page="Questions per page (default 10)")
+    async def ricepurity_cmd(self, inter: discord.Interaction, anonymous: Optional[bool] = False,
+                             per_page: app_commands.Range[int, 1, 10] = PER_PAGE):
+        if not CONTENT.get("rice_purity", inter.guild_id):
             await inter.response.send_message("Questions file not found.", ephemeral=True)
             return
         await inter.response.send_message("Starting Rice Purity Test...", ephemeral=True)
-        v = RicePurityView(inter, anonymous or False)
-        await v.show_q()
+        v = RicePurityView(inter, anonymous or False, per_page)
+        await v.start()
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(RicePurity(bot))
@@ -1,8 +1,11 @@
 # cogs/rps.py
+import asyncio
 from typing import Dict, Optional, List
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.rps_bracket import Bracket, Match, LIVE
+from utils.stats import STATS
 
 RPS_CHOICES = ("rock", "paper", "scissors")
 RPS_BEATS = {("rock", "scissors"), ("paper", "rock"), ("scissors", "paper")}
@@ -143,6 +146,9 @@ class RPSMatchView(discord.ui.View):
         
         # Determine winner
         s1, s2 = self.scores.get(self.p1.id, 0), self.scores.get(self.p2.id, 0)
+        res = (s1 > s2) - (s1 < s2)
+        STATS.record("rps", interaction.guild_id, self.p1.id, s1, res)
+        STATS.record("rps", interaction.guild_id, self.p2.id, s2, -res)
         if s1 == s2:
             title = "🤝 MATCH OVER - TIE 🤝"
             desc = f"Tied at **{s1}**–**{s2}**!"
@@ -251,6 +257,231 @@ class RPSLobbyView(discord.ui.View):
         await interaction.response.send_message(text, view=self)
         self.msg = await interaction.original_response()
 
+# ---------------- Tournament ----------------
+
+TOURNEY_MAX_PLAYERS = 256
+RENDER_EVERY = 2.5        # seconds between shared-message edits (picks are batched into these)
+BRACKET_LINES = 40        # match lines shown before "…and N more"
+PICK_EMOJI = {"rock": "🪨", "paper": "📄", "scissors": "✂️"}
+
+def _short(name: str, limit: int = 20) -> str:
+    name = discord.utils.escape_markdown(name)
+    return name if len(name) <= limit else name[:limit - 1] + "…"
+
+class RPSTournamentView(discord.ui.View):
+    """
+    One message and one set of pick buttons for the whole bracket. A pick is
+    routed to the player's Match and answered ephemerally; the shared embed
+    is only redrawn by the ticker, at most once per RENDER_EVERY.
+    """
+    def __init__(self, message: discord.PartialMessage, names: Dict[int, str], bracket: Bracket):
+        super().__init__(timeout=3600.0)
+        self.message = message
+        self.guild_id = message.guild.id if message.guild else None
+        self.names = names
+        self.bracket = bracket
+        self.waiting: Dict[int, discord.Interaction] = {}   # first picker, told the result when the throw resolves
+        self.ticker: Optional[asyncio.Task] = None
+
+    def name(self, uid: Optional[int]) -> str:
+        return _short(self.names.get(uid, "?")) if uid is not None else "—"
+
+    def _match_line(self, i: int, m: Match) -> str:
+        if m.b is None:
+            return f"`{i:>3}` **{self.name(m.a)}** — bye"
+        if m.state == LIVE:
+            score = f"{m.wins_a}–{m.wins_b}" if m.need > 1 else "vs"
+            return f"`{i:>3}` ⏳ {self.name(m.a)} {score} {self.name(m.b)}"
+        loser = m.b if m.winner == m.a else m.a
+        score = f" ({max(m.wins_a, m.wins_b)}–{min(m.wins_a, m.wins_b)})" if m.need > 1 else ""
+        return f"`{i:>3}` ✅ **{self.name(m.winner)}** def. {self.name(loser)}{score}"
+
+    def render(self) -> discord.Embed:
+        b = self.bracket
+        if b.champion is not None:
+            e = discord.Embed(title="🏆 RPS Tournament – Champion!", color=discord.Color.green(),
+                              description=f"**{self.name(b.champion)}** wins a {len(self.names)}-player bracket "
+                                          f"in {b.round_no} round(s)!")
+            return e
+        matches = b.current
+        # live matches first so the ones people care about stay visible
+        order = sorted(range(len(matches)), key=lambda i: matches[i].state != LIVE)
+        lines = [self._match_line(i + 1, matches[i]) for i in order[:BRACKET_LINES]]
+        if len(matches) > BRACKET_LINES:
+            lines.append(f"…and {len(matches) - BRACKET_LINES} more matches")
+        title = "🏆 RPS Tournament – Final" if len(matches) == 1 else f"🏆 RPS Tournament – Round {b.round_no}/{b.total_rounds}"
+        e = discord.Embed(title=title, description="\n".join(lines)[:4000], color=discord.Color.blurple())
+        e.add_field(name="Progress", value=f"{b.live_count()} of {len(matches)} matches still playing", inline=False)
+        bo = b.need * 2 - 1
+        e.set_footer(text=f"Best of {bo} · {int(b.timeout)}s per pick or forfeit · pick with the buttons below; "
+                          f"results come privately")
+        return e
+
+    async def start(self):
+        await self.message.edit(content=None, embed=self.render(), view=self)
+        self.bracket.dirty = False
+        self.ticker = asyncio.create_task(self._tick())
+
+    async def _tick(self):
+        while not self.is_finished():
+            await asyncio.sleep(RENDER_EVERY)
+            for m in self.bracket.expire():
+                self._record(m)
+            if self.bracket.champion is not None:
+                await self._finish()
+                return
+            if self.bracket.dirty:
+                self.bracket.dirty = False
+                try:
+                    await self.message.edit(embed=self.render(), view=self)
+                except discord.HTTPException:
+                    pass
+
+    async def _finish(self):
+        self.stop()
+        self.waiting.clear()
+        try:
+            await self.message.edit(embed=self.render(), view=None)
+            await self.message.channel.send(f"🏆 <@{self.bracket.champion}> is the RPS champion!")
+        except discord.HTTPException:
+            pass
+
+    async def _pick(self, interaction: discord.Interaction, choice: str):
+        uid = interaction.user.id
+        m = self.bracket.match_of(uid)
+        if m is None:
+            msg = ("You're not in this tournament." if uid not in self.names
+                   else "You have no live match right now — wait for the next round (or you're out).")
+            await interaction.response.send_message(msg, ephemeral=True)
+            return
+        if m.picked(uid):
+            await interaction.response.send_message("You already picked this throw.", ephemeral=True)
+            return
+        opp = m.other(uid)
+        m, result = self.bracket.pick(uid, choice)
+        if m.state != LIVE:
+            self._record(m)
+        if result is None:
+            self.waiting[uid] = interaction
+            await interaction.response.send_message(
+                f"{PICK_EMOJI[choice]} Locked in **{choice}** — waiting for {self.name(opp)}.", ephemeral=True)
+            return
+        await interaction.response.send_message(self._throw_text(m, uid, result), ephemeral=True)
+        first = self.waiting.pop(opp, None)
+        if first is not None:
+            try:
+                await first.followup.send(self._throw_text(m, opp, -result), ephemeral=True)
+            except discord.HTTPException:
+                pass
+
+    def _record(self, m: Match):
+        loser = m.b if m.winner == m.a else m.a
+        STATS.record("rps", self.guild_id, m.winner, 1, 1)
+        STATS.record("rps", self.guild_id, loser, 0, -1)
+
+    def _throw_text(self, m: Match, uid: int, result: int) -> str:
+        mine, theirs = m.last if uid == m.a else m.last[::-1]
+        line = f"{PICK_EMOJI[mine]} **{mine}** vs {PICK_EMOJI[theirs]} **{theirs}** ({self.name(m.other(uid))}): "
+        line += "🤝 tie, pick again!" if result == 0 else ("🎉 you take the throw!" if result > 0 else "😔 they take the throw.")
+        if m.state != LIVE:
+            line += "\n🏅 You advance!" if m.winner == uid else "\n❌ You're out of the tournament."
+        elif m.need > 1:
+            mw, tw = (m.wins_a, m.wins_b) if uid == m.a else (m.wins_b, m.wins_a)
+            line += f" Score {mw}–{tw}."
+        return line
+
+    @discord.ui.button(label="Rock", emoji="🪨", style=discord.ButtonStyle.secondary)
+    async def t_rock(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._pick(interaction, "rock")
+
+    @discord.ui.button(label="Paper", emoji="📄", style=discord.ButtonStyle.secondary)
+    async def t_paper(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._pick(interaction, "paper")
+
+    @discord.ui.button(label="Scissors", emoji="✂️", style=discord.ButtonStyle.secondary)
+    async def t_scissors(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._pick(interaction, "scissors")
+
+    async def on_timeout(self):
+        for m in self.bracket.forfeit_all():
+            self._record(m)
+        await self._finish()
+
+class RPSTournamentLobby(discord.ui.View):
+    def __init__(self, host: discord.Member, best_of: int, pick_timeout: int):
+        super().__init__(timeout=600.0)
+        self.host = host
+        self.best_of = best_of
+        self.pick_timeout = pick_timeout
+        self.names: Dict[int, str] = {host.id: host.display_name}
+        self.message: Optional[discord.PartialMessage] = None
+        self.dirty = False
+        self.ticker: Optional[asyncio.Task] = None
+
+    def render(self) -> str:
+        shown = ", ".join(_short(n, 16) for n in list(self.names.values())[:30])
+        more = f" …and {len(self.names) - 30} more" if len(self.names) > 30 else ""
+        return (f"**RPS Tournament** hosted by {self.host.mention} · best of {self.best_of} · "
+                f"{self.pick_timeout}s per pick\n"
+                f"Press **Join** to enter ({len(self.names)}/{TOURNEY_MAX_PLAYERS}). "
+                f"The host presses **Start** when ready.\n\n{shown}{more}")
+
+    async def send(self, interaction: discord.Interaction):
+        await interaction.response.send_message(self.render(), view=self)
+        msg = await interaction.original_response()
+        # a channel message handle keeps working after the 15-minute interaction token expires
+        self.message = interaction.channel.get_partial_message(msg.id)
+        self.ticker = asyncio.create_task(self._tick())
+
+    async def _tick(self):
+        # joins are coalesced into one lobby edit per RENDER_EVERY
+        while not self.is_finished():
+            await asyncio.sleep(RENDER_EVERY)
+            if self.dirty and not self.is_finished():
+                self.dirty = False
+                try:
+                    await self.message.edit(content=self.render(), view=self)
+                except discord.HTTPException:
+                    pass
+
+    @discord.ui.button(label="Join", style=discord.ButtonStyle.primary)
+    async def join_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id in self.names:
+            await interaction.response.send_message("You're already in!", ephemeral=True); return
+        if len(self.names) >= TOURNEY_MAX_PLAYERS:
+            await interaction.response.send_message("The bracket is full.", ephemeral=True); return
+        self.names[interaction.user.id] = interaction.user.display_name
+        self.dirty = True
+        await interaction.response.send_message(f"You joined! ({len(self.names)} players)", ephemeral=True)
+
+    @discord.ui.button(label="Leave", style=discord.ButtonStyle.secondary)
+    async def leave_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id == self.host.id:
+            await interaction.response.send_message("The host can't leave — let the lobby expire instead.", ephemeral=True); return
+        if self.names.pop(interaction.user.id, None) is None:
+            await interaction.response.send_message("You're not in the lobby.", ephemeral=True); return
+        self.dirty = True
+        await interaction.response.send_message("You left the lobby.", ephemeral=True)
+
+    @discord.ui.button(label="Start", style=discord.ButtonStyle.success)
+    async def start_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.host.id:
+            await interaction.response.send_message("Only the host can start.", ephemeral=True); return
+        if len(self.names) < 2:
+            await interaction.response.send_message("Need at least two players.", ephemeral=True); return
+        self.stop()
+        bracket = Bracket(list(self.names), best_of=self.best_of, pick_timeout=self.pick_timeout)
+        view = RPSTournamentView(self.message, dict(self.names), bracket)
+        await interaction.response.send_message(f"Starting with {len(self.names)} players!", ephemeral=True)
+        await view.start()
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(content="RPS tournament lobby expired.", view=None)
+            except discord.HTTPException:
+                pass
+
 class RPS(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -261,5 +492,17 @@ class RPS(commands.Cog):
         lobby = RPSLobbyView(inter.user, opponent=opponent)
         await lobby.send(inter)
 
+    @app_commands.command(name="rps-tournament", description="Open a Rock–Paper–Scissors knockout bracket anyone can join.")
+    @app_commands.describe(best_of="Throws per match: 1, 3 or 5 (default 1)",
+                           pick_timeout="Seconds to pick before forfeiting (10-120, default 30)")
+    @app_commands.choices(best_of=[app_commands.Choice(name=str(n), value=n) for n in (1, 3, 5)])
+    async def rps_tournament_cmd(self, inter: discord.Interaction, best_of: Optional[app_commands.Choice[int]] = None,
+                                 pick_timeout: Optional[app_commands.Range[int, 10, 120]] = 30):
+        if not isinstance(inter.user, discord.Member):
+            await inter.response.send_message("Tournaments run in servers only.", ephemeral=True)
+            return
+        lobby = RPSTournamentLobby(inter.user, best_of.value if best_of else 1, pick_timeout or 30)
+        await lobby.send(inter)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(RPS(bot))
@@ -1,41 +1,43 @@
 # cogs/tictactoe.py
-from typing import Optional
+from typing import Optional, Union
 import discord
 from discord.ext import commands
 from discord import app_commands
 from utils.common import make_embed
-
-T3_WIN = [(0,1,2),(3,4,5),(6,7,8),(0,3,6),(1,4,7),(2,5,8),(0,4,8),(2,4,6)]
+from utils import ttt_engine as E
+from utils.stats import STATS
 
 class TTT(discord.ui.View):
-    def __init__(self, inter: discord.Interaction, p2: discord.Member):
+    def __init__(self, inter: discord.Interaction, p2: Union[discord.Member, discord.ClientUser], vs_bot: bool = False,
+                 size: int = 3, k: int = 3):
         super().__init__(timeout=300.0)
         self.inter = inter
         self.p1 = inter.user
         self.p2 = p2
+        self.vs_bot = vs_bot
         self.turn = self.p1
-        self.board = [' '] * 9
+        self.board = E.Board(size, k)
+        self.cells = []
 
-        for i in range(9):
-            self.add_item(self.Cell(i, self))
+        for i in range(size * size):
+            cell = self.Cell(i, self)
+            self.cells.append(cell)
+            self.add_item(cell)
 
     class Cell(discord.ui.Button):
         def __init__(self, idx: int, game: 'TTT'):
-            super().__init__(label="⬜", style=discord.ButtonStyle.secondary, row=idx//3)
+            super().__init__(label="⬜", style=discord.ButtonStyle.secondary, row=idx // game.board.size)
             self.idx = idx
             self.game = game
         async def callback(self, interaction: discord.Interaction):
             g = self.game
             if interaction.user.id != g.turn.id:
                 await interaction.response.send_message("Not your turn.", ephemeral=True); return
-            if g.board[self.idx] != ' ':
+            if g.board.taken(self.idx):
                 await interaction.response.send_message("Cell already taken.", ephemeral=True); return
-            mark = 'X' if g.turn.id == g.p1.id else 'O'
-            g.board[self.idx] = mark
-            self.label = mark
-            self.style = discord.ButtonStyle.success if mark == 'X' else discord.ButtonStyle.danger
-            self.disabled = True
-            g.turn = g.p2 if g.turn.id == g.p1.id else g.p1
+            g._play(self.idx)
+            if g.vs_bot and not g.board.is_over():
+                g._play(g.board.bot_move())
 
             state = g._state_text()
             win = g._winner()
@@ -45,31 +47,54 @@ class TTT(discord.ui.View):
                         item.disabled = True
                 await interaction.response.edit_message(content=state + f"\n**Winner:** {win.mention}", view=g)
                 v = make_embed("Tic-Tac-Toe – Victory!", f"Winner: {win.mention}", discord.Color.green())
+                g._record(win.id)
                 await interaction.followup.send(embed=v)
                 g.stop()
-            elif ' ' not in g.board:
+            elif g.board.is_draw():
                 for item in g.children:
                     if isinstance(item, discord.ui.Button):
                         item.disabled = True
                 await interaction.response.edit_message(content=state + "\n**Draw!**", view=g)
                 v = make_embed("Tic-Tac-Toe – Draw", "No more moves left.", discord.Color.orange())
+                g._record(None)
                 await interaction.followup.send(embed=v)
                 g.stop()
             else:
                 await interaction.response.edit_message(content=state + f"\nTurn: {g.turn.mention}", view=g)
 
+    def _play(self, idx: int):
+        mark = 'X' if self.board.x_to_move() else 'O'
+        self.board.play(idx)
+        # only the played cell changes; the rest of the grid is left as is
+        cell = self.cells[idx]
+        cell.label = mark
+        cell.style = discord.ButtonStyle.success if mark == 'X' else discord.ButtonStyle.danger
+        cell.disabled = True
+        self.turn = self.p2 if self.turn.id == self.p1.id else self.p1
+
     def _winner(self) -> Optional[discord.Member]:
-        for a,b,c in T3_WIN:
-            if self.board[a] != ' ' and self.board[a] == self.board[b] == self.board[c]:
-                return self.p1 if self.board[a] == 'X' else self.p2
+        if self.board.winner == 'X':
+            return self.p1
+        if self.board.winner == 'O':
+            return self.p2
         return None
 
+    def _record(self, winner_id: Optional[int]):
+        for p in (self.p1, self.p2):
+            if self.vs_bot and p.id == self.p2.id:
+                continue
+            outcome = 0 if winner_id is None else (1 if p.id == winner_id else -1)
+            STATS.record("tictactoe", self.inter.guild_id, p.id, max(outcome, 0), outcome)
+
     def _state_text(self) -> str:
-        rows = [' | '.join(self.board[r*3:(r+1)*3]) for r in range(3)]
-        return "```\n" + "\n---------\n".join(rows) + "\n```"
+        n = self.board.size
+        rows = [' | '.join(self.board.mark(r*n + c) for c in range(n)) for r in range(n)]
+        return "```\n" + ("\n" + "-" * (4*n - 3) + "\n").join(rows) + "\n```"
 
     async def start(self):
-        e = make_embed("Tic-Tac-Toe", f"{self.p1.mention} (X) vs {self.p2.mention} (O)")
+        b = self.board
+        rule = f" · {b.size}×{b.size}, {b.k} in a row" if (b.size, b.k) != (3, 3) else ""
+        e = make_embed("Tic-Tac-Toe", f"{self.p1.mention} (X) vs {self.p2.mention} (O){rule}")
         await self.inter.response.send_message(
             content=self._state_text() + f"\nTurn: {self.turn.mention}",
             embed=e,
@@ -80,11 +105,25 @@ class TicTacToe(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @app_commands.command(name="tictactoe", description="Challenge someone to Tic-Tac-Toe.")
-    async def tictactoe_cmd(self, inter: discord.Interaction, opponent: discord.Member):
-        if opponent.bot:
+    @app_commands.command(name="tictactoe", description="Challenge someone to Tic-Tac-Toe, or leave opponent empty to play the bot.")
+    @app_commands.describe(
+        opponent="Who to play; leave empty (or pick me) to play the bot",
+        size="Board size: 3, 4 or 5 (default 3)",
+        win_length="Marks in a row needed to win (default 3 on 3×3, otherwise 4)"
+    )
+    async def tictactoe_cmd(self, inter: discord.Interaction, opponent: Optional[discord.Member] = None,
+                            size: Optional[app_commands.Range[int, 3, 5]] = 3,
+                            win_length: Optional[app_commands.Range[int, 3, 5]] = None):
+        size = size or 3
+        k = win_length or (3 if size == 3 else 4)
+        if k > size:
+            await inter.response.send_message(f"Win length can't exceed the board size ({size}).", ephemeral=True); return
+        if opponent is None or opponent.id == self.bot.user.id:
+            game = TTT(inter, self.bot.user, vs_bot=True, size=size, k=k)
+        elif opponent.bot:
             await inter.response.send_message("Pick a human opponent :)", ephemeral=True); return
-        game = TTT(inter, opponent)
+        else:
+            game = TTT(inter, opponent, size=size, k=k)
         await game.start()
 
 async def setup(bot: commands.Bot):
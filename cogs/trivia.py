@@ -7,10 +7,13 @@ import aiohttp
 import discord
 from discord.ext import commands
 from discord import app_commands
-from utils.common import DATA_DIR, load_trivia_local, make_embed
+from utils.common import make_embed
+from utils.content import CONTENT
 from utils import trivia_api as TA
+from utils.startup import WARMUPS
+from utils.stats import record_scores
 
-TRIVIA_FALLBACK = load_trivia_local(DATA_DIR / "trivia" / "trivia_questions.json")
+# local fallback questions live in data/trivia/ and hot-reload through CONTENT
 
 def q_embed(qobj: Dict, qnum: int, total: int, seconds: int, scores: Dict[int,int], category_name: Optional[str]) -> discord.Embed:
     cat = f" · {category_name}" if category_name else ""
@@ -118,8 +121,9 @@ class TriviaView(discord.ui.View):
                 self.bank, rc = await TA.fetch_questions(session, self.total_target, self.token, self.category_id)
 
         if not self.bank:
-            if TRIVIA_FALLBACK:
-                self.bank = random.sample(TRIVIA_FALLBACK, min(len(TRIVIA_FALLBACK), self.total_target))
+            fallback = CONTENT.get("trivia", self.inter.guild_id)
+            if fallback:
+                self.bank = random.sample(fallback, min(len(fallback), self.total_target))
                 self.category_name = self.category_name or "Local"
             else:
                 await self.msg.edit(embed=make_embed("Trivia", "Couldn't fetch questions and no local fallback."), view=None)
@@ -245,6 +249,7 @@ class TriviaView(discord.ui.View):
                 child.disabled = True
 
         emb = discord.Embed(title="Trivia – Finished", description=reason, color=discord.Color.dark_gold())
+        record_scores("trivia", self.inter.guild_id, self.scores)
         if self.scores:
             top = sorted(self.scores.items(), key=lambda kv: kv[1], reverse=True)
             lines = []
@@ -265,7 +270,14 @@ class Trivia(commands.Cog):
         self.bot = bot
 
     async def cog_load(self):
+        CONTENT.start()
+        # in the background: a slow OpenTDB shouldn't hold up connecting; numeric IDs work meanwhile
+        WARMUPS.start("trivia-categories", self._load_categories, owner="cogs.trivia")
+
+    async def _load_categories(self):
         await TA.load_categories()
+        if not TA.OTDB_CATEGORIES:
+            raise RuntimeError("OpenTDB categories unavailable")
 
     @app_commands.command(name="trivia", description="Play Kahoot-style trivia (timer, speed points, API-backed).")
     @app_commands.describe(
@@ -277,6 +289,8 @@ class Trivia(commands.Cog):
                          questions: Optional[app_commands.Range[int,1,50]] = 10,
                          timer: Optional[app_commands.Range[int,5,60]] = 15,
                          category: Optional[str] = None):
+        if category and not WARMUPS.ready("trivia-categories"):
+            await WARMUPS.wait("trivia-categories", timeout=1.5)
         cat_id, cat_name = TA.resolve_category_id(category)
         v = TriviaView(inter, total_q=questions or 10, seconds=timer or 15, category_id=cat_id, category_name=cat_name)
         await v.start()
@@ -2,21 +2,16 @@
 import random
 from typing import Optional
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from utils.common import DATA_DIR
+from utils.content import CONTENT
+from utils.shuffle_bag import BagDealer
 
-TRUTH_FILE = DATA_DIR / "truth_or_dare" / "truth.txt"
-DARE_FILE  = DATA_DIR / "truth_or_dare" / "dare.txt"
+# prompts live in data/truth_or_dare/ and hot-reload through CONTENT
 
-def _load(path):
-    try:
-        return [ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
-    except FileNotFoundError:
-        return []
-
-TRUTHS = _load(TRUTH_FILE)
-DARES  = _load(DARE_FILE)
+# per-channel shuffle bags: nothing repeats in a channel until every prompt has been seen
+TRUTH_BAGS = BagDealer(persist="truth_bags.json")
+DARE_BAGS  = BagDealer(persist="dare_bags.json")
 
 class TruthOrDareView(discord.ui.View):
     def __init__(self, inter: discord.Interaction):
@@ -26,9 +21,12 @@ class TruthOrDareView(discord.ui.View):
         self.msg: Optional[discord.Message] = None
 
     def _pick(self) -> str:
+        key = self.inter.channel_id or self.inter.user.id
         if self.kind == "truth":
-            return random.choice(TRUTHS) if TRUTHS else "No truths found."
-        return random.choice(DARES) if DARES else "No dares found."
+            truths = CONTENT.get("truths", self.inter.guild_id)
+            return truths[TRUTH_BAGS.draw(key, len(truths))] if truths else "No truths found."
+        dares = CONTENT.get("dares", self.inter.guild_id)
+        return dares[DARE_BAGS.draw(key, len(dares))] if dares else "No dares found."
 
     def _embed(self, text: str) -> discord.Embed:
         c = discord.Color.green() if self.kind == "truth" else discord.Color.red()
@@ -65,6 +63,20 @@ class TruthDare(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        CONTENT.start()
+        self.save_bags.start()
+
+    async def cog_unload(self):
+        self.save_bags.cancel()
+        TRUTH_BAGS.save()
+        DARE_BAGS.save()
+
+    @tasks.loop(minutes=10)
+    async def save_bags(self):
+        TRUTH_BAGS.save()
+        DARE_BAGS.save()
+
     @app_commands.command(name="truth", description="Get a random truth ☺️")
     async def truth_cmd(self, inter: discord.Interaction):
         v = TruthOrDareView(inter)
@@ -0,0 +1,98 @@
+# scripts/bench_blackjack.py
+# Hands per second: integer-card engine with a persistent shoe vs the old
+# per-game 52-card string deck and re-parsed hand values.
+#   python -m scripts.bench_blackjack --hands 200000 --hints 200
+import argparse
+import random
+import time
+
+from utils.blackjack_engine import Table
+from utils import blackjack_odds
+
+def _legacy_value(hand):
+    value = aces = 0
+    for rank, _ in hand:
+        if rank in ('J', 'Q', 'K'):
+            value += 10
+        elif rank == 'A':
+            aces += 1
+            value += 11
+        else:
+            value += int(rank)
+    while value > 21 and aces:
+        value -= 10
+        aces -= 1
+    return value
+
+def legacy_hand(rng: random.Random):
+    suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+    ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+    deck = [(r, s) for s in suits for r in ranks]
+    rng.shuffle(deck)
+    player = [deck.pop(), deck.pop()]
+    dealer = [deck.pop(), deck.pop()]
+    _legacy_value(player)  # state_text render
+    while _legacy_value(player) < 17:
+        player.append(deck.pop())
+        _legacy_value(player)
+    if _legacy_value(player) <= 21:
+        while _legacy_value(dealer) < 17:
+            dealer.append(deck.pop())
+    return _legacy_value(player), _legacy_value(dealer)
+
+def engine_hand(table: Table, uid: int = 1):
+    table.start_round([uid])
+    hand = table.hands[uid]
+    while hand.value() < 17:
+        table.hit(uid)
+    table.stand(uid) if not table.done[uid] else None
+    return table.finish()[uid]
+
+def bench_hints(n: int, decks: int):
+    """Hint latency over random opening hands, cold cache vs repeated press."""
+    table = Table(decks, 0.75, random.Random(11))
+    cold, warm, exact = [], [], 0
+    for _ in range(n):
+        table.start_round([1])
+        hand = table.hands[1]
+        blackjack_odds.dealer_dist.cache_clear()
+        blackjack_odds._hint_cached.cache_clear()
+        t = time.perf_counter()
+        h = blackjack_odds.hint(blackjack_odds.snapshot(hand, table.dealer, table.shoe))
+        cold.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        blackjack_odds.hint(blackjack_odds.snapshot(hand, table.dealer, table.shoe))
+        warm.append(time.perf_counter() - t)
+        exact += h.exact
+        table.finish()
+    for name, xs in (("cold", cold), ("repeat", warm)):
+        xs.sort()
+        print(f"hint {name:6s}  p50 {xs[len(xs) // 2] * 1000:6.1f} ms   p99 {xs[int(len(xs) * 0.99)] * 1000:6.1f} ms   max {xs[-1] * 1000:6.1f} ms")
+    print(f"exact for {exact}/{n} hands, the rest simulated")
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the Blackjack engine.")
+    ap.add_argument("--hands", type=int, default=200_000)
+    ap.add_argument("--decks", type=int, default=6)
+    ap.add_argument("--hints", type=int, default=0, help="also time N Hint computations")
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    t = time.perf_counter()
+    for _ in range(args.hands):
+        legacy_hand(rng)
+    legacy = args.hands / (time.perf_counter() - t)
+
+    table = Table(args.decks, 0.75, random.Random(7))
+    t = time.perf_counter()
+    for _ in range(args.hands):
+        engine_hand(table)
+    engine = args.hands / (time.perf_counter() - t)
+
+    print(f"legacy (fresh string deck):     {legacy:10.0f} hands/s")
+    print(f"engine ({args.decks}-deck int shoe):      {engine:10.0f} hands/s  ({engine / legacy:.1f}x)")
+    if args.hints:
+        bench_hints(args.hints, args.decks)
+
+if __name__ == "__main__":
+    main()
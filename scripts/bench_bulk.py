@@ -0,0 +1,123 @@
+# scripts/bench_bulk.py
+# Bulk member edits against a local stand-in for the Discord REST API:
+# per-guild member-edit buckets and a global limit, both answering 429 with
+# retry_after and sending X-RateLimit-* headers. Compares firing everything
+# at once, one request at a time, and BulkExecutor.
+#   python -m scripts.bench_bulk --members 200 --guilds 1 4
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from utils.bulk import BulkExecutor, RateLimited
+
+class FakeDiscord:
+    """Fixed-window buckets: `per_route` edits per `window` per guild, `global_rate` per second overall."""
+    def __init__(self, per_route: int, window: float, global_rate: int, latency: float):
+        self.per_route, self.window, self.global_rate, self.latency = per_route, window, global_rate, latency
+        self.buckets: Dict[str, Tuple[float, int]] = {}
+        self.global_window = (0.0, 0)
+        self.ok = 0
+        self.limited = 0
+
+    def _take(self, key: str, cap: int, window: float, state: Tuple[float, int]) -> Tuple[Tuple[float, int], int, float]:
+        now = time.monotonic()
+        start, used = state
+        if now - start >= window:
+            start, used = now, 0
+        return (start, used + 1), cap - used - 1, start + window - now
+
+    async def edit_member(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        guild = request.match_info["guild"]
+        self.global_window, g_left, g_reset = self._take("global", self.global_rate, 1.0, self.global_window)
+        if g_left < 0:
+            self.limited += 1
+            return web.json_response({"retry_after": g_reset, "global": True}, status=429,
+                                     headers={"X-RateLimit-Global": "true", "Retry-After": f"{g_reset:.3f}"})
+        state, left, reset = self._take(guild, self.per_route, self.window, self.buckets.get(guild, (0.0, 0)))
+        self.buckets[guild] = state
+        headers = {"X-RateLimit-Bucket": f"members:{guild}", "X-RateLimit-Limit": str(self.per_route),
+                   "X-RateLimit-Remaining": str(max(left, 0)), "X-RateLimit-Reset-After": f"{reset:.3f}"}
+        if left < 0:
+            self.limited += 1
+            return web.json_response({"retry_after": reset, "global": False}, status=429, headers=headers)
+        self.ok += 1
+        return web.json_response({}, headers=headers)
+
+async def call(session: aiohttp.ClientSession, url: str) -> Tuple[int, dict, dict]:
+    async with session.patch(url, json={"mute": True}) as r:
+        return r.status, dict(r.headers), await r.json()
+
+async def naive(session, base, jobs):
+    """Everything at once; sleep out each 429 and retry."""
+    async def one(g, u):
+        while True:
+            status, _, body = await call(session, f"{base}/guilds/{g}/members/{u}")
+            if status != 429:
+                return
+            await asyncio.sleep(body["retry_after"])
+    await asyncio.gather(*(one(g, u) for g, u in jobs))
+
+async def sequential(session, base, jobs):
+    """One at a time, waiting out the bucket when the headers say it's empty."""
+    for g, u in jobs:
+        while True:
+            status, headers, body = await call(session, f"{base}/guilds/{g}/members/{u}")
+            if status == 429:
+                await asyncio.sleep(body["retry_after"])
+                continue
+            if headers.get("X-RateLimit-Remaining") == "0":
+                await asyncio.sleep(float(headers["X-RateLimit-Reset-After"]))
+            break
+
+async def executor(session, base, jobs):
+    ex = BulkExecutor()
+
+    async def one(job):
+        g, u = job
+        status, headers, body = await call(session, f"{base}/guilds/{g}/members/{u}")
+        if "X-RateLimit-Remaining" in headers:
+            ex.hint(g, int(headers["X-RateLimit-Remaining"]), float(headers["X-RateLimit-Reset-After"]))
+        if status == 429:
+            raise RateLimited(body["retry_after"], g, body.get("global", False))
+
+    res = await ex.run(jobs, one, bucket=lambda job: job[0])
+    assert not res.failed, res.failed[:3]
+
+async def run(args):
+    print(f"{'guilds':>6} {'strategy':>10} | {'time':>7} {'edits/s':>8} {'429s':>6} {'429 rate':>8}")
+    for guilds in args.guilds:
+        jobs: List[Tuple[int, int]] = [(1 + i % guilds, i) for i in range(args.members)]
+        for name, strategy in (("naive", naive), ("sequential", sequential), ("executor", executor)):
+            fake = FakeDiscord(args.per_route, args.window, args.global_rate, args.latency)
+            app = web.Application()
+            app.router.add_patch("/guilds/{guild}/members/{user}", fake.edit_member)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+                t = time.perf_counter()
+                await strategy(session, f"http://127.0.0.1:{port}", jobs)
+                dt = time.perf_counter() - t
+            await runner.cleanup()
+            total = fake.ok + fake.limited
+            print(f"{guilds:>6} {name:>10} | {dt:>6.2f}s {fake.ok / dt:>8.1f} {fake.limited:>6} {fake.limited / total:>8.1%}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark bulk member edits against a fake rate-limited API.")
+    ap.add_argument("--members", type=int, default=200)
+    ap.add_argument("--guilds", type=int, nargs="+", default=[1, 4])
+    ap.add_argument("--per-route", type=int, default=10, help="edits per window per guild")
+    ap.add_argument("--window", type=float, default=1.0)
+    ap.add_argument("--global-rate", type=int, default=50, help="requests per second across all routes")
+    ap.add_argument("--latency", type=float, default=0.05, help="simulated round trip, seconds")
+    asyncio.run(run(ap.parse_args()))
+
+if __name__ == "__main__":
+    main()
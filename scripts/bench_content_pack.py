@@ -0,0 +1,87 @@
+# scripts/bench_content_pack.py
+# Loader benchmark: parse text/JSON sources at startup vs mmap the compiled
+# pack, for synthetic packs of growing size. Each measurement runs in a
+# fresh interpreter so RSS is not shared between them (Linux: reads /proc).
+#   python -m scripts.bench_content_pack --sizes 1000 100000 1000000
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from utils.content import PACK_FILE, SOURCES, _stamp
+from utils.content_pack import write_pack
+
+_CHILD = r"""
+import os, random, sys, time
+from pathlib import Path
+def rss_kib():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+root, mode = Path(sys.argv[1]), sys.argv[2]
+from utils.content import SOURCES, ContentRegistry, PACK_FILE
+if mode == "parse":
+    (root / PACK_FILE).rename(root / (PACK_FILE + ".off"))
+rss0 = rss_kib()
+t = time.perf_counter()
+reg = ContentRegistry(root)
+for name, (rel, parser) in SOURCES.items():
+    reg.register(name, rel, parser)
+load = time.perf_counter() - t
+rss = rss_kib() - rss0
+truths, trivia = reg.get("truths"), reg.get("trivia")
+rng = random.Random(1)
+idx = [rng.randrange(len(truths)) for _ in range(20000)]
+t = time.perf_counter()
+for i in idx:
+    truths[i]
+    trivia[i % len(trivia)]
+access = (time.perf_counter() - t) / len(idx) / 2
+if mode == "parse":
+    (root / (PACK_FILE + ".off")).rename(root / PACK_FILE)
+print(load, rss, access)
+"""
+
+def make_root(root: Path, n: int):
+    rng = random.Random(n)
+    words = "you your most what have ever done would rather secret tell show group dare truth friend time".split()
+    for name, (rel, _) in SOURCES.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if rel.endswith(".txt"):
+            path.write_text("\n".join(" ".join(rng.choices(words, k=12)) + f" #{i}" for i in range(n)), encoding="utf-8")
+        elif name == "trivia":
+            path.write_text(json.dumps([{"question": f"Question {i}: " + " ".join(rng.choices(words, k=8)),
+                                         "choices": ["a", "b", "c", "d"], "answer": i % 4} for i in range(n)]),
+                            encoding="utf-8")
+        else:
+            path.write_text(json.dumps([{"name": f"Station {i}", "url": f"https://example.invalid/{i}"} for i in range(n)]),
+                            encoding="utf-8")
+
+def run(root: Path, mode: str):
+    out = subprocess.run([sys.executable, "-c", _CHILD, str(root), mode], capture_output=True, text=True,
+                         cwd=Path(__file__).resolve().parents[1], check=True)
+    load, rss, access = out.stdout.split()[-3:]
+    return float(load), int(rss), float(access)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark parsing vs the compiled content pack.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    args = ap.parse_args()
+    print(f"{'items/source':>12}  {'mode':6} {'startup':>10} {'RSS +':>10} {'random get':>11}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_root(root, n)
+            sections = []
+            for name, (rel, parser) in SOURCES.items():
+                sections.append((name, _stamp(root / rel), parser((root / rel).read_text(encoding="utf-8"))))
+            write_pack(root / PACK_FILE, sections)
+            for mode in ("parse", "pack"):
+                load, rss, access = run(root, mode)
+                print(f"{n:>12,}  {mode:6} {load * 1000:8.1f}ms {rss / 1024:8.1f}MiB {access * 1e6:9.2f}µs")
+
+if __name__ == "__main__":
+    main()
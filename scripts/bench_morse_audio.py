@@ -0,0 +1,91 @@
+# scripts/bench_morse_audio.py
+# Morse audio: cached-buffer Keyer vs synthesizing every sample in Python,
+# for file output (8 kHz mono WAV) and voice streaming (48 kHz stereo frames).
+#   python -m scripts.bench_morse_audio --chars 1000 10000 100000
+import argparse
+import math
+import random
+import string
+import time
+
+from utils.morse import FILE_RATE, MORSE_CODE, RAMP_MS, VOICE_RATE, AMPLITUDE, Keyer
+
+def naive_render(text: str, wpm: int, tone: int, rate: int) -> bytes:
+    """Per-sample synthesis, the obvious way to write it."""
+    unit = int(round(rate * 1.2 / wpm))
+    ramp = int(rate * RAMP_MS / 1000)
+    out = bytearray()
+
+    def key(n):
+        for i in range(n):
+            env = 1.0
+            if i < ramp:
+                env = 0.5 * (1 - math.cos(math.pi * i / ramp))
+            elif i >= n - ramp:
+                env = 0.5 * (1 - math.cos(math.pi * (n - 1 - i) / ramp))
+            out.extend(int(AMPLITUDE * 32767 * env * math.sin(2 * math.pi * tone * i / rate)).to_bytes(2, "little", signed=True))
+
+    def gap(units):
+        out.extend(bytes(2 * units * unit))
+
+    for w, word in enumerate(text.upper().split()):
+        if w:
+            gap(7)
+        for c, ch in enumerate(word):
+            if c:
+                gap(3)
+            for s, sym in enumerate(MORSE_CODE.get(ch, "")):
+                if s:
+                    gap(1)
+                key(unit if sym == "." else 3 * unit)
+    return bytes(out)
+
+def make_text(n: int, rng: random.Random) -> str:
+    words, size = [], 0
+    while size < n:
+        w = "".join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(rng.randint(2, 9)))
+        words.append(w)
+        size += len(w) + 1
+    return " ".join(words)[:n]
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark Morse audio rendering.")
+    ap.add_argument("--chars", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--wpm", type=int, default=20)
+    ap.add_argument("--tone", type=int, default=600)
+    ap.add_argument("--naive-max", type=int, default=10000, help="skip the per-sample baseline above this length")
+    args = ap.parse_args()
+    rng = random.Random(1)
+
+    t = time.perf_counter()
+    k = Keyer(args.wpm, args.tone, VOICE_RATE, 2)
+    held = sum(len(b) for b in (k.dit, k.dah, k.gap, k.char_gap, k.word_gap))
+    print(f"voice keyer setup: {(time.perf_counter() - t) * 1000:.2f} ms, holds {held / 2**10:.0f} KiB")
+
+    print(f"{'chars':>8} {'audio':>9} | {'wav keyer':>10} {'naive':>10} {'speedup':>8} | {'voice frames':>12} {'x realtime':>10}")
+    for n in args.chars:
+        text = make_text(n, rng)
+        keyer = Keyer(args.wpm, args.tone, FILE_RATE)
+        t = time.perf_counter()
+        pcm = keyer.render(text)
+        wav_s = time.perf_counter() - t
+        audio = len(pcm) / 2 / FILE_RATE
+
+        naive = "-"
+        speed = "-"
+        if n <= args.naive_max:
+            t = time.perf_counter()
+            ref = naive_render(text, args.wpm, args.tone, FILE_RATE)
+            naive_s = time.perf_counter() - t
+            assert len(ref) == len(pcm)
+            naive, speed = f"{naive_s * 1000:.1f} ms", f"{naive_s / wav_s:.0f}x"
+
+        voice = Keyer(args.wpm, args.tone, VOICE_RATE, 2)
+        t = time.perf_counter()
+        frames = sum(1 for _ in voice.frames(text))
+        voice_s = time.perf_counter() - t
+        print(f"{n:>8} {audio / 60:>7.1f}m | {wav_s * 1000:>7.2f} ms {naive:>10} {speed:>8} | "
+              f"{frames:>12,} {frames * 0.02 / voice_s:>9,.0f}x")
+
+if __name__ == "__main__":
+    main()
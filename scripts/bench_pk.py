@@ -0,0 +1,46 @@
+# scripts/bench_pk.py
+# Recipient (X25519) encryption vs the scrypt passphrase path.
+#   python -m scripts.bench_pk --seconds 2
+import argparse
+import time
+
+from utils.crypto import (
+    decrypt_strong, decrypt_with_private_key, encrypt_strong, encrypt_to_recipients,
+    generate_keypair, kdf_cache_clear,
+)
+
+def _rate(fn, seconds: float) -> float:
+    n = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        fn()
+        n += 1
+    return n / (time.perf_counter() - t0)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark public-key vs scrypt encryption.")
+    ap.add_argument("--seconds", type=float, default=2.0, help="time per measurement")
+    ap.add_argument("--recipients", type=int, nargs="+", default=[1, 5, 25])
+    args = ap.parse_args()
+    msg = "meet me at the usual place at 9"
+
+    ct = encrypt_strong(msg, "passphrase")
+    enc = _rate(lambda: encrypt_strong(msg, "passphrase"), args.seconds)
+
+    def cold_decrypt():
+        kdf_cache_clear()
+        decrypt_strong(ct, "passphrase")
+    dec = _rate(cold_decrypt, args.seconds)
+    print(f"scrypt         encrypt {enc:9.0f}/s  decrypt {dec:9.0f}/s  ({1000 / dec:.2f} ms/decrypt, cache cleared)")
+
+    for n in args.recipients:
+        keys = [generate_keypair() for _ in range(n)]
+        pubs = [pub for _, pub in keys]
+        ct = encrypt_to_recipients(msg, pubs)
+        enc = _rate(lambda: encrypt_to_recipients(msg, pubs), args.seconds)
+        last_priv = keys[-1][0]  # worst case: our slot is last
+        dec = _rate(lambda: decrypt_with_private_key(ct, last_priv), args.seconds)
+        print(f"x25519 n={n:<3}   encrypt {enc:9.0f}/s  decrypt {dec:9.0f}/s  ({1e6 / dec:.0f} µs/decrypt, {len(ct)} chars)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# scripts/bench_rps_bracket.py
+# Drives a large RPS bracket with simulated players: engine throughput and
+# how many shared-message edits the batched ticker needs vs one per pick.
+#   python -m scripts.bench_rps_bracket --players 500 --best-of 3
+import argparse
+import random
+import time
+
+from utils.rps_bracket import Bracket, RPS_CHOICES, LIVE
+
+RENDER_EVERY = 2.5
+
+def main():
+    ap = argparse.ArgumentParser(description="Simulate a big RPS tournament.")
+    ap.add_argument("--players", type=int, default=500)
+    ap.add_argument("--best-of", type=int, default=3)
+    ap.add_argument("--afk", type=float, default=0.02, help="chance a player never picks (forfeits on timeout)")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    players = list(range(1, args.players + 1))
+    afk = {p for p in players if rng.random() < args.afk}
+    clock = 0.0
+    b = Bracket(players, best_of=args.best_of, pick_timeout=30.0, rng=random.Random(args.seed), now=clock)
+
+    picks = edits = 0
+    next_render = RENDER_EVERY
+    engine_s = 0.0
+    while b.champion is None:
+        # every live player picks at some point within the next second of simulated time
+        live = [p for p in b.by_player if p not in afk]
+        rng.shuffle(live)
+        clock += 1.0
+        t = time.perf_counter()
+        for p in live:
+            m = b.match_of(p)
+            if m is None or m.picked(p):
+                continue
+            b.pick(p, rng.choice(RPS_CHOICES), now=clock)
+            picks += 1
+        b.expire(clock)
+        engine_s += time.perf_counter() - t
+        if clock >= next_render:
+            next_render += RENDER_EVERY
+            if b.dirty:
+                b.dirty = False
+                edits += 1
+        if not live and not any(m.state == LIVE and m.deadline > clock for m in b.current):
+            clock = min((m.deadline for m in b.current if m.state == LIVE), default=clock)
+
+    print(f"{args.players} players, best of {args.best_of}: champion {b.champion} after {b.round_no} rounds")
+    print(f"picks:        {picks:,} ({picks / engine_s:,.0f} picks/s through the engine)")
+    print(f"simulated:    {clock / 60:.1f} min of play")
+    print(f"embed edits:  {edits} batched vs {picks} with one edit per pick ({picks / max(edits, 1):.0f}x fewer)")
+
+if __name__ == "__main__":
+    main()
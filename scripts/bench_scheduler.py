@@ -0,0 +1,84 @@
+# scripts/bench_scheduler.py
+# Persistent scheduler vs one sleeping task per pending action: memory for
+# N pending entries, reload time after a restart, and how many handler
+# calls it takes to drain entries that fall due together.
+#   python -m scripts.bench_scheduler --pending 50000
+import argparse
+import asyncio
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from utils.scheduler import Scheduler
+
+async def sleeping_tasks(n: int, rng: random.Random) -> int:
+    async def court(seconds):
+        await asyncio.sleep(seconds)
+    tracemalloc.start()
+    tasks = [asyncio.create_task(court(rng.uniform(3600, 86400))) for _ in range(n)]
+    await asyncio.sleep(0)
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return mem
+
+async def run(args):
+    rng = random.Random(1)
+    n = args.pending
+    print(f"sleeping tasks: {await sleeping_tasks(n, rng) / 2**20:.1f} MiB for {n:,} pending")
+
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "scheduler.sqlite3"
+        fired = []
+
+        async def handler(batch):
+            fired.append(len(batch))
+            return []
+
+        s = Scheduler(path)
+        await s.start(handler)
+        now = time.time()
+        t = time.perf_counter()
+        for i in range(n):
+            await s.schedule("unjail", 1 + i % 50, i, 7, now + rng.uniform(3600, 86400))
+        sched_s = time.perf_counter() - t
+        await s.close()
+
+        # restart: reload everything from disk
+        s = Scheduler(path)
+        tracemalloc.start()
+        t = time.perf_counter()
+        await s.start(handler)
+        load_s = time.perf_counter() - t
+        mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"scheduler: {mem / 2**20:.1f} MiB for {s.pending():,} pending, reloaded in {load_s * 1000:.0f} ms "
+              f"(schedule: {sched_s / n * 1e6:.0f} us each)")
+        await s.close()
+
+        # overdue after downtime: rewrite every due time into the past, restart, drain
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE pending SET due = ? - (id % 600)", (time.time(),))
+        conn.commit()
+        conn.close()
+        s = Scheduler(path)
+        t = time.perf_counter()
+        await s.start(handler)
+        while s.metrics["fired"] < n:
+            await asyncio.sleep(0.01)
+        drain_s = time.perf_counter() - t
+        print(f"overdue drain: {sum(fired):,} entries in {len(fired)} handler call(s), {drain_s * 1000:.0f} ms")
+        await s.close()
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the persistent scheduler.")
+    ap.add_argument("--pending", type=int, default=20000)
+    asyncio.run(run(ap.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# scripts/bench_shuffle_bag.py
+# Shuffle-bag dealer vs random.choice: draw cost, memory across many
+# channels, and how soon a channel sees its first repeat.
+#   python -m scripts.bench_shuffle_bag --channels 10000
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from utils.shuffle_bag import BagDealer
+
+def first_repeat(make_draw, n_trials: int = 2000) -> float:
+    """Average draws until something comes up twice, starting fresh each trial."""
+    total = 0
+    for _ in range(n_trials):
+        draw = make_draw()
+        seen, k = set(), 0
+        while True:
+            x = draw()
+            k += 1
+            if x in seen:
+                break
+            seen.add(x)
+        total += k
+    return total / n_trials
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the shuffle-bag dealer.")
+    ap.add_argument("--prompts", type=int, default=115)
+    ap.add_argument("--channels", type=int, default=10000)
+    ap.add_argument("--draws", type=int, default=1_000_000)
+    args = ap.parse_args()
+    n = args.prompts
+    rng = random.Random(1)
+
+    prompts = list(range(n))
+    t = time.perf_counter()
+    for _ in range(args.draws):
+        random.choice(prompts)
+    base = (time.perf_counter() - t) / args.draws
+
+    keys = [rng.randrange(args.channels) for _ in range(args.draws)]
+    tracemalloc.start()
+    dealer = BagDealer(rng=random.Random(1))
+    t = time.perf_counter()
+    for k in keys:
+        dealer.draw(k, n)
+    bag = (time.perf_counter() - t) / args.draws
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"draw: random.choice {base * 1e6:.2f} µs · dealer {bag * 1e6:.2f} µs (incl. per-channel lookup)")
+    print(f"memory: {len(dealer.bags):,} channels × {n} prompts = {mem / 1024 / 1024:.1f} MiB "
+          f"({mem / len(dealer.bags):.0f} B/channel)")
+    choice = first_repeat(lambda: (lambda: rng.randrange(n)))
+    def fresh_dealer():
+        d = BagDealer(rng=rng)
+        return lambda: d.draw(0, n)
+    dealt = first_repeat(fresh_dealer, 200)
+    print(f"draws until the first repeat: random.choice {choice:.1f} · dealer {dealt:.1f} (of {n} prompts)")
+
+if __name__ == "__main__":
+    main()
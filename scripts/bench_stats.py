@@ -0,0 +1,97 @@
+# scripts/bench_stats.py
+# Stats store: batched write-behind throughput vs one commit per result, then
+# leaderboard/rank latency once the tables hold millions of rows.
+#   python -m scripts.bench_stats --results 2000000 --users 200000
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from utils.stats import GLOBAL, Result, StatsStore
+
+GAMES = ("trivia", "rps", "tictactoe", "blackjack", "guess-song")
+
+def _results(n: int, users: int, guilds: int, rng: random.Random, hot: float = 0.0):
+    """Random results; with hot > 0 that share of them comes from the most active 1% of users."""
+    now = int(time.time())
+    active = max(users // 100, 1)
+    for _ in range(n):
+        uid = rng.randrange(1, active + 1) if rng.random() < hot else rng.randrange(1, users + 1)
+        yield Result(now, rng.choice(GAMES), uid % guilds + 1, uid,
+                     rng.randrange(0, 20), rng.choice((1, 0, -1, None)))
+
+def _ms(xs):
+    xs = sorted(xs)
+    return f"p50 {statistics.median(xs) * 1000:.2f} ms  p99 {xs[int(len(xs) * 0.99)] * 1000:.2f} ms"
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the SQLite stats store.")
+    ap.add_argument("--results", type=int, default=2_000_000)
+    ap.add_argument("--users", type=int, default=200_000)
+    ap.add_argument("--guilds", type=int, default=50)
+    ap.add_argument("--batch", type=int, default=500)
+    ap.add_argument("--queries", type=int, default=2000)
+    args = ap.parse_args()
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StatsStore(Path(tmp) / "stats.sqlite3")
+        t = time.perf_counter()
+        batch = []
+        for r in _results(args.results, args.users, args.guilds, rng):
+            batch.append(r)
+            if len(batch) >= args.batch:
+                store.write_batch(batch)
+                batch = []
+        if batch:
+            store.write_batch(batch)
+        dt = time.perf_counter() - t
+        db = store._db()
+        rows = db.execute("SELECT COUNT(*) FROM totals").fetchone()[0]
+        print(f"fill: {args.results:,} results -> {rows:,} total rows in {dt:.1f}s "
+              f"({args.results / dt:,.0f} results/s)")
+
+        # same full database: one transaction per result vs the write-behind batches.
+        # Uniform users touch new pages every time; real traffic is mostly regulars.
+        for label, hot in (("uniform users", 0.0), ("90% regulars", 0.9)):
+            sample = list(_results(20 * args.batch, args.users, args.guilds, rng, hot))
+            t = time.perf_counter()
+            for r in sample[:2000]:
+                store.write_batch([r])
+            per_row = 2000 / (time.perf_counter() - t)
+            t = time.perf_counter()
+            for i in range(0, len(sample), args.batch):
+                store.write_batch(sample[i:i + args.batch])
+            batched = len(sample) / (time.perf_counter() - t)
+            print(f"{label}: commit per result {per_row:9,.0f}/s   batches of {args.batch} {batched:9,.0f}/s "
+                  f"({batched / per_row:.1f}x)")
+
+        # what the game sees: record() is an append, vs a synchronous commit on the event loop
+        n = 100_000
+        t = time.perf_counter()
+        for r in _results(n, args.users, args.guilds, rng):
+            store._queue.append(r)
+        store._queue.clear()
+        print(f"record() on the hot path: {(time.perf_counter() - t) / n * 1e6:.2f} µs vs "
+              f"~{1e6 / per_row:.0f} µs for an inline commit")
+
+        plan = db.execute("EXPLAIN QUERY PLAN SELECT COUNT(*) FROM totals WHERE game = ? AND guild_id = ? AND points > ?",
+                          ("all", GLOBAL, 10)).fetchall()
+        print("rank plan:", "; ".join(p[-1] for p in plan))
+
+        for label, game, guild in (("global, all games", "all", GLOBAL), ("one guild, trivia", "trivia", 1)):
+            top, rank = [], []
+            for _ in range(args.queries):
+                t = time.perf_counter()
+                store.top(game, guild, 10)
+                top.append(time.perf_counter() - t)
+                t = time.perf_counter()
+                store.rank(game, guild, rng.randrange(1, args.users + 1))
+                rank.append(time.perf_counter() - t)
+            print(f"{label:18s} top-10: {_ms(top)}   rank: {_ms(rank)}")
+        store.close_db()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# scripts/bench_ttt.py
+# Tic-Tac-Toe engine: table build time, bot move lookup, win checks vs the old list scan.
+#   python -m scripts.bench_ttt
+import random
+import time
+
+T0 = time.perf_counter()
+from utils import ttt_engine as E  # noqa: E402  (import time is part of the benchmark)
+BUILD_S = time.perf_counter() - T0
+
+def _old_winner(board):
+    for a, b, c in E.T3_WIN:
+        if board[a] != ' ' and board[a] == board[b] == board[c]:
+            return board[a]
+    return None
+
+def _positions(n: int):
+    rng = random.Random(1)
+    keys = list(E.BEST_MOVES)
+    out = []
+    for _ in range(n):
+        k = rng.choice(keys)
+        out.append((k & E.FULL, k >> 9))
+    return out
+
+def main():
+    n = 200_000
+    pos = _positions(n)
+    boards = [['X' if x >> i & 1 else 'O' if o >> i & 1 else ' ' for i in range(9)] for x, o in pos]
+    print(f"table build (import): {BUILD_S * 1000:.1f} ms, {len(E.BEST_MOVES)} positions")
+
+    t = time.perf_counter()
+    for x, o in pos:
+        E.best_move(x, o)
+    dt = time.perf_counter() - t
+    print(f"bot move lookup:      {dt / n * 1e6:.2f} µs/move")
+
+    t = time.perf_counter()
+    for x, o in pos:
+        E.is_win(x) or E.is_win(o)
+    dt_bits = time.perf_counter() - t
+    t = time.perf_counter()
+    for b in boards:
+        _old_winner(b)
+    dt_list = time.perf_counter() - t
+    print(f"win check bitboard:   {dt_bits / n * 1e6:.2f} µs   list scan: {dt_list / n * 1e6:.2f} µs")
+    bench_nxn(4, 4)
+    bench_nxn(5, 4)
+
+def _full_scan(bits: int, n: int, k: int) -> bool:
+    for r in range(n):
+        for c in range(n):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                if all(0 <= r + dr * t < n and 0 <= c + dc * t < n and bits >> ((r + dr * t) * n + c + dc * t) & 1
+                       for t in range(k)):
+                    return True
+    return False
+
+def bench_nxn(n: int = 5, k: int = 4, games: int = 2000):
+    rng = random.Random(2)
+    games_moves = []
+    for _ in range(games):
+        b = E.Board(n, k)
+        seq = []
+        while not b.is_over():
+            i = rng.choice(b.free_cells())
+            b.play(i)
+            seq.append(i)
+        games_moves.append(seq)
+    total = sum(len(s) for s in games_moves)
+
+    t = time.perf_counter()
+    for seq in games_moves:
+        b = E.Board(n, k)
+        for i in seq:
+            b.play(i)
+    dt_inc = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for seq in games_moves:
+        x = o = 0
+        for m, i in enumerate(seq):
+            if m % 2 == 0:
+                x |= 1 << i
+                _full_scan(x, n, k)
+            else:
+                o |= 1 << i
+                _full_scan(o, n, k)
+    dt_scan = time.perf_counter() - t
+    print(f"{n}x{n} k={k} move+win: incremental {dt_inc / total * 1e6:.2f} µs   full rescan {dt_scan / total * 1e6:.2f} µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# scripts/build_content_pack.py
+# Compile every content source in data/ into data/content.pack, an indexed
+# binary pack the bot memory-maps at startup instead of parsing the files.
+# Sources are validated with the same parsers the hot-reloader uses.
+#   python -m scripts.build_content_pack
+import argparse
+import time
+from pathlib import Path
+
+from utils.common import DATA_DIR
+from utils.content import PACK_FILE, SOURCES, _stamp
+from utils.content_pack import write_pack
+
+def build(root: Path, out: Path):
+    sections = []
+    for name, (rel, parser) in SOURCES.items():
+        path = root / rel
+        stamp = _stamp(path)
+        if stamp is None:
+            print(f"skip {name}: {rel} not found")
+            continue
+        items = parser(path.read_text(encoding="utf-8"))
+        sections.append((name, stamp, items))
+        print(f"{name:12s} {len(items):>8,} items  ({rel})")
+    write_pack(out, sections)
+
+def main():
+    ap = argparse.ArgumentParser(description="Build data/content.pack.")
+    ap.add_argument("--root", type=Path, default=DATA_DIR)
+    args = ap.parse_args()
+    out = args.root / PACK_FILE
+    t = time.perf_counter()
+    build(args.root, out)
+    print(f"wrote {out} ({out.stat().st_size / 1024:.1f} KiB) in {(time.perf_counter() - t) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
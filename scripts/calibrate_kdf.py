@@ -0,0 +1,26 @@
+# scripts/calibrate_kdf.py
+# Pick the strongest scrypt params that fit a latency/memory budget on this host.
+#   python -m scripts.calibrate_kdf --target-ms 100 --max-mem-mb 64
+import argparse
+
+from utils.crypto import calibrate_scrypt
+
+def main():
+    ap = argparse.ArgumentParser(description="Calibrate scrypt parameters for SC2 ciphertexts.")
+    ap.add_argument("--target-ms", type=float, default=100.0, help="max median derive time per attempt")
+    ap.add_argument("--max-mem-mb", type=int, default=64, help="max scrypt memory per attempt")
+    ap.add_argument("--r", type=int, nargs="+", default=[8], help="block sizes to try")
+    ap.add_argument("--p", type=int, nargs="+", default=[1], help="parallelism values to try")
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    best = calibrate_scrypt(args.target_ms, args.max_mem_mb * 1024 * 1024, args.r, args.p, args.rounds)
+    print(f"log2(N)={best['log_n']} r={best['r']} p={best['p']}  "
+          f"{best['ms']:.1f} ms  {best['mem'] / 2**20:.1f} MiB")
+    print("\nAdd to .env:")
+    print(f"SCRYPT_LOG_N={best['log_n']}")
+    print(f"SCRYPT_R={best['r']}")
+    print(f"SCRYPT_P={best['p']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# scripts/load_kdf_admission.py
+# Load test: a few users spam wrong-seed decrypts while normal users decrypt
+# once each. Reports event-loop lag, rejections and legit-user latency,
+# with and without admission control.
+#   python -m scripts.load_kdf_admission --spammers 5 --spam 200 --users 20
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from utils.admission import AdmissionRejected, KDFAdmission
+from utils.crypto import decrypt_strong, encrypt_strong, kdf_cache_clear
+
+async def _lag_probe(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - t0 - interval) * 1000)
+
+async def _attempt(adm, uid: int, gid: int, ct: str, seed: str):
+    if adm is None:
+        return decrypt_strong(ct, seed)  # old behaviour: scrypt on the event loop
+    result = await adm.submit(uid, gid, decrypt_strong, ct, seed)
+    adm.refund(uid, gid)
+    return result
+
+async def run(args, use_admission: bool):
+    kdf_cache_clear()
+    ct = encrypt_strong("hello", "right")
+    adm = KDFAdmission() if use_admission else None
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_lag_probe(stop, lags))
+    outcomes = {"ok": 0, "bad_seed": 0, "rejected": 0}
+    legit_ms = []
+
+    async def spammer(uid: int):
+        for _ in range(args.spam):
+            try:
+                await _attempt(adm, uid, 1, ct, f"wrong-{random.random()}")
+            except AdmissionRejected:
+                outcomes["rejected"] += 1
+            except ValueError:
+                outcomes["bad_seed"] += 1
+            await asyncio.sleep(0)
+
+    async def user(uid: int):
+        await asyncio.sleep(random.uniform(0, args.window))
+        t0 = time.perf_counter()
+        try:
+            await _attempt(adm, uid, 1 + uid % 3, ct, "right")
+            outcomes["ok"] += 1
+            legit_ms.append((time.perf_counter() - t0) * 1000)
+        except AdmissionRejected:
+            outcomes["rejected"] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[spammer(10_000 + i) for i in range(args.spammers)],
+                         *[user(i) for i in range(args.users)])
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await probe
+
+    lags.sort()
+    label = "admission" if use_admission else "no admission"
+    print(f"--- {label}: {elapsed:.2f}s")
+    print(f"loop lag ms: p50 {lags[len(lags) // 2]:.1f}  p99 {lags[int(len(lags) * 0.99)]:.1f}  max {lags[-1]:.1f}")
+    print(f"outcomes: {outcomes}")
+    if legit_ms:
+        print(f"legit decrypt ms: median {statistics.median(legit_ms):.1f}  max {max(legit_ms):.1f}")
+    if adm is not None:
+        print(f"metrics: {adm.stats()}")
+        adm.shutdown()
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test KDF admission control.")
+    ap.add_argument("--spammers", type=int, default=5)
+    ap.add_argument("--spam", type=int, default=200, help="wrong-seed attempts per spammer")
+    ap.add_argument("--users", type=int, default=20)
+    ap.add_argument("--window", type=float, default=2.0, help="seconds over which normal users arrive")
+    args = ap.parse_args()
+    asyncio.run(run(args, use_admission=False))
+    asyncio.run(run(args, use_admission=True))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# scripts/sim_blackjack.py
+# Headless Blackjack: plays hands through utils.blackjack_engine.Table (the
+# same hit/stand/finish rules as the Discord view) on a process pool.
+#   python -m scripts.sim_blackjack --hands 2000000 --strategy basic
+#   python -m scripts.sim_blackjack --strategy mypkg.mymod:my_strategy --seats 3
+# A strategy is fn(hand, dealer_up) -> True to hit, where dealer_up is the
+# upcard's value (2..11). Results depend only on --seed and --chunk, not on
+# the worker count.
+import argparse
+import importlib
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
+
+from utils.blackjack_engine import RANK_VALUES, Hand, Table
+
+Strategy = Callable[[Hand, int], bool]
+
+def dealer_mimic(hand: Hand, up: int) -> bool:
+    return hand.value() < 17
+
+def never_bust(hand: Hand, up: int) -> bool:
+    return hand.hard <= 11
+
+def always_stand(hand: Hand, up: int) -> bool:
+    return False
+
+def basic(hand: Hand, up: int) -> bool:
+    """Hit/stand part of basic strategy (this game has no doubles or splits)."""
+    v = hand.value()
+    if hand.is_soft():
+        return v <= 17 or (v == 18 and up >= 9)
+    if v <= 11:
+        return True
+    if v == 12:
+        return not 4 <= up <= 6
+    if v <= 16:
+        return up >= 7
+    return False
+
+STRATEGIES: Dict[str, Strategy] = {
+    "basic": basic,
+    "dealer": dealer_mimic,
+    "never-bust": never_bust,
+    "stand": always_stand,
+}
+
+def resolve_strategy(name: str) -> Strategy:
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    if ":" not in name:
+        raise SystemExit(f"unknown strategy {name!r}; use one of {', '.join(STRATEGIES)} or module:function")
+    mod, attr = name.split(":", 1)
+    return getattr(importlib.import_module(mod), attr)
+
+# per-hand tallies; every hand settles at -1/0/+1 (even money)
+FIELDS = ("win", "push", "lose", "player_bust", "dealer_bust")
+
+def play_chunk(job) -> List[int]:
+    """Play `hands` hands on a fresh table seeded by (seed, chunk index)."""
+    seed, index, hands, strategy_name, seats, decks, penetration = job
+    strategy = resolve_strategy(strategy_name)
+    table = Table(decks, penetration, random.Random(seed * 1_000_003 + index))
+    ids = list(range(seats))
+    tally = [0] * len(FIELDS)
+    rounds = -(-hands // seats)
+    for _ in range(rounds):
+        table.start_round(ids)
+        up = RANK_VALUES[table.dealer.cards[0] % 13]
+        for uid in ids:
+            hand = table.hands[uid]
+            while not table.done[uid] and strategy(hand, up):
+                table.hit(uid)
+            if not table.done[uid]:
+                table.stand(uid)
+        results = table.finish()
+        dealer_bust = table.dealer.is_bust()
+        for uid, outcome in results.items():
+            tally[0 if outcome > 0 else 1 if outcome == 0 else 2] += 1
+            tally[3] += table.hands[uid].is_bust()
+            tally[4] += dealer_bust and not table.hands[uid].is_bust()
+    return tally
+
+def main():
+    ap = argparse.ArgumentParser(description="Simulate Blackjack hands with the bot's engine.")
+    ap.add_argument("--hands", type=int, default=1_000_000)
+    ap.add_argument("--strategy", default="basic", help=f"{', '.join(STRATEGIES)} or module:function")
+    ap.add_argument("--seats", type=int, default=1, help="players at the table (1-7)")
+    ap.add_argument("--decks", type=int, default=6)
+    ap.add_argument("--penetration", type=float, default=0.75)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--chunk", type=int, default=50_000, help="hands per job (each job has its own seed)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+    resolve_strategy(args.strategy)  # fail fast on a bad name
+    seats = min(max(args.seats, 1), 7)
+
+    jobs, left, i = [], args.hands, 0
+    while left > 0:
+        n = min(args.chunk, left)
+        jobs.append((args.seed, i, n, args.strategy, seats, args.decks, args.penetration))
+        left -= n
+        i += 1
+
+    t = time.perf_counter()
+    total = [0] * len(FIELDS)
+    if args.workers <= 1:
+        parts = map(play_chunk, jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=args.workers)
+        parts = pool.map(play_chunk, jobs)
+    for part in parts:
+        total = [a + b for a, b in zip(total, part)]
+    if args.workers > 1:
+        pool.shutdown()
+    dt = time.perf_counter() - t
+
+    hands = total[0] + total[1] + total[2]
+    win, push, lose = (x / hands for x in total[:3])
+    edge = lose - win                          # even-money payouts
+    se = math.sqrt(max(win + lose - (win - lose) ** 2, 0.0) / hands)
+    print(f"strategy {args.strategy} · {seats} seat(s) · {args.decks} decks · {len(jobs)} jobs on {args.workers} worker(s)")
+    print(f"hands:        {hands:,} in {dt:.2f}s ({hands / dt:,.0f} hands/s)")
+    print(f"house edge:   {edge:+.3%} ± {1.96 * se:.3%} (95%)")
+    print(f"outcomes:     win {win:.2%} · push {push:.2%} · lose {lose:.2%}")
+    print(f"busts:        player {total[3] / hands:.2%} · dealer (vs live hands) {total[4] / hands:.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# utils/admission.py
+import asyncio
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float = 0.0):
+        super().__init__(f"{reason}, try again in {math.ceil(retry_after)}s" if retry_after > 0 else reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self, burst: float, rate: float, now: float):
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+class _Ticket:
+    __slots__ = ("user_id", "guild_id", "enqueued", "future", "job")
+
+    def __init__(self, user_id: int, guild_id: Optional[int]):
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.enqueued = 0.0
+        self.future: Optional[asyncio.Future] = None
+        self.job = None
+
+class KDFAdmission:
+    """
+    Admission control for expensive KDF calls (scrypt).
+
+    - token buckets per user and per guild cap the attempt rate,
+    - a bounded queue rejects immediately when full instead of piling up,
+    - queued jobs are served round-robin by user so one spammer can't
+      starve everyone else,
+    - jobs run on a small dedicated thread pool, keeping the event loop free.
+    """
+    BUCKET_PRUNE_AT = 10000
+
+    def __init__(self, workers: int = 2, max_queue: int = 32, per_user_pending: int = 2,
+                 user_burst: float = 5, user_rate: float = 0.2,
+                 guild_burst: float = 30, guild_rate: float = 2.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_user_pending = per_user_pending
+        self.user_burst, self.user_rate = user_burst, user_rate
+        self.guild_burst, self.guild_rate = guild_burst, guild_rate
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kdf")
+        self._user_buckets: Dict[int, _Bucket] = {}
+        self._guild_buckets: Dict[int, _Bucket] = {}
+        self._pending: Dict[int, Deque[_Ticket]] = {}   # user -> queued tickets
+        self._ring: Deque[int] = deque()               # users with queued work, round-robin order
+        self._user_inflight: Dict[int, int] = {}
+        self._queued = 0
+        self._running = 0
+        self._tasks = set()
+        self.metrics: Dict[str, float] = {
+            "admitted": 0, "rejected_user": 0, "rejected_guild": 0, "rejected_queue": 0,
+            "completed": 0, "failed": 0, "refunded": 0, "peak_queued": 0, "wait_total_ms": 0.0,
+        }
+
+    def _take(self, buckets: Dict[int, _Bucket], key: int, burst: float, rate: float, now: float) -> float:
+        b = buckets.get(key)
+        if b is None:
+            if len(buckets) >= self.BUCKET_PRUNE_AT:
+                self._prune(buckets, burst, rate, now)
+            b = buckets[key] = _Bucket(burst)
+        b.refill(burst, rate, now)
+        if b.tokens < 1:
+            return (1 - b.tokens) / rate
+        return 0.0
+
+    @staticmethod
+    def _prune(buckets: Dict[int, _Bucket], burst: float, rate: float, now: float):
+        for k in [k for k, b in buckets.items() if b.tokens + (now - b.updated) * rate >= burst]:
+            del buckets[k]
+
+    def _admit(self, user_id: int, guild_id: Optional[int]) -> _Ticket:
+        now = time.monotonic()
+        if self._queued >= self.max_queue:
+            self.metrics["rejected_queue"] += 1
+            raise AdmissionRejected("too busy right now", 1.0)
+        if self._user_inflight.get(user_id, 0) >= self.per_user_pending:
+            self.metrics["rejected_user"] += 1
+            raise AdmissionRejected("you already have attempts in progress", 1.0)
+        wait = self._take(self._user_buckets, user_id, self.user_burst, self.user_rate, now)
+        if wait:
+            self.metrics["rejected_user"] += 1
+            raise AdmissionRejected("too many attempts", wait)
+        if guild_id is not None:
+            wait = self._take(self._guild_buckets, guild_id, self.guild_burst, self.guild_rate, now)
+            if wait:
+                self.metrics["rejected_guild"] += 1
+                raise AdmissionRejected("this server is making too many attempts", wait)
+            self._guild_buckets[guild_id].tokens -= 1
+        self._user_buckets[user_id].tokens -= 1
+        self._user_inflight[user_id] = self._user_inflight.get(user_id, 0) + 1
+        self.metrics["admitted"] += 1
+        return _Ticket(user_id, guild_id)
+
+    def refund(self, user_id: int, guild_id: Optional[int] = None):
+        """Give the rate budget back, e.g. after a successful decrypt."""
+        b = self._user_buckets.get(user_id)
+        if b is not None:
+            b.tokens = min(self.user_burst, b.tokens + 1)
+        if guild_id is not None:
+            b = self._guild_buckets.get(guild_id)
+            if b is not None:
+                b.tokens = min(self.guild_burst, b.tokens + 1)
+        self.metrics["refunded"] += 1
+
+    async def submit(self, user_id: int, guild_id: Optional[int], fn: Callable[..., Any], *args) -> Any:
+        """
+        Run fn(*args) on the KDF pool once admitted and return its result.
+        Raises AdmissionRejected right away (before any await) when over budget
+        or when the queue is full.
+        """
+        ticket = self._admit(user_id, guild_id)
+        ticket.future = asyncio.get_running_loop().create_future()
+        ticket.job = (fn, args)
+        ticket.enqueued = time.monotonic()
+        q = self._pending.get(ticket.user_id)
+        if q is None:
+            q = self._pending[ticket.user_id] = deque()
+            self._ring.append(ticket.user_id)
+        q.append(ticket)
+        self._queued += 1
+        self.metrics["peak_queued"] = max(self.metrics["peak_queued"], self._queued)
+        self._pump()
+        return await ticket.future
+
+    def _pump(self):
+        while self._running < self.workers and self._ring:
+            uid = self._ring.popleft()
+            q = self._pending[uid]
+            ticket = q.popleft()
+            if q:
+                self._ring.append(uid)
+            else:
+                del self._pending[uid]
+            self._queued -= 1
+            self._running += 1
+            task = asyncio.ensure_future(self._execute(ticket))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, ticket: _Ticket):
+        fn, args = ticket.job
+        self.metrics["wait_total_ms"] += (time.monotonic() - ticket.enqueued) * 1000
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except Exception as e:
+            self.metrics["failed"] += 1
+            if not ticket.future.done():
+                ticket.future.set_exception(e)
+        else:
+            self.metrics["completed"] += 1
+            if not ticket.future.done():
+                ticket.future.set_result(result)
+        finally:
+            self._running -= 1
+            left = self._user_inflight.get(ticket.user_id, 1) - 1
+            if left > 0:
+                self._user_inflight[ticket.user_id] = left
+            else:
+                self._user_inflight.pop(ticket.user_id, None)
+            self._pump()
+
+    def stats(self) -> Dict[str, float]:
+        m = dict(self.metrics)
+        done = m["completed"] + m["failed"]
+        m["queued"] = self._queued
+        m["running"] = self._running
+        m["avg_wait_ms"] = (m["wait_total_ms"] / done) if done else 0.0
+        return m
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,180 @@
+# utils/blackjack_engine.py
+import random
+import time
+from typing import Dict, List, Optional
+
+# Cards are ints 0..51: rank = c % 13 (0 = '2' ... 8 = '10', 9-11 = J/Q/K, 12 = A), suit = c // 13.
+RANK_LABELS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+SUIT_EMOJIS = ('♥️', '♦️', '♣️', '♠️')
+RANK_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11)
+ACE = 12
+# hard value (ace = 1) per card id, so adding a card is one index
+CARD_HARD = tuple(1 if c % 13 == ACE else RANK_VALUES[c % 13] for c in range(52))
+
+DEALER_STANDS_ON = 17   # dealer draws below 17, stands on all 17s (soft included)
+MAX_SEATS = 7
+
+def card_label(c: int) -> str:
+    return f"`{RANK_LABELS[c % 13]}{SUIT_EMOJIS[c // 13]}`"
+
+class Hand:
+    """Cards plus running hard total and ace count; value() is O(1)."""
+    __slots__ = ("cards", "hard", "aces")
+
+    def __init__(self):
+        self.cards: List[int] = []
+        self.hard = 0
+        self.aces = 0
+
+    def add(self, c: int):
+        self.cards.append(c)
+        self.hard += CARD_HARD[c]
+        if c % 13 == ACE:
+            self.aces += 1
+
+    def value(self) -> int:
+        # at most one ace can count as 11
+        if self.aces and self.hard + 10 <= 21:
+            return self.hard + 10
+        return self.hard
+
+    def is_soft(self) -> bool:
+        return bool(self.aces) and self.hard + 10 <= 21
+
+    def is_bust(self) -> bool:
+        return self.hard > 21
+
+    def __len__(self):
+        return len(self.cards)
+
+class Shoe:
+    """
+    Multi-deck shoe with a cut card: after the cut card is reached the shoe
+    is reshuffled before the next round. `counts[rank]` tracks what is left.
+    Cards dealt since begin_round() are on the table; if the shoe runs dry
+    mid-round only the discards are reshuffled, so nothing showing can be
+    dealt again.
+    """
+    def __init__(self, decks: int = 6, penetration: float = 0.75, rng: Optional[random.Random] = None):
+        self.decks = max(1, decks)
+        self.penetration = min(max(penetration, 0.1), 1.0)
+        self.rng = rng or random.Random()
+        self.cards: List[int] = []
+        self.pos = 0
+        self.cut = 0
+        self.counts: List[int] = []
+        self.on_table: List[int] = []
+        self.shuffle()
+
+    def shuffle(self):
+        self.cards = list(range(52)) * self.decks
+        self.rng.shuffle(self.cards)
+        self.pos = 0
+        self.cut = int(len(self.cards) * self.penetration)
+        self.counts = [4 * self.decks] * 13
+
+    def begin_round(self):
+        """Everything dealt before now has been discarded."""
+        self.on_table = []
+
+    def _reshuffle_discards(self):
+        left = [self.decks] * 52
+        for c in self.on_table:
+            left[c] -= 1
+        self.cards = [c for c in range(52) for _ in range(left[c])]
+        self.rng.shuffle(self.cards)
+        self.pos = 0
+        self.cut = 0   # the next round starts from a full shoe
+        self.counts = [0] * 13
+        for c in self.cards:
+            self.counts[c % 13] += 1
+
+    def needs_shuffle(self) -> bool:
+        return self.pos >= self.cut
+
+    def remaining(self) -> int:
+        return len(self.cards) - self.pos
+
+    def draw(self) -> int:
+        if self.pos >= len(self.cards):
+            # ran dry mid-round (tiny shoe, full table): reshuffle what isn't on the table
+            self._reshuffle_discards()
+        c = self.cards[self.pos]
+        self.pos += 1
+        self.counts[c % 13] -= 1
+        self.on_table.append(c)
+        return c
+
+def dealer_play(dealer: Hand, shoe: Shoe):
+    while dealer.value() < DEALER_STANDS_ON:
+        dealer.add(shoe.draw())
+
+def settle(player: Hand, dealer: Hand) -> int:
+    """+1 player wins, 0 push, -1 dealer wins (a player bust loses even if the dealer busts)."""
+    pv, dv = player.value(), dealer.value()
+    if pv > 21:
+        return -1
+    if dv > 21:
+        return 1
+    return (pv > dv) - (pv < dv)
+
+class Table:
+    """
+    Shared game state for one channel: one shoe that persists across rounds,
+    the dealer hand and one hand per seated player.
+    """
+    def __init__(self, decks: int = 6, penetration: float = 0.75, rng: Optional[random.Random] = None):
+        self.shoe = Shoe(decks, penetration, rng)
+        self.dealer = Hand()
+        self.hands: Dict[int, Hand] = {}
+        self.done: Dict[int, bool] = {}
+        self.in_round = False
+        self.acted = False   # joining closes once anyone has hit or stood
+        self.used = time.monotonic()
+
+    def start_round(self, player_ids: List[int]):
+        if self.shoe.needs_shuffle():
+            self.shoe.shuffle()
+        self.shoe.begin_round()
+        self.used = time.monotonic()
+        self.dealer = Hand()
+        self.hands = {uid: Hand() for uid in player_ids[:MAX_SEATS]}
+        self.done = {uid: False for uid in self.hands}
+        self.in_round = True
+        self.acted = False
+        for _ in range(2):
+            for h in self.hands.values():
+                h.add(self.shoe.draw())
+            self.dealer.add(self.shoe.draw())
+
+    def can_join(self, uid: int) -> bool:
+        return self.in_round and not self.acted and uid not in self.hands and len(self.hands) < MAX_SEATS
+
+    def join(self, uid: int):
+        h = Hand()
+        h.add(self.shoe.draw())
+        h.add(self.shoe.draw())
+        self.hands[uid] = h
+        self.done[uid] = False
+
+    def hit(self, uid: int) -> Hand:
+        self.acted = True
+        h = self.hands[uid]
+        h.add(self.shoe.draw())
+        if h.is_bust():
+            self.done[uid] = True
+        return h
+
+    def stand(self, uid: int):
+        self.acted = True
+        self.done[uid] = True
+
+    def all_done(self) -> bool:
+        return all(self.done.values())
+
+    def finish(self) -> Dict[int, int]:
+        """Dealer plays out (unless every player busted) and each seat is settled."""
+        if any(not h.is_bust() for h in self.hands.values()):
+            dealer_play(self.dealer, self.shoe)
+        self.in_round = False
+        return {uid: settle(h, self.dealer) for uid, h in self.hands.items()}
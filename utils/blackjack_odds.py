@@ -0,0 +1,233 @@
+# utils/blackjack_odds.py
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from utils.blackjack_engine import ACE, DEALER_STANDS_ON, Hand, Shoe
+
+# Odds work on value classes, not cards: index 0 = ace, 1..8 = 2..9, 9 = ten/J/Q/K.
+# A shoe composition is a 10-tuple of counts, which is also the cache key.
+_RANK_TO_CLASS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 9, 9, 0)
+_SINGLE_DECK = (4, 4, 4, 4, 4, 4, 4, 4, 4, 16)
+
+# dealer result slots: final 17, 18, 19, 20, 21, bust
+_BUST = 5
+
+EXACT_NODE_BUDGET = 80     # player states for the exact Hit recursion before falling back to simulation
+MC_TRIALS = 20000
+MC_DEPTH = 16              # cards per trial; more than player + dealer can use
+
+class Odds(NamedTuple):
+    win: float
+    push: float
+    lose: float
+    bust: float    # player bust for Hit, dealer bust for Stand
+
+    @property
+    def ev(self) -> float:
+        return self.win - self.lose
+
+class Hint(NamedTuple):
+    stand: Odds
+    hit: Odds
+    exact: bool    # False when Hit came from the Monte Carlo fallback
+
+    @property
+    def best(self) -> str:
+        return "Hit" if self.hit.ev > self.stand.ev else "Stand"
+
+def composition(shoe: Shoe) -> List[int]:
+    counts = [0] * 10
+    for rank, n in enumerate(shoe.counts):
+        counts[_RANK_TO_CLASS[rank]] += n
+    return counts
+
+def _total(hard: int, soft: bool) -> int:
+    return hard + 10 if soft and hard + 10 <= 21 else hard
+
+@lru_cache(maxsize=50_000)
+def dealer_dist(hard: int, soft: bool, counts: Tuple[int, ...]) -> Tuple[float, ...]:
+    """
+    P(dealer finishes on 17..21, bust) from (hard total, holds an ace) drawing
+    without replacement from `counts`. Cached per composition, so repeat
+    hints in the same round are lookups.
+    """
+    total = _total(hard, soft)
+    if hard > 21:
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+    if total >= DEALER_STANDS_ON:
+        out = [0.0] * 6
+        out[total - 17] = 1.0
+        return tuple(out)
+    n = sum(counts)
+    if n == 0:
+        # shoe ran dry: the engine reshuffles, so draw from a fresh deck
+        counts, n = _SINGLE_DECK, 52
+    out = [0.0] * 6
+    for i, c in enumerate(counts):
+        if not c:
+            continue
+        p = c / n
+        rest = counts[:i] + (c - 1,) + counts[i + 1:]
+        sub = dealer_dist(hard + i + 1, soft or i == 0, rest)
+        for j in range(6):
+            out[j] += p * sub[j]
+    return tuple(out)
+
+def _stand(total: int, dealer: Tuple[float, ...]) -> Odds:
+    if total > 21:
+        return Odds(0.0, 0.0, 1.0, 1.0)
+    win, push = dealer[_BUST], 0.0
+    for slot in range(5):
+        final = 17 + slot
+        if total > final:
+            win += dealer[slot]
+        elif total == final:
+            push += dealer[slot]
+    return Odds(win, push, 1.0 - win - push, dealer[_BUST])
+
+class _Budget(Exception):
+    pass
+
+class _Solver:
+    """Exact Hit-vs-Stand over shoe composition; each player state is solved once."""
+
+    def __init__(self, up_hard: int, up_soft: bool, budget: int):
+        self.up_hard, self.up_soft = up_hard, up_soft
+        self.budget = budget
+        self.memo: Dict[Tuple, Tuple[Odds, Odds]] = {}
+
+    def stand(self, hard: int, soft: bool, counts: Tuple[int, ...]) -> Odds:
+        return _stand(_total(hard, soft), dealer_dist(self.up_hard, self.up_soft, counts))
+
+    def best(self, hard: int, soft: bool, counts: Tuple[int, ...]) -> Odds:
+        if hard > 21:
+            return Odds(0.0, 0.0, 1.0, 1.0)
+        if _total(hard, soft) == 21:
+            return self.stand(hard, soft, counts)
+        s, h = self.solve(hard, soft, counts)
+        return h if h.ev > s.ev else s
+
+    def solve(self, hard: int, soft: bool, counts: Tuple[int, ...]) -> Tuple[Odds, Odds]:
+        key = (hard, soft, counts)
+        got = self.memo.get(key)
+        if got is not None:
+            return got
+        if len(self.memo) >= self.budget:
+            raise _Budget
+        stand = self.stand(hard, soft, counts)
+        n = sum(counts) or 52
+        src = counts if sum(counts) else _SINGLE_DECK
+        win = push = lose = bust = 0.0
+        for i, c in enumerate(src):
+            if not c:
+                continue
+            p = c / n
+            nh = hard + i + 1
+            if nh > 21:
+                lose += p
+                bust += p
+                continue
+            sub = self.best(nh, soft or i == 0, src[:i] + (c - 1,) + src[i + 1:])
+            win += p * sub.win
+            push += p * sub.push
+            lose += p * sub.lose
+        hit = Odds(win, push, lose, bust)
+        self.memo[key] = (stand, hit)
+        return stand, hit
+
+def _mc_hit(hard: int, soft: bool, up_hard: int, up_soft: bool, counts: List[int],
+            trials: int, rng: np.random.Generator) -> Odds:
+    """
+    Vectorized simulation of Hit: one card, then basic-strategy play (hit hard
+    <=11, hard 12-16 against 7+, soft <=17), then the dealer to 17.
+    """
+    deck = np.repeat(np.arange(10, dtype=np.int8), counts)
+    if deck.size < MC_DEPTH:
+        deck = np.concatenate([deck, np.repeat(np.arange(10, dtype=np.int8), _SINGLE_DECK)])
+    draws = rng.permuted(np.tile(deck, (trials, 1)), axis=1)[:, :MC_DEPTH].astype(np.int16) + 1
+    rows = np.arange(trials)
+    pos = np.zeros(trials, dtype=np.int16)
+
+    p_hard = np.full(trials, hard, dtype=np.int16)
+    p_soft = np.full(trials, soft)
+    up_total = _total(up_hard, up_soft)
+    hitting = np.ones(trials, dtype=bool)   # the forced first hit
+    first_bust = None
+    while hitting.any():
+        card = draws[rows, pos]
+        p_hard = np.where(hitting, p_hard + card, p_hard)
+        p_soft |= hitting & (card == 1)
+        pos += hitting
+        busted = p_hard > 21
+        if first_bust is None:
+            first_bust = busted.mean()
+        total = np.where(p_soft & (p_hard + 10 <= 21), p_hard + 10, p_hard)
+        is_soft = total != p_hard
+        want = np.where(is_soft, total <= 17, (total <= 11) | ((total <= 16) & (up_total >= 7)))
+        hitting = hitting & ~busted & want & (pos < MC_DEPTH)
+
+    d_hard = np.full(trials, up_hard, dtype=np.int16)
+    d_soft = np.full(trials, up_soft)
+    drawing = np.ones(trials, dtype=bool)
+    while drawing.any():
+        card = draws[rows, np.minimum(pos, MC_DEPTH - 1)]
+        d_hard = np.where(drawing, d_hard + card, d_hard)
+        d_soft |= drawing & (card == 1)
+        pos += drawing
+        d_total = np.where(d_soft & (d_hard + 10 <= 21), d_hard + 10, d_hard)
+        drawing = drawing & (d_total < DEALER_STANDS_ON) & (pos < MC_DEPTH)
+
+    p_total = np.where(p_soft & (p_hard + 10 <= 21), p_hard + 10, p_hard)
+    p_bust = p_hard > 21
+    d_bust = d_hard > 21
+    win = ~p_bust & (d_bust | (p_total > d_total))
+    push = ~p_bust & ~d_bust & (p_total == d_total)
+    w, pu = float(win.mean()), float(push.mean())
+    return Odds(w, pu, 1.0 - w - pu, float(first_bust))
+
+class HintState(NamedTuple):
+    """Everything hint() reads from a live table, copied out so it can go to a worker thread."""
+    hard: int
+    soft: bool
+    up: int                  # dealer upcard rank, 0..12
+    comp: Tuple[int, ...]    # unseen composition: the shoe plus the dealer's hole card
+
+def snapshot(player: Hand, dealer: Hand, shoe: Shoe) -> HintState:
+    """
+    Take on the event loop, before handing off. The hole card is unseen from
+    the player's side, so it goes back into the composition.
+    """
+    counts = composition(shoe)
+    if len(dealer.cards) > 1:
+        counts[_RANK_TO_CLASS[dealer.cards[1] % 13]] += 1
+    return HintState(player.hard, bool(player.aces), dealer.cards[0] % 13, tuple(counts))
+
+def _solve(state: HintState, budget: int, rng: np.random.Generator) -> Hint:
+    hard, soft, up, comp = state
+    up_hard, up_soft = _RANK_TO_CLASS[up] + 1, up == ACE
+    solver = _Solver(up_hard, up_soft, budget)
+    try:
+        stand, hit = solver.solve(hard, soft, comp)
+        return Hint(stand, hit, True)
+    except _Budget:
+        stand = solver.stand(hard, soft, comp)
+        hit = _mc_hit(hard, soft, up_hard, up_soft, list(comp), MC_TRIALS, rng)
+        return Hint(stand, hit, False)
+
+@lru_cache(maxsize=4096)
+def _hint_cached(state: HintState, budget: int) -> Hint:
+    return _solve(state, budget, np.random.default_rng())
+
+def hint(state: HintState, budget: int = EXACT_NODE_BUDGET,
+         rng: Optional[np.random.Generator] = None) -> Hint:
+    """
+    Hit vs Stand odds for a snapshot() of the player's hand against the
+    dealer's upcard. Results are cached per state, exact or simulated, so
+    pressing Hint again in the same spot is a lookup even after a big
+    recursion has cycled dealer_dist's cache; pass `rng` to bypass it.
+    """
+    if rng is None:
+        return _hint_cached(state, budget)
+    return _solve(state, budget, rng)
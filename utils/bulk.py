@@ -0,0 +1,157 @@
+# utils/bulk.py
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import discord
+
+class RateLimited(Exception):
+    """Raised by an action that got a 429; bucket None means the global limit."""
+    def __init__(self, retry_after: float, bucket: Optional[Hashable] = None, is_global: bool = False):
+        super().__init__(f"rate limited for {retry_after:.2f}s")
+        self.retry_after = retry_after
+        self.bucket = bucket
+        self.is_global = is_global
+
+def discord_retry_after(exc: BaseException) -> Optional[Tuple[float, bool]]:
+    """(retry_after, is_global) if `exc` is a 429 from discord.py, else None."""
+    if isinstance(exc, RateLimited):
+        return exc.retry_after, exc.is_global
+    if isinstance(exc, discord.RateLimited):
+        return exc.retry_after, False
+    if isinstance(exc, discord.HTTPException) and exc.status == 429:
+        headers = getattr(exc.response, "headers", {}) or {}
+        try:
+            after = float(headers.get("Retry-After", 1.0))
+        except ValueError:
+            after = 1.0
+        return after, headers.get("X-RateLimit-Global") == "true"
+    return None
+
+class BulkResult:
+    __slots__ = ("total", "done", "failed", "rate_limited", "started", "finished")
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed: List[Tuple[Any, BaseException]] = []
+        self.rate_limited = 0   # 429s seen (each one was retried)
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+class BulkExecutor:
+    """
+    Runs one action per item with bounded, adaptive concurrency.
+    - At most `limit` actions are in flight. It starts at `concurrency`,
+      halves on every 429 and creeps back up by one after `limit` clean
+      successes (AIMD), never above `max_concurrency`.
+    - A 429 parks its bucket (or everything, for a global limit) for
+      retry_after and puts the item back; other buckets keep going.
+    - hint() lets an action pass on X-RateLimit-Remaining/Reset-After. A
+      bucket then only gets as many new requests as it has room for, minus
+      the ones already in flight, until it resets.
+    Other errors fail just that item, after `max_attempts` for rate limits.
+    """
+    def __init__(self, concurrency: int = 4, max_concurrency: int = 16, max_attempts: int = 5,
+                 classify: Callable[[BaseException], Optional[Tuple[float, bool]]] = discord_retry_after):
+        self.limit = concurrency
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.classify = classify
+        self._inflight = 0
+        self._streak = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self._buckets: Dict[Hashable, Tuple[int, float]] = {}   # bucket -> (remaining, monotonic reset time)
+        self._busy: Dict[Hashable, int] = {}                    # bucket -> requests in flight
+        self._global_until = 0.0
+
+    def hint(self, bucket: Hashable, remaining: int, reset_after: float):
+        self._buckets[bucket] = (remaining, time.monotonic() + reset_after)
+
+    def _park(self, bucket: Hashable, after: float):
+        until = time.monotonic() + after
+        self._buckets[bucket] = (0, max(until, self._buckets.get(bucket, (0, 0.0))[1]))
+
+    async def _enter_bucket(self, bucket: Hashable):
+        while True:
+            now = time.monotonic()
+            until = self._global_until
+            remaining, reset = self._buckets.get(bucket, (1, 0.0))
+            if now < reset and remaining - self._busy.get(bucket, 0) <= 0:
+                until = max(until, reset)
+            if until <= now:
+                self._busy[bucket] = self._busy.get(bucket, 0) + 1
+                return
+            await asyncio.sleep(until - now)
+
+    async def _acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._inflight < self.limit)
+            self._inflight += 1
+
+    async def _release(self):
+        async with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    async def run(self, items: Iterable[Any], action: Callable[[Any], Awaitable[Any]],
+                  bucket: Callable[[Any], Hashable] = lambda item: None,
+                  progress: Optional[Callable[[BulkResult], None]] = None) -> BulkResult:
+        self._cond = asyncio.Condition()
+        queue = deque((item, 0) for item in items)
+        result = BulkResult(len(queue))
+        active: set = set()
+
+        async def one(item: Any, attempt: int):
+            key = bucket(item)
+            entered = False
+            try:
+                await self._enter_bucket(key)
+                entered = True
+                await action(item)
+            except Exception as e:
+                limited = self.classify(e)
+                if limited is None or attempt + 1 >= self.max_attempts:
+                    result.failed.append((item, e))
+                else:
+                    after, is_global = limited
+                    result.rate_limited += 1
+                    if is_global:
+                        self._global_until = max(self._global_until, time.monotonic() + after)
+                    else:
+                        self._park(key, after)
+                    self.limit = max(1, self.limit // 2)
+                    self._streak = 0
+                    queue.appendleft((item, attempt + 1))
+                    return
+            else:
+                result.done += 1
+                self._streak += 1
+                if self._streak >= self.limit and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._streak = 0
+            finally:
+                if entered:
+                    self._busy[key] -= 1
+                await self._release()
+            if progress is not None:
+                progress(result)
+
+        while queue or active:
+            if not queue:
+                await asyncio.wait(active, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            await self._acquire()
+            item, attempt = queue.popleft()
+            task = asyncio.create_task(one(item, attempt))
+            active.add(task)
+            task.add_done_callback(active.discard)
+        result.finished = time.monotonic()
+        if progress is not None:
+            progress(result)
+        return result
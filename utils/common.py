@@ -1,11 +1,31 @@
 # utils/common.py
 from pathlib import Path
 import json
-from typing import List, Dict
+import os
+import tempfile
+from typing import Any, List, Dict
+import aiohttp
 import discord
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data"
+STATE_DIR = BASE_DIR / "state"  # runtime state written by the bot (not in git)
+
+def load_json_state(name: str, default: Any) -> Any:
+    try:
+        return json.loads((STATE_DIR / name).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return default
+    except Exception:
+        return default
+
+def save_json_state(name: str, obj: Any):
+    """Write atomically so a crash mid-write never leaves a truncated file."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    path = STATE_DIR / name
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(obj), encoding="utf-8")
+    os.replace(tmp, path)
 
 def load_lines(path: Path) -> List[str]:
     try:
@@ -13,22 +33,21 @@ def load_lines(path: Path) -> List[str]:
     except FileNotFoundError:
         return []
 
+def valid_trivia_item(item: Any) -> bool:
+    return (
+        isinstance(item, dict)
+        and isinstance(item.get("question"), str)
+        and isinstance(item.get("choices"), list)
+        and len(item["choices"]) == 4
+        and all(isinstance(c, str) for c in item["choices"])
+        and isinstance(item.get("answer"), int)
+        and 0 <= item["answer"] < 4
+    )
+
 def load_trivia_local(path: Path) -> List[Dict]:
     try:
         data = json.loads(path.read_text(encoding="utf-8"))
-        good = []
-        for item in data:
-            if (
-                isinstance(item, dict)
-                and isinstance(item.get("question"), str)
-                and isinstance(item.get("choices"), list)
-                and len(item["choices"]) == 4
-                and all(isinstance(c, str) for c in item["choices"])
-                and isinstance(item.get("answer"), int)
-                and 0 <= item["answer"] < 4
-            ):
-                good.append(item)
-        return good
+        return [item for item in data if valid_trivia_item(item)]
     except FileNotFoundError:
         return []
     except Exception:
@@ -36,3 +55,14 @@ def load_trivia_local(path: Path) -> List[Dict]:
 
 def make_embed(title: str, desc: str = "", color: discord.Color = discord.Color.blurple()):
     return discord.Embed(title=title, description=desc, color=color)
+
+async def download_attachment(attachment: discord.Attachment) -> tempfile.SpooledTemporaryFile:
+    """Stream an attachment into a temp file instead of holding it all in RAM."""
+    fp = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    async with aiohttp.ClientSession() as session:
+        async with session.get(attachment.url) as r:
+            r.raise_for_status()
+            async for chunk in r.content.iter_chunked(64 * 1024):
+                fp.write(chunk)
+    fp.seek(0)
+    return fp
@@ -0,0 +1,227 @@
+# utils/content.py
+import asyncio
+import json
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.common import DATA_DIR, valid_trivia_item
+from utils.content_pack import PackFile, open_pack
+
+POLL_EVERY = 5.0          # seconds between mtime checks
+OVERRIDES_DIR = "overrides"  # data/overrides/<guild_id>/<same relative path>
+MAX_PROMPT_LEN = 4000     # must fit an embed description
+PACK_FILE = "content.pack"   # built by `python -m scripts.build_content_pack`
+
+# --- parsers: text -> items, raising ValueError when the file is unusable ---
+
+def parse_lines(text: str) -> List[str]:
+    items = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    too_long = [i for i, ln in enumerate(items, 1) if len(ln) > MAX_PROMPT_LEN]
+    if too_long:
+        raise ValueError(f"line(s) {too_long[:5]} longer than {MAX_PROMPT_LEN} characters")
+    return items
+
+def parse_trivia(text: str) -> List[Dict]:
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise ValueError("expected a JSON list of questions")
+    return [item for item in data if valid_trivia_item(item)]
+
+def parse_stations(text: str) -> List[Dict]:
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise ValueError("expected a JSON list of stations")
+    return [s for s in data if isinstance(s, dict) and isinstance(s.get("name"), str) and isinstance(s.get("url"), str)]
+
+class Overlay(Sequence):
+    """A guild's view of a pack: the shared base items followed by its own extras, without copying the base."""
+    __slots__ = ("base", "extra")
+
+    def __init__(self, base: Sequence, extra: Sequence):
+        self.base = base
+        self.extra = extra
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.extra)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self.base)
+        if i < 0:
+            i += len(self)
+        if 0 <= i < n:
+            return self.base[i]
+        return self.extra[i - n]
+
+class _Pack:
+    __slots__ = ("path", "parser", "items", "stamp", "version")
+
+    def __init__(self, path: Path, parser: Callable[[str], List[Any]]):
+        self.path = path
+        self.parser = parser
+        self.items: Sequence = ()   # tuple, or a PackSection from the compiled pack
+        self.stamp: Optional[Tuple[int, int]] = None   # (mtime_ns, size) of the loaded file
+        self.version = 0
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _read(pack: _Pack) -> Tuple:
+    return tuple(pack.parser(pack.path.read_text(encoding="utf-8")))
+
+class ContentRegistry:
+    """
+    Named content packs backed by files under data/. At startup a pack is
+    served straight from data/content.pack (mmap) when its section was built
+    from the current source file; otherwise the source is parsed. A watcher
+    task polls mtimes, re-parses changed files on a worker thread and swaps
+    the new items in with a single assignment, so readers never see a
+    half-loaded pack. A bad edit (parse error, or nothing valid left) keeps
+    the old version. Per-guild override files add items on top of the base
+    pack.
+    """
+    def __init__(self, root: Path = DATA_DIR, poll_every: float = POLL_EVERY):
+        self.root = root
+        self.poll_every = poll_every
+        # compiled pack: sections whose source is unchanged are served from the mapping, unparsed
+        self._compiled: Optional[PackFile] = open_pack(root / PACK_FILE)
+        self._compiled_stamp = _stamp(root / PACK_FILE)
+        self._packs: Dict[str, _Pack] = {}
+        self._overrides: Dict[Tuple[str, int], _Pack] = {}
+        self._overlays: Dict[Tuple[str, int], Tuple[int, int, Overlay]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.reloads = 0
+
+    def register(self, name: str, rel_path: str, parser: Callable[[str], List[Any]]):
+        """Register and load synchronously, so content is there at import time like before."""
+        pack = self._packs[name] = _Pack(self.root / rel_path, parser)
+        pack.stamp = _stamp(pack.path)
+        section = self._compiled.sections.get(name) if self._compiled else None
+        if section is not None and section.stamp == pack.stamp:
+            pack.items = section
+        else:
+            if section is not None:
+                print(f"[content] {name}: source changed since the pack was built, parsing it")
+            try:
+                pack.items = _read(pack)
+            except Exception as e:
+                print(f"[content] {name}: {e}")
+        self._scan_overrides()
+
+    def get(self, name: str, guild_id: Optional[int] = None) -> Sequence:
+        pack = self._packs[name]
+        if guild_id is None:
+            return pack.items
+        ov = self._overrides.get((name, guild_id))
+        if ov is None or not ov.items:
+            return pack.items
+        cached = self._overlays.get((name, guild_id))
+        if cached and cached[0] == pack.version and cached[1] == ov.version:
+            return cached[2]
+        overlay = Overlay(pack.items, ov.items)
+        self._overlays[(name, guild_id)] = (pack.version, ov.version, overlay)
+        return overlay
+
+    def version(self, name: str) -> int:
+        return self._packs[name].version
+
+    # -- watching -----------------------------------------------------------
+
+    def start(self):
+        """Idempotent; every cog that uses content calls this from cog_load."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _scan_overrides(self):
+        base = self.root / OVERRIDES_DIR
+        try:
+            guild_dirs = [d for d in os.scandir(base) if d.is_dir() and d.name.isdigit()]
+        except OSError:
+            guild_dirs = []
+        seen = set()
+        for d in guild_dirs:
+            for name, pack in self._packs.items():
+                path = Path(d.path) / pack.path.relative_to(self.root)
+                if path.exists():
+                    key = (name, int(d.name))
+                    seen.add(key)
+                    if key not in self._overrides:
+                        # parse it now, like register() does, rather than serving nothing until the next poll
+                        ov = _Pack(path, pack.parser)
+                        ov.stamp = _stamp(path)
+                        try:
+                            ov.items = _read(ov)
+                        except Exception as e:
+                            print(f"[content] {name}@{d.name}: {e}")
+                        self._overrides[key] = ov
+        for key in [k for k in self._overrides if k not in seen]:
+            del self._overrides[key]
+            self._overlays.pop(key, None)
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_every)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"[content] watcher error: {e}")
+
+    async def check(self) -> List[str]:
+        """One polling pass; returns the names of packs that were reloaded."""
+        await asyncio.to_thread(self._scan_overrides)
+        changed = []
+        stamp = _stamp(self.root / PACK_FILE)
+        if stamp is not None and stamp != self._compiled_stamp:
+            # pack rebuilt: move every pack whose source still matches onto the new mapping
+            self._compiled_stamp = stamp
+            compiled = await asyncio.to_thread(open_pack, self.root / PACK_FILE)
+            if compiled is not None:
+                self._compiled = compiled
+                for name, pack in self._packs.items():
+                    section = compiled.sections.get(name)
+                    if section is not None and section.stamp == pack.stamp:
+                        pack.items = section
+                        pack.version += 1
+                        changed.append(name)
+        for label, pack in [*self._packs.items(), *((f"{n}@{g}", p) for (n, g), p in self._overrides.items())]:
+            stamp = _stamp(pack.path)
+            if stamp is None or stamp == pack.stamp:
+                continue
+            try:
+                items = await asyncio.to_thread(_read, pack)
+                if not items:
+                    raise ValueError("no valid items")
+            except Exception as e:
+                pack.stamp = stamp   # don't retry the same broken file every poll
+                print(f"[content] {label}: keeping version {pack.version}, new file rejected: {e}")
+                continue
+            pack.items, pack.stamp = items, stamp
+            pack.version += 1
+            self.reloads += 1
+            changed.append(label)
+            print(f"[content] reloaded {label}: {len(items)} items (v{pack.version})")
+        return changed
+
+SOURCES: Dict[str, Tuple[str, Callable[[str], List[Any]]]] = {
+    "truths": ("truth_or_dare/truth.txt", parse_lines),
+    "dares": ("truth_or_dare/dare.txt", parse_lines),
+    "rice_purity": ("rice_purity/rice_purity_questions.txt", parse_lines),
+    "trivia": ("trivia/trivia_questions.json", parse_trivia),
+    "stations": ("radio/radio_stations.json", parse_stations),
+}
+
+CONTENT = ContentRegistry()
+for _name, (_rel, _parser) in SOURCES.items():
+    CONTENT.register(_name, _rel, _parser)
@@ -0,0 +1,118 @@
+# utils/content_pack.py
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Layout (little endian):
+#   magic "GNP1" | u32 section count
+#   per section: u8 kind | u16 name length | u64 count | u64 offsets pos | u64 blob pos
+#                | u64 source mtime_ns | u64 source size | name (utf-8)
+#   per section: (count + 1) u64 offsets relative to its blob, then the blob
+# kind 0 = utf-8 text items, 1 = one JSON document per item.
+_MAGIC = b"GNP1"
+_HEAD = struct.Struct("<4sI")
+_ENTRY = struct.Struct("<BHQQQQQ")
+TEXT, JSON = 0, 1
+
+class PackSection(Sequence):
+    """Items of one section, decoded from the mapping on access; nothing is read up front."""
+    __slots__ = ("_pack", "_offsets", "_blob", "_count", "kind", "stamp")
+
+    def __init__(self, pack: "PackFile", kind: int, count: int, offsets_pos: int, blob_pos: int,
+                 stamp: Tuple[int, int]):
+        self._pack = pack   # keeps the mapping alive while anyone holds this section
+        raw = pack.view[offsets_pos:offsets_pos + 8 * (count + 1)]
+        if sys.byteorder == "little":
+            self._offsets = raw.cast("Q")   # zero-copy: the file is little endian too
+        else:
+            self._offsets = array("Q", raw.tobytes())
+            self._offsets.byteswap()
+        self._blob = blob_pos
+        self._count = count
+        self.kind = kind
+        self.stamp = stamp
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        a, b = self._offsets[i], self._offsets[i + 1]
+        raw = self._pack.mm[self._blob + a:self._blob + b]
+        return raw.decode("utf-8") if self.kind == TEXT else json.loads(raw)
+
+class PackFile:
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        magic, n = _HEAD.unpack_from(self.mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a content pack")
+        self.sections: Dict[str, PackSection] = {}
+        pos = _HEAD.size
+        for _ in range(n):
+            kind, name_len, count, offsets_pos, blob_pos, mtime_ns, size = _ENTRY.unpack_from(self.mm, pos)
+            pos += _ENTRY.size
+            name = bytes(self.mm[pos:pos + name_len]).decode("utf-8")
+            pos += name_len
+            self.sections[name] = PackSection(self, kind, count, offsets_pos, blob_pos, (mtime_ns, size))
+
+def open_pack(path: Path) -> Optional[PackFile]:
+    try:
+        return PackFile(path)
+    except (OSError, ValueError, struct.error) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"[content] ignoring pack {path}: {e}")
+        return None
+
+def write_pack(out: Path, sections: Iterable[Tuple[str, Tuple[int, int], Any]]):
+    """
+    sections: (name, (source mtime_ns, size), items). Strings are stored as
+    text, anything else as JSON. Written to a temp file and renamed, so a
+    running bot keeps its old mapping until it reopens.
+    """
+    sections = list(sections)
+    encoded = []
+    for name, stamp, items in sections:
+        kind = TEXT if all(isinstance(x, str) for x in items) else JSON
+        blobs = [x.encode("utf-8") if kind == TEXT else json.dumps(x, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                 for x in items]
+        encoded.append((name.encode("utf-8"), stamp, kind, blobs))
+
+    pos = _HEAD.size + sum(_ENTRY.size + len(n) for n, *_ in encoded)
+    layout = []
+    for name, stamp, kind, blobs in encoded:
+        offsets_pos = pos
+        blob_pos = offsets_pos + 8 * (len(blobs) + 1)
+        layout.append((offsets_pos, blob_pos))
+        pos = blob_pos + sum(len(b) for b in blobs)
+
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEAD.pack(_MAGIC, len(encoded)))
+        for (name, stamp, kind, blobs), (offsets_pos, blob_pos) in zip(encoded, layout):
+            f.write(_ENTRY.pack(kind, len(name), len(blobs), offsets_pos, blob_pos, stamp[0], stamp[1]))
+            f.write(name)
+        for name, stamp, kind, blobs in encoded:
+            off = 0
+            offsets = [0]
+            for b in blobs:
+                off += len(b)
+                offsets.append(off)
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            for b in blobs:
+                f.write(b)
+    os.replace(tmp, out)
@@ -1,16 +1,73 @@
 # utils/crypto.py
 import base64
 import hashlib
+import hmac
+import os
 import secrets
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey, X25519PublicKey
 from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 _SALT_LEN  = 16
 _NONCE_LEN = 12
 _KEY_LEN   = 32
-_SCRYPT_N = 2**14
+_SCRYPT_LOG_N = 14
+_SCRYPT_N = 2**_SCRYPT_LOG_N
 _SCRYPT_R = 8
 _SCRYPT_P = 1
-_MAGIC = b"SC1"
+_MAGIC = b"SC1"     # legacy: fixed scrypt params above
+_MAGIC_V2 = b"SC2"  # header carries log2(N), r, p; whole header is the AAD
+_V2_PARAMS_LEN = 3
+
+# Streaming format for attachments: zlib-compressed plaintext split into
+# fixed-size ChaCha20-Poly1305 chunks. Nonce = prefix(7) || counter(4) || last(1)
+# so chunks can't be reordered, dropped or truncated without detection.
+_MAGIC_STREAM = b"SS1"
+_STREAM_PREFIX_LEN = 7
+_STREAM_CHUNK_LOG2 = 16  # 64 KiB
+_STREAM_CHUNK_RANGE = (10, 20)
+_TAG_LEN = 16
+
+# Recipient (public-key) format, no scrypt involved:
+#   PK1 || eph_pub(32) || n(1) || n * (fingerprint(8) || wrapped_key(48)) || nonce(12) || ct
+# Each slot wraps the random content key under HKDF(X25519(eph, recipient)).
+_MAGIC_PK = b"PK1"
+_X25519_LEN = 32
+_FP_LEN = 8
+_WRAPPED_LEN = _KEY_LEN + _TAG_LEN
+_MAX_RECIPIENTS = 25
+
+# Bounds on KDF params read from an SC2 header, so a crafted ciphertext
+# can't make us burn seconds of CPU or gigabytes of RAM. Work (N*r*p) is
+# capped relative to the params new ciphertexts use, since every attempt
+# costs one admission token however heavy its header is.
+_LOG_N_RANGE = (10, 22)
+_R_RANGE = (1, 32)
+_P_RANGE = (1, 16)
+_KDF_MAX_MEM = 256 * 1024 * 1024
+_KDF_MAX_WORK = 16   # times the configured (KDF_LOG_N, KDF_R, KDF_P)
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+# Params used for new ciphertexts; tune with `python -m scripts.calibrate_kdf`.
+KDF_LOG_N = _env_int("SCRYPT_LOG_N", _SCRYPT_LOG_N)
+KDF_R = _env_int("SCRYPT_R", _SCRYPT_R)
+KDF_P = _env_int("SCRYPT_P", _SCRYPT_P)
+
+# Derived-key cache: popular /encrypt embeds get decrypted by many users with
+# the same (passphrase, salt), so successful derivations are kept for a while.
+_KEY_CACHE_MAX = 256
+_KEY_CACHE_TTL = 900.0  # seconds
 
 def _b64u_encode(b: bytes) -> str:
     return base64.urlsafe_b64encode(b).decode("ascii")
@@ -18,40 +75,409 @@ def _b64u_encode(b: bytes) -> str:
 def _b64u_decode(s: str) -> bytes:
     return base64.urlsafe_b64decode(s.encode("ascii"))
 
-def _kdf_scrypt(passphrase: str, salt: bytes) -> bytes:
+def scrypt_mem(log_n: int, r: int, p: int) -> int:
+    """Approximate scrypt working set in bytes."""
+    return 128 * r * ((1 << log_n) + p + 2)
+
+def _check_params(log_n: int, r: int, p: int):
+    if not (_LOG_N_RANGE[0] <= log_n <= _LOG_N_RANGE[1]
+            and _R_RANGE[0] <= r <= _R_RANGE[1]
+            and _P_RANGE[0] <= p <= _P_RANGE[1]):
+        raise ValueError("KDF parameters out of range")
+    if log_n >= 16 * r:
+        raise ValueError("KDF parameters out of range")   # scrypt requires N < 2^(16r)
+    if scrypt_mem(log_n, r, p) > _KDF_MAX_MEM:
+        raise ValueError("KDF parameters exceed memory limit")
+    if (1 << log_n) * r * p > _KDF_MAX_WORK * (1 << KDF_LOG_N) * KDF_R * KDF_P:
+        raise ValueError("KDF parameters exceed work limit")
+
+def _kdf_scrypt(passphrase: str, salt: bytes, log_n: int = _SCRYPT_LOG_N, r: int = _SCRYPT_R, p: int = _SCRYPT_P) -> bytes:
     return hashlib.scrypt(
         password=passphrase.encode("utf-8"),
         salt=salt,
-        n=_SCRYPT_N, r=_SCRYPT_R, p=_SCRYPT_P,
+        n=1 << log_n, r=r, p=p,
+        maxmem=scrypt_mem(log_n, r, p) + (1 << 20),
         dklen=_KEY_LEN
     )
 
+class _KeyCache:
+    """
+    Bounded LRU + TTL map of HMAC(pepper, params || salt || passphrase) -> key.
+    The pepper is random per process, so cache keys can't be brute-forced
+    offline and no passphrase is ever stored. Keys are held in bytearrays
+    and zeroed on eviction.
+    """
+    def __init__(self, max_entries: int = _KEY_CACHE_MAX, ttl: float = _KEY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._pepper = secrets.token_bytes(32)
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()  # tag -> (expires_at, bytearray key)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def tag(self, passphrase: str, salt: bytes, params: bytes = b"") -> bytes:
+        return hmac.new(self._pepper, params + salt + passphrase.encode("utf-8"), hashlib.sha256).digest()
+
+    @staticmethod
+    def _wipe(buf: bytearray):
+        for i in range(len(buf)):
+            buf[i] = 0
+
+    def _drop(self, tag: bytes):
+        _, buf = self._entries.pop(tag)
+        self._wipe(buf)
+        self.evictions += 1
+
+    def get(self, tag: bytes) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(tag)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, buf = entry
+            if expires_at <= now:
+                self._drop(tag)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(tag)
+            self.hits += 1
+            return bytes(buf)
+
+    def put(self, tag: bytes, key: bytes):
+        with self._lock:
+            if tag in self._entries:
+                self._drop(tag)
+                self.evictions -= 1  # replacement, not an eviction
+            self._entries[tag] = (time.monotonic() + self.ttl, bytearray(key))
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            for _, buf in self._entries.values():
+                self._wipe(buf)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+_KEY_CACHE = _KeyCache()
+
+def kdf_cache_stats() -> Dict[str, float]:
+    return _KEY_CACHE.stats()
+
+def kdf_cache_clear():
+    _KEY_CACHE.clear()
+
+def _derive_cached(passphrase: str, salt: bytes, params: bytes, log_n: int, r: int, p: int) -> Tuple[bytes, bytes, bool]:
+    tag = _KEY_CACHE.tag(passphrase, salt, params)
+    key = _KEY_CACHE.get(tag)
+    if key is not None:
+        return key, tag, True
+    return _kdf_scrypt(passphrase, salt, log_n, r, p), tag, False
+
 def encrypt_strong(plaintext: str, passphrase: str) -> str:
     if not isinstance(plaintext, str) or not isinstance(passphrase, str):
         raise TypeError("plaintext and passphrase must be str")
+    log_n, r, p = KDF_LOG_N, KDF_R, KDF_P
+    _check_params(log_n, r, p)
+    header = _MAGIC_V2 + bytes((log_n, r, p))
     salt  = secrets.token_bytes(_SALT_LEN)
-    key   = _kdf_scrypt(passphrase, salt)
+    key   = _kdf_scrypt(passphrase, salt, log_n, r, p)
     nonce = secrets.token_bytes(_NONCE_LEN)
     aead  = ChaCha20Poly1305(key)
     pt = plaintext.encode("utf-8")
-    ct = aead.encrypt(nonce, pt, _MAGIC)  # ciphertext||tag
-    blob = _MAGIC + salt + nonce + ct
+    ct = aead.encrypt(nonce, pt, header)  # ciphertext||tag
+    blob = header + salt + nonce + ct
     return _b64u_encode(blob)
 
+def strong_ciphertext_len(plaintext: str) -> int:
+    """Length of the string encrypt_strong(plaintext, ...) returns, without running the KDF."""
+    n = len(_MAGIC_V2) + _V2_PARAMS_LEN + _SALT_LEN + _NONCE_LEN + len(plaintext.encode("utf-8")) + _TAG_LEN
+    return 4 * ((n + 2) // 3)
+
 def decrypt_strong(cipher_b64: str, passphrase: str) -> str:
     blob = _b64u_decode(cipher_b64)
-    if len(blob) < len(_MAGIC) + _SALT_LEN + _NONCE_LEN + 16:
-        raise ValueError("ciphertext too short or malformed")
-    if blob[:len(_MAGIC)] != _MAGIC:
+    magic = blob[:len(_MAGIC)]
+    if magic == _MAGIC_V2:
+        header = blob[:len(_MAGIC_V2) + _V2_PARAMS_LEN]
+        if len(blob) < len(header) + _SALT_LEN + _NONCE_LEN + 16:
+            raise ValueError("ciphertext too short or malformed")
+        log_n, r, p = header[len(_MAGIC_V2):]
+        _check_params(log_n, r, p)
+    elif magic == _MAGIC:
+        header = _MAGIC
+        if len(blob) < len(header) + _SALT_LEN + _NONCE_LEN + 16:
+            raise ValueError("ciphertext too short or malformed")
+        log_n, r, p = _SCRYPT_LOG_N, _SCRYPT_R, _SCRYPT_P
+    else:
         raise ValueError("unknown format / bad header")
-    idx = len(_MAGIC)
+    idx = len(header)
     salt  = blob[idx: idx+_SALT_LEN];  idx += _SALT_LEN
     nonce = blob[idx: idx+_NONCE_LEN]; idx += _NONCE_LEN
     ct    = blob[idx:]
-    key  = _kdf_scrypt(passphrase, salt)
+    key, tag, cached = _derive_cached(passphrase, salt, header, log_n, r, p)
     aead = ChaCha20Poly1305(key)
     try:
-        pt = aead.decrypt(nonce, ct, _MAGIC)
+        pt = aead.decrypt(nonce, ct, header)
     except Exception as e:
         raise ValueError("decryption failed (bad key or tampered data)") from e
+    # only cache keys that actually opened something, so wrong seeds can't flush the cache
+    if not cached:
+        _KEY_CACHE.put(tag, key)
     return pt.decode("utf-8")
+
+def calibrate_scrypt(target_ms: float = 100.0, max_mem: int = 64 * 1024 * 1024,
+                     r_values: Iterable[int] = (8,), p_values: Iterable[int] = (1,),
+                     rounds: int = 3) -> Dict[str, float]:
+    """
+    Benchmark scrypt on this host and return the strongest (log_n, r, p)
+    whose median derive time stays under target_ms and memory under max_mem.
+    """
+    best = None
+    salt = secrets.token_bytes(_SALT_LEN)
+    for r in r_values:
+        for p in p_values:
+            for log_n in range(_LOG_N_RANGE[0], _LOG_N_RANGE[1] + 1):
+                mem = scrypt_mem(log_n, r, p)
+                if mem > min(max_mem, _KDF_MAX_MEM):
+                    break
+                times = []
+                for _ in range(rounds):
+                    t0 = time.perf_counter()
+                    _kdf_scrypt("calibration", salt, log_n, r, p)
+                    times.append((time.perf_counter() - t0) * 1000)
+                ms = sorted(times)[len(times) // 2]
+                if ms > target_ms:
+                    break
+                cost = (1 << log_n) * r * p
+                if best is None or cost > best["cost"]:
+                    best = {"log_n": log_n, "r": r, "p": p, "ms": ms, "mem": mem, "cost": cost}
+    if best is None:
+        raise ValueError("no scrypt parameters meet the latency/memory budget")
+    return best
+
+def _stream_nonce(prefix: bytes, counter: int, last: bool) -> bytes:
+    if counter >= 1 << 32:
+        raise ValueError("stream too long")
+    return prefix + counter.to_bytes(4, "big") + (b"\x01" if last else b"\x00")
+
+def encrypt_stream(src: BinaryIO, dst: BinaryIO, passphrase: str, chunk_log2: int = _STREAM_CHUNK_LOG2) -> int:
+    """
+    Compress and encrypt src into dst chunk by chunk; memory use is bounded
+    by a couple of chunks regardless of input size. Returns bytes written.
+    """
+    if not isinstance(passphrase, str):
+        raise TypeError("passphrase must be str")
+    if not _STREAM_CHUNK_RANGE[0] <= chunk_log2 <= _STREAM_CHUNK_RANGE[1]:
+        raise ValueError("chunk size out of range")
+    log_n, r, p = KDF_LOG_N, KDF_R, KDF_P
+    _check_params(log_n, r, p)
+    salt = secrets.token_bytes(_SALT_LEN)
+    prefix = secrets.token_bytes(_STREAM_PREFIX_LEN)
+    header = _MAGIC_STREAM + bytes((log_n, r, p, chunk_log2)) + salt + prefix
+    aead = ChaCha20Poly1305(_kdf_scrypt(passphrase, salt, log_n, r, p))
+    size = 1 << chunk_log2
+    comp = zlib.compressobj(6)
+    buf = bytearray()
+    counter = 0
+    written = dst.write(header) or len(header)
+
+    def emit(data: bytes, last: bool):
+        nonlocal counter, written
+        ct = aead.encrypt(_stream_nonce(prefix, counter, last), data, header)
+        written += dst.write(ct) or len(ct)
+        counter += 1
+
+    while True:
+        block = src.read(size)
+        if not block:
+            break
+        buf += comp.compress(block)
+        # keep at least one byte back so the final chunk is never empty
+        while len(buf) > size:
+            emit(bytes(buf[:size]), False)
+            del buf[:size]
+    buf += comp.flush()
+    while len(buf) > size:
+        emit(bytes(buf[:size]), False)
+        del buf[:size]
+    emit(bytes(buf), True)
+    return written
+
+def is_stream_ciphertext(head: bytes) -> bool:
+    return head[:len(_MAGIC_STREAM)] == _MAGIC_STREAM
+
+def decrypt_stream(src: BinaryIO, dst: BinaryIO, passphrase: str, max_output: Optional[int] = None) -> int:
+    """
+    Inverse of encrypt_stream. Raises ValueError on a bad key, tampering,
+    truncation, or when the plaintext would exceed max_output bytes.
+    Returns bytes written.
+    """
+    header_len = len(_MAGIC_STREAM) + 4 + _SALT_LEN + _STREAM_PREFIX_LEN
+    header = src.read(header_len)
+    if len(header) < header_len or not is_stream_ciphertext(header):
+        raise ValueError("unknown format / bad header")
+    params = header[:len(_MAGIC_STREAM) + 3]
+    log_n, r, p, chunk_log2 = header[len(_MAGIC_STREAM):len(_MAGIC_STREAM) + 4]
+    _check_params(log_n, r, p)
+    if not _STREAM_CHUNK_RANGE[0] <= chunk_log2 <= _STREAM_CHUNK_RANGE[1]:
+        raise ValueError("chunk size out of range")
+    idx = len(_MAGIC_STREAM) + 4
+    salt = header[idx: idx + _SALT_LEN]; idx += _SALT_LEN
+    prefix = header[idx: idx + _STREAM_PREFIX_LEN]
+
+    key, tag, cached = _derive_cached(passphrase, salt, params, log_n, r, p)
+    aead = ChaCha20Poly1305(key)
+    size = 1 << chunk_log2
+    decomp = zlib.decompressobj()
+    written = 0
+    counter = 0
+
+    def sink(data: bytes):
+        nonlocal written
+        while data:
+            out = decomp.decompress(data, size)
+            written += len(out)
+            if max_output is not None and written > max_output:
+                raise ValueError("decrypted data exceeds size limit")
+            dst.write(out)
+            data = decomp.unconsumed_tail
+
+    cur = src.read(size + _TAG_LEN)
+    if not cur:
+        raise ValueError("ciphertext too short or malformed")
+    while True:
+        nxt = src.read(size + _TAG_LEN)
+        last = not nxt
+        try:
+            pt = aead.decrypt(_stream_nonce(prefix, counter, last), cur, header)
+        except Exception as e:
+            raise ValueError("decryption failed (bad key or tampered data)") from e
+        if counter == 0 and not cached:
+            _KEY_CACHE.put(tag, key)
+        counter += 1
+        sink(pt)
+        if last:
+            break
+        cur = nxt
+    tail = decomp.flush()
+    written += len(tail)
+    if max_output is not None and written > max_output:
+        raise ValueError("decrypted data exceeds size limit")
+    dst.write(tail)
+    if not decomp.eof or decomp.unused_data:
+        raise ValueError("ciphertext too short or malformed")
+    return written
+
+def _raw_public(pub: X25519PublicKey) -> bytes:
+    return pub.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+
+def _fingerprint(pub_raw: bytes) -> bytes:
+    return hashlib.sha256(pub_raw).digest()[:_FP_LEN]
+
+def _wrap_key(shared: bytes, eph_raw: bytes, recip_raw: bytes) -> bytes:
+    return HKDF(algorithm=hashes.SHA256(), length=_KEY_LEN, salt=None,
+                info=_MAGIC_PK + eph_raw + recip_raw).derive(shared)
+
+def _load_public(pub_b64: str) -> X25519PublicKey:
+    try:
+        raw = _b64u_decode(pub_b64.strip())
+        if len(raw) != _X25519_LEN:
+            raise ValueError
+        return X25519PublicKey.from_public_bytes(raw)
+    except Exception as e:
+        raise ValueError("invalid public key") from e
+
+def _load_private(priv_b64: str) -> X25519PrivateKey:
+    try:
+        raw = _b64u_decode(priv_b64.strip())
+        if len(raw) != _X25519_LEN:
+            raise ValueError
+        return X25519PrivateKey.from_private_bytes(raw)
+    except Exception as e:
+        raise ValueError("invalid private key") from e
+
+def generate_keypair() -> Tuple[str, str]:
+    """Returns (private_b64, public_b64) for recipient encryption."""
+    priv = X25519PrivateKey.generate()
+    raw = priv.private_bytes(serialization.Encoding.Raw, serialization.PrivateFormat.Raw,
+                             serialization.NoEncryption())
+    return _b64u_encode(raw), _b64u_encode(_raw_public(priv.public_key()))
+
+def public_key_of(priv_b64: str) -> str:
+    return _b64u_encode(_raw_public(_load_private(priv_b64).public_key()))
+
+def normalize_public_key(pub_b64: str) -> str:
+    return _b64u_encode(_raw_public(_load_public(pub_b64)))
+
+def encrypt_to_recipients(plaintext: str, public_keys: List[str]) -> str:
+    """Encrypt once for up to 25 X25519 recipients (ephemeral ECDH + ChaCha20-Poly1305)."""
+    if not isinstance(plaintext, str):
+        raise TypeError("plaintext must be str")
+    if not 1 <= len(public_keys) <= _MAX_RECIPIENTS:
+        raise ValueError(f"need 1-{_MAX_RECIPIENTS} recipients")
+    eph = X25519PrivateKey.generate()
+    eph_raw = _raw_public(eph.public_key())
+    content_key = ChaCha20Poly1305.generate_key()
+    slots = []
+    for pub_b64 in public_keys:
+        pub = _load_public(pub_b64)
+        recip_raw = _raw_public(pub)
+        kek = _wrap_key(eph.exchange(pub), eph_raw, recip_raw)
+        # the KEK is unique per (ephemeral key, recipient), so a fixed nonce is safe
+        slots.append(_fingerprint(recip_raw) + ChaCha20Poly1305(kek).encrypt(b"\x00" * _NONCE_LEN, content_key, _MAGIC_PK + eph_raw))
+    header = _MAGIC_PK + eph_raw + bytes((len(slots),)) + b"".join(slots)
+    nonce = secrets.token_bytes(_NONCE_LEN)
+    ct = ChaCha20Poly1305(content_key).encrypt(nonce, plaintext.encode("utf-8"), header)
+    return _b64u_encode(header + nonce + ct)
+
+def is_recipient_ciphertext(cipher_b64: str) -> bool:
+    try:
+        return _b64u_decode(cipher_b64[:4])[:len(_MAGIC_PK)] == _MAGIC_PK
+    except Exception:
+        return False
+
+def decrypt_with_private_key(cipher_b64: str, priv_b64: str) -> str:
+    blob = _b64u_decode(cipher_b64)
+    if blob[:len(_MAGIC_PK)] != _MAGIC_PK:
+        raise ValueError("unknown format / bad header")
+    idx = len(_MAGIC_PK)
+    eph_raw = blob[idx: idx + _X25519_LEN]; idx += _X25519_LEN
+    if len(blob) < idx + 1:
+        raise ValueError("ciphertext too short or malformed")
+    n = blob[idx]; idx += 1
+    slot_len = _FP_LEN + _WRAPPED_LEN
+    if n == 0 or len(blob) < idx + n * slot_len + _NONCE_LEN + _TAG_LEN:
+        raise ValueError("ciphertext too short or malformed")
+    slots = blob[idx: idx + n * slot_len]; idx += n * slot_len
+    header = blob[:idx]
+    nonce = blob[idx: idx + _NONCE_LEN]; idx += _NONCE_LEN
+    ct = blob[idx:]
+
+    priv = _load_private(priv_b64)
+    my_raw = _raw_public(priv.public_key())
+    fp = _fingerprint(my_raw)
+    for i in range(n):
+        slot = slots[i * slot_len: (i + 1) * slot_len]
+        if slot[:_FP_LEN] != fp:
+            continue
+        kek = _wrap_key(priv.exchange(X25519PublicKey.from_public_bytes(eph_raw)), eph_raw, my_raw)
+        try:
+            content_key = ChaCha20Poly1305(kek).decrypt(b"\x00" * _NONCE_LEN, slot[_FP_LEN:], _MAGIC_PK + eph_raw)
+            pt = ChaCha20Poly1305(content_key).decrypt(nonce, ct, header)
+        except Exception as e:
+            raise ValueError("decryption failed (bad key or tampered data)") from e
+        return pt.decode("utf-8")
+    raise ValueError("this message wasn't encrypted to your key")
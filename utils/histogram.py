@@ -0,0 +1,74 @@
+# utils/histogram.py
+from typing import Dict, List, Optional, Tuple
+
+from utils.common import load_json_state, save_json_state
+
+GLOBAL = 0   # key for the cross-server histogram
+
+class ScoreHistogram:
+    """Counts per integer score in [lo, hi]. add() is O(1); percentile() walks the fixed bins."""
+    __slots__ = ("lo", "bins", "total")
+
+    def __init__(self, lo: int = 0, hi: int = 100, bins: Optional[List[int]] = None):
+        self.lo = lo
+        self.bins = bins if bins is not None and len(bins) == hi - lo + 1 else [0] * (hi - lo + 1)
+        self.total = sum(self.bins)
+
+    def _bin(self, score: int) -> int:
+        return min(max(score - self.lo, 0), len(self.bins) - 1)
+
+    def add(self, score: int):
+        self.bins[self._bin(score)] += 1
+        self.total += 1
+
+    def percentile(self, score: int) -> float:
+        """Percentile rank: share of results below `score`, counting ties as half."""
+        if not self.total:
+            return 0.0
+        b = self._bin(score)
+        below = sum(self.bins[:b])
+        return 100.0 * (below + 0.5 * self.bins[b]) / self.total
+
+class HistogramStore:
+    """
+    One ScoreHistogram per guild plus a GLOBAL one. Only the bin counts are
+    kept, never individual results. save() writes state/<persist> when
+    something changed since the last save; the owning cog calls it on a loop.
+    """
+    def __init__(self, persist: str, lo: int = 0, hi: int = 100):
+        self.persist = persist
+        self.lo, self.hi = lo, hi
+        self.hists: Dict[int, ScoreHistogram] = {}
+        self.dirty = False
+        self.load()
+
+    def get(self, key: int) -> ScoreHistogram:
+        h = self.hists.get(key)
+        if h is None:
+            h = self.hists[key] = ScoreHistogram(self.lo, self.hi)
+        return h
+
+    def add(self, guild_id: Optional[int], score: int) -> Tuple[ScoreHistogram, Optional[ScoreHistogram]]:
+        """Count one result; returns (global, guild) histograms, guild None outside a server."""
+        glob = self.get(GLOBAL)
+        glob.add(score)
+        guild = None
+        if guild_id:
+            guild = self.get(guild_id)
+            guild.add(score)
+        self.dirty = True
+        return glob, guild
+
+    def save(self):
+        if not self.dirty:
+            return
+        save_json_state(self.persist, {"lo": self.lo, "hi": self.hi,
+                                       "hists": {str(k): h.bins for k, h in self.hists.items()}})
+        self.dirty = False
+
+    def load(self):
+        data = load_json_state(self.persist, {})
+        if data.get("lo") != self.lo or data.get("hi") != self.hi:
+            return
+        for k, bins in data.get("hists", {}).items():
+            self.hists[int(k)] = ScoreHistogram(self.lo, self.hi, bins)
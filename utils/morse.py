@@ -0,0 +1,437 @@
+# utils/morse.py
+import io
+import shutil
+import subprocess
+import threading
+import wave
+from collections import deque
+from functools import lru_cache
+from typing import BinaryIO, Deque, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MORSE_CODE = {
+    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..',  'E': '.',   'F': '..-.',
+    'G': '--.','H': '....','I': '..',   'J': '.---', 'K': '-.-',  'L': '.-..',
+    'M': '--', 'N': '-.',  'O': '---',  'P': '.--.', 'Q': '--.-', 'R': '.-.',
+    'S': '...', 'T': '-',  'U': '..-',  'V': '...-', 'W': '.--',  'X': '-..-',
+    'Y': '-.--','Z': '--..',
+    '1': '.----','2': '..---','3': '...--','4': '....-','5': '.....',
+    '6': '-....','7': '--...','8': '---..','9': '----.','0': '-----',
+    ',': '--..--','.' : '.-.-.-','?':'..--..','/':'-..-.','-':'-....-',
+    '(': '-.--.', ')':'-.--.-', '!':'-.-.--', ':':'---...',';':'-.-.-.',
+    "'":'.----.','@':'.--.-.','&':'.-...','=':'-...-','+':'.-.-.',
+    '_':'..--.-','"':'.-..-.','$':'...-..-', ' ':'/'
+}
+REV_MORSE = {v.strip(): k for k, v in MORSE_CODE.items()}
+
+VOICE_RATE = 48000   # what discord voice expects: 48 kHz, stereo, s16le, 20 ms frames
+FILE_RATE = 8000     # plenty for a sub-kHz tone and keeps attachments small
+AMPLITUDE = 0.5
+RAMP_MS = 5.0        # raised-cosine attack/decay, so keying doesn't click
+
+class Keyer:
+    """
+    Morse to PCM (s16le). The dit and dah tones (with their envelopes) and
+    the three gap lengths are synthesized once with NumPy, and a message is
+    rendered by joining those five buffers, so there is no per-sample Python
+    work however long the text is. Nothing grows with use: a keyer holds the
+    same few buffers however much it has sent, and sizes and durations are
+    counted from the codes without rendering.
+    Timing is the PARIS standard: unit = 1.2 / wpm seconds, dah = 3 units,
+    gaps of 1 (inside a character), 3 (between characters) and 7 (between words).
+    """
+    def __init__(self, wpm: int = 20, tone: int = 600, rate: int = FILE_RATE, channels: int = 1):
+        self.wpm, self.tone, self.rate, self.channels = wpm, tone, rate, channels
+        self.unit = int(round(rate * 1.2 / wpm))
+        self.dit = self._tone(self.unit)
+        self.dah = self._tone(3 * self.unit)
+        self.gap = self._silence(1)
+        self.char_gap = self._silence(3)
+        self.word_gap = self._silence(7)
+
+    def _tone(self, n: int) -> bytes:
+        t = np.arange(n) / self.rate
+        x = np.sin(2 * np.pi * self.tone * t)
+        ramp = min(int(self.rate * RAMP_MS / 1000), n // 2)
+        if ramp:
+            env = 0.5 * (1 - np.cos(np.pi * np.arange(ramp) / ramp))
+            x[:ramp] *= env
+            x[n - ramp:] *= env[::-1]
+        pcm = (x * (AMPLITUDE * 32767)).astype("<i2")
+        return np.repeat(pcm, self.channels).tobytes()
+
+    def _silence(self, units: int) -> bytes:
+        return bytes(2 * self.channels * units * self.unit)
+
+    def _codes(self, text: str) -> Iterator[List[str]]:
+        """Per word, the codes of the characters Morse can send; words with none are dropped."""
+        for word in text.upper().split():
+            codes = [code for code in (MORSE_CODE.get(ch, "") for ch in word) if any(s in ".-" for s in code)]
+            if codes:
+                yield codes
+
+    def segments(self, text: str) -> Iterator[bytes]:
+        """The shared dit/dah/gap buffers for `text` in playback order; nothing per character is kept."""
+        for w, codes in enumerate(self._codes(text)):
+            if w:
+                yield self.word_gap
+            for c, code in enumerate(codes):
+                if c:
+                    yield self.char_gap
+                for i, sym in enumerate(s for s in code if s in ".-"):
+                    if i:
+                        yield self.gap
+                    yield self.dit if sym == "." else self.dah
+
+    def units(self, text: str) -> int:
+        """Length of `text` in Morse units, counted from the codes without touching any audio."""
+        total = 0
+        for w, codes in enumerate(self._codes(text)):
+            total += 7 if w else 0
+            for c, code in enumerate(codes):
+                syms = [s for s in code if s in ".-"]
+                total += (3 if c else 0) + len(syms) - 1 + sum(1 if s == "." else 3 for s in syms)
+        return total
+
+    def pcm_size(self, text: str) -> int:
+        return self.units(text) * self.unit * 2 * self.channels
+
+    def render(self, text: str) -> bytes:
+        return b"".join(self.segments(text))
+
+    def duration(self, text: str) -> float:
+        return self.units(text) * self.unit / self.rate
+
+    def wav(self, text: str) -> bytes:
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(self.channels)
+            w.setsampwidth(2)
+            w.setframerate(self.rate)
+            w.writeframes(self.render(text))
+        return buf.getvalue()
+
+    def frames(self, text: str, frame_ms: int = 20) -> Iterator[bytes]:
+        """Fixed-size frames for streaming (e.g. into voice); the last one is padded with silence."""
+        size = self.rate * frame_ms // 1000 * self.channels * 2
+        buf = bytearray()
+        for seg in self.segments(text):
+            buf += seg
+            while len(buf) >= size:
+                yield bytes(buf[:size])
+                del buf[:size]
+        if buf:
+            yield bytes(buf) + bytes(size - len(buf))
+
+@lru_cache(maxsize=32)
+def get_keyer(wpm: int, tone: int, rate: int = FILE_RATE, channels: int = 1) -> Keyer:
+    return Keyer(wpm, tone, rate, channels)
+
+# --- decoding audio ---------------------------------------------------------
+
+DECODE_RATE = 8000          # ffmpeg resamples non-WAV input to this
+BLOCK_SECONDS = 1.0         # audio is processed this much at a time
+WINDOW_MS = 5.0             # tone-detector resolution
+TONE_RANGE = (200.0, 3000.0)
+TONE_SEARCH_SECONDS = 10.0  # buffer at most this much while looking for the tone
+WARMUP_MARKS = 12           # marks collected before the first timing estimate
+NO_CONTRAST_DB = 20.0       # audio that never keys up: assume noise this far below its peak
+SILENCE_AMPLITUDE = 0.01    # a steady tone quieter than this (of full scale) is treated as silence
+
+def _two_means(v: np.ndarray) -> Tuple[float, float]:
+    lo, hi = float(v.min()), float(v.max())
+    for _ in range(8):
+        mid = (lo + hi) / 2
+        a, b = v[v <= mid], v[v > mid]
+        if not len(a) or not len(b):
+            break
+        lo, hi = float(a.mean()), float(b.mean())
+    return lo, hi
+
+class MorseDecoder:
+    """
+    Streaming Morse decoder. feed() takes blocks of mono float samples and
+    returns whatever text they completed, so memory stays bounded by the
+    block size however long the recording is.
+
+    1. The tone is the strongest spectral peak in TONE_RANGE (averaged rFFT
+       over the first blocks that contain one).
+    2. Each WINDOW_MS window gets its power at that frequency: a single-bin
+       DFT (Goertzel) done as one matrix-vector product per block.
+    3. Windows are on/off against a threshold halfway (in dB) between running
+       noise and signal levels, then a 3-window majority vote drops glitches.
+       Until a block shows both levels the windows are held; if none ever
+       does (a lone "E" is all tone), noise is taken as NO_CONTRAST_DB below
+       the held peak.
+    4. On/off run lengths are classified against a unit estimated from recent
+       marks and gaps (2-means: dits vs dahs), which tracks speed changes.
+    """
+    def __init__(self, rate: int, tone: Optional[float] = None):
+        self.rate = rate
+        self.tone = tone
+        self.win = max(8, int(rate * WINDOW_MS / 1000))
+        self._pending: List[np.ndarray] = []   # blocks held while the tone is unknown
+        self._spectrum: Optional[np.ndarray] = None
+        self._carry = np.zeros(0)               # samples short of a full window
+        self._kernel: Optional[np.ndarray] = None
+        self._noise_db: Optional[float] = None
+        self._signal_db: Optional[float] = None
+        self._held: List[np.ndarray] = []       # window powers seen before there was a threshold
+        self._tail = np.zeros(2, dtype=bool)   # last raw decisions, for the majority vote
+        self._state = False
+        self._run = 0
+        self._warmup: Optional[List[Tuple[bool, int]]] = []
+        self._marks: Deque[int] = deque(maxlen=64)
+        self._gaps: Deque[int] = deque(maxlen=64)
+        self._unit = 0.0
+        self._since_estimate = 0
+        self._symbols = ""
+        self._out: List[str] = []
+        self.started = False
+
+    # -- tone ------------------------------------------------------------------
+
+    def _find_tone(self, block: np.ndarray, force: bool = False) -> bool:
+        n = 2048 if len(block) >= 2048 else 1 << max(6, len(block).bit_length() - 1)
+        frames = block[:len(block) // n * n].reshape(-1, n)
+        if len(frames):
+            spec = np.abs(np.fft.rfft(frames * np.hanning(n), axis=1)).mean(axis=0)
+            if self._spectrum is None or len(self._spectrum) != len(spec):
+                self._spectrum = spec
+            else:
+                self._spectrum += spec
+        if self._spectrum is None:
+            return False
+        freqs = np.fft.rfftfreq(2 * (len(self._spectrum) - 1), 1 / self.rate)
+        band = (freqs >= TONE_RANGE[0]) & (freqs <= min(TONE_RANGE[1], self.rate / 2 - 1))
+        sub = self._spectrum[band]
+        if not len(sub):
+            return False
+        peak = int(sub.argmax())
+        buffered = sum(len(b) for b in self._pending) / self.rate
+        if not force and sub[peak] < 8 * np.median(sub) and buffered < TONE_SEARCH_SECONDS:
+            return False
+        self.tone = float(freqs[band][peak])
+        return True
+
+    # -- detector --------------------------------------------------------------
+
+    def _powers_db(self, block: np.ndarray) -> np.ndarray:
+        if self._kernel is None:
+            self._kernel = np.exp(-2j * np.pi * self.tone * np.arange(self.win) / self.rate)
+        x = np.concatenate([self._carry, block]) if len(self._carry) else block
+        k = len(x) // self.win
+        self._carry = x[k * self.win:]
+        power = np.abs(x[:k * self.win].reshape(k, self.win) @ self._kernel) ** 2
+        return 10 * np.log10(power + 1e-12)
+
+    def _decide(self, db: np.ndarray) -> np.ndarray:
+        lo, hi = (np.percentile(db, 20), np.percentile(db, 95)) if len(db) else (0.0, 0.0)
+        if hi - lo > 6:   # block has both key-down and key-up in it
+            if self._noise_db is None:
+                self._noise_db, self._signal_db = lo, hi
+            else:
+                self._noise_db += 0.3 * (lo - self._noise_db)
+                self._signal_db += 0.3 * (hi - self._signal_db)
+        if self._noise_db is None:
+            self._held.append(db)
+            if sum(len(h) for h in self._held) * WINDOW_MS / 1000 < TONE_SEARCH_SECONDS:
+                return np.zeros(0, dtype=bool)
+            self._seed_levels()
+            if self._noise_db is None:
+                self._held = []
+                return np.zeros(0, dtype=bool)
+        if self._held:
+            db = np.concatenate([*self._held, db])
+            self._held = []
+        raw = np.concatenate([self._tail, db > (self._noise_db + self._signal_db) / 2])
+        self._tail = raw[-2:]
+        return (raw[:-2].astype(np.int8) + raw[1:-1] + raw[2:]) >= 2
+
+    def _seed_levels(self):
+        """No block has had contrast: put the noise floor a fixed distance below the held peak, unless that's silence."""
+        peak = float(np.concatenate(self._held).max())
+        if peak > 20 * np.log10(SILENCE_AMPLITUDE * self.win / 2):
+            self._noise_db, self._signal_db = peak - NO_CONTRAST_DB, peak
+
+    def _runs(self, on: np.ndarray):
+        if not len(on):
+            return
+        edges = np.flatnonzero(on[1:] != on[:-1]) + 1
+        starts = np.concatenate([[0], edges])
+        lengths = np.diff(np.concatenate([starts, [len(on)]]))
+        for s, n in zip(starts, lengths):
+            state = bool(on[s])
+            if state == self._state:
+                self._run += int(n)
+            else:
+                self._emit(self._state, self._run)
+                self._state, self._run = state, int(n)
+
+    # -- timing ----------------------------------------------------------------
+
+    def _estimate(self):
+        marks = np.array(self._marks, dtype=float)
+        lo, hi = _two_means(marks)
+        if hi >= 2 * lo:
+            self._unit = (lo + hi / 3) / 2
+            return
+        # one cluster: tell dits from dahs by the shortest gaps, which are one unit
+        if self._gaps:
+            g = float(np.percentile(np.array(self._gaps, dtype=float), 20))
+            self._unit = lo / 3 if lo > 2 * g else lo
+        else:
+            self._unit = lo
+
+    def _emit(self, state: bool, n: int):
+        if n <= 0:
+            return
+        if self._warmup is not None:
+            self._warmup.append((state, n))
+            if state:
+                self._marks.append(n)
+            elif self._marks:
+                self._gaps.append(n)
+            if len(self._marks) >= WARMUP_MARKS:
+                self._replay()
+            return
+        self._classify(state, n)
+
+    def _replay(self):
+        self._estimate()
+        runs, self._warmup = self._warmup, None
+        for state, n in runs:
+            self._classify(state, n, learn=False)
+
+    def _classify(self, state: bool, n: int, learn: bool = True):
+        if state:
+            self.started = True
+            self._symbols += "." if n < 2 * self._unit else "-"
+            if learn:
+                self._marks.append(n)
+                self._since_estimate += 1
+                if self._since_estimate >= 16:
+                    self._since_estimate = 0
+                    self._estimate()
+            return
+        if not self.started:
+            return   # leading silence
+        if learn and n < 10 * self._unit:
+            self._gaps.append(n)
+        if n >= 2 * self._unit:
+            self._flush_char()
+            if n >= 5 * self._unit:
+                self._out.append(" ")
+
+    def _flush_char(self):
+        if self._symbols:
+            self._out.append(REV_MORSE.get(self._symbols, "�"))
+            self._symbols = ""
+
+    def _take(self) -> str:
+        text = "".join(self._out)
+        self._out = []
+        return text
+
+    # -- public ----------------------------------------------------------------
+
+    def feed(self, block: np.ndarray) -> str:
+        if self.tone is None:
+            self._pending.append(block)
+            if not self._find_tone(block):
+                return ""
+            blocks, self._pending = self._pending, []
+        else:
+            blocks = [block]
+        for b in blocks:
+            self._runs(self._decide(self._powers_db(b)))
+        return self._take()
+
+    def finish(self) -> str:
+        if self.tone is None and self._pending:
+            blocks, self._pending = self._pending, []
+            if self._find_tone(np.zeros(0), force=True):
+                for b in blocks:
+                    self._runs(self._decide(self._powers_db(b)))
+        if self._held:
+            self._seed_levels()
+            if self._noise_db is not None:
+                self._runs(self._decide(np.zeros(0)))
+            self._held = []
+        self._emit(self._state, self._run)
+        self._run = 0
+        if self._warmup is not None and self._marks:
+            self._replay()
+        self._flush_char()
+        return self._take().rstrip()
+
+def _pcm_to_float(raw: bytes, width: int, channels: int) -> np.ndarray:
+    if width == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"unsupported sample width: {width * 8} bits")
+    if channels > 1:
+        x = x[:len(x) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return x
+
+def decode_wav(fp: BinaryIO, block_seconds: float = BLOCK_SECONDS) -> str:
+    """Decode a WAV stream block by block; raises wave.Error if it isn't a WAV."""
+    with wave.open(fp, "rb") as w:
+        rate, width, channels = w.getframerate(), w.getsampwidth(), w.getnchannels()
+        dec = MorseDecoder(rate)
+        block = max(1, int(rate * block_seconds))
+        out = []
+        while True:
+            raw = w.readframes(block)
+            if not raw:
+                break
+            out.append(dec.feed(_pcm_to_float(raw, width, channels)))
+    out.append(dec.finish())
+    return "".join(out)
+
+def decode_with_ffmpeg(fp: BinaryIO, block_seconds: float = BLOCK_SECONDS) -> str:
+    """Any format ffmpeg reads, resampled to DECODE_RATE mono and decoded as it streams out."""
+    exe = shutil.which("ffmpeg")
+    if exe is None:
+        raise ValueError("only WAV is supported without ffmpeg")
+    proc = subprocess.Popen([exe, "-v", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(DECODE_RATE), "pipe:1"],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def pump():
+        try:
+            shutil.copyfileobj(fp, proc.stdin, 64 * 1024)
+        except OSError:
+            pass
+        finally:
+            proc.stdin.close()
+
+    feeder = threading.Thread(target=pump, daemon=True)
+    feeder.start()
+    dec = MorseDecoder(DECODE_RATE)
+    block = 2 * int(DECODE_RATE * block_seconds)
+    out = []
+    try:
+        while True:
+            raw = proc.stdout.read(block)
+            if not raw:
+                break
+            out.append(dec.feed(_pcm_to_float(raw[:len(raw) // 2 * 2], 2, 1)))
+    finally:
+        proc.stdout.close()
+        feeder.join()
+        if proc.wait() != 0:
+            raise ValueError("ffmpeg couldn't read that file")
+    out.append(dec.finish())
+    return "".join(out)
+
+def decode_audio(fp: BinaryIO) -> str:
+    try:
+        return decode_wav(fp)
+    except (wave.Error, EOFError):
+        fp.seek(0)
+        return decode_with_ffmpeg(fp)
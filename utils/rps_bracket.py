@@ -0,0 +1,185 @@
+# utils/rps_bracket.py
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+RPS_CHOICES = ("rock", "paper", "scissors")
+_BEATS = {("rock", "scissors"), ("paper", "rock"), ("scissors", "paper")}
+
+# match states
+LIVE, DONE = 0, 1
+
+class Match:
+    """
+    One pairing as a tiny state machine: LIVE until someone reaches `need`
+    throw wins (or forfeits on timeout), then DONE with a winner.
+    b is None for a bye, which is DONE from the start.
+    """
+    __slots__ = ("a", "b", "pick_a", "pick_b", "wins_a", "wins_b", "need",
+                 "throws", "state", "winner", "deadline", "last")
+
+    def __init__(self, a: int, b: Optional[int], need: int, deadline: float):
+        self.a, self.b = a, b
+        self.pick_a: Optional[str] = None
+        self.pick_b: Optional[str] = None
+        self.wins_a = self.wins_b = 0
+        self.need = need
+        self.throws = 0
+        self.deadline = deadline
+        self.last: Optional[Tuple[str, str]] = None   # last resolved throw (a's pick, b's pick)
+        self.state, self.winner = (DONE, a) if b is None else (LIVE, None)
+
+    def other(self, uid: int) -> Optional[int]:
+        return self.b if uid == self.a else self.a
+
+    def picked(self, uid: int) -> bool:
+        return (self.pick_a if uid == self.a else self.pick_b) is not None
+
+    def pick(self, uid: int, choice: str, now: float, timeout: float) -> Optional[int]:
+        """
+        Record a pick. When both are in, resolve the throw and return +1/-1/0
+        from `uid`'s side; None while waiting on the opponent.
+        """
+        if uid == self.a:
+            self.pick_a = choice
+        else:
+            self.pick_b = choice
+        if self.pick_a is None or self.pick_b is None:
+            return None
+        a, b = self.pick_a, self.pick_b
+        self.pick_a = self.pick_b = None
+        self.last = (a, b)
+        self.throws += 1
+        self.deadline = now + timeout
+        if a == b:
+            return 0
+        a_won = (a, b) in _BEATS
+        if a_won:
+            self.wins_a += 1
+        else:
+            self.wins_b += 1
+        if self.wins_a >= self.need or self.wins_b >= self.need:
+            self._finish(self.a if self.wins_a > self.wins_b else self.b)
+        return 1 if a_won == (uid == self.a) else -1
+
+    def expire(self, rng: random.Random):
+        """Deadline hit: whoever picked advances; if nobody did, the lead (or a coin flip) decides."""
+        if self.pick_a is not None and self.pick_b is None:
+            self._finish(self.a)
+        elif self.pick_b is not None and self.pick_a is None:
+            self._finish(self.b)
+        elif self.wins_a != self.wins_b:
+            self._finish(self.a if self.wins_a > self.wins_b else self.b)
+        else:
+            self._finish(rng.choice((self.a, self.b)))
+
+    def _finish(self, winner: int):
+        self.state = DONE
+        self.winner = winner
+        self.pick_a = self.pick_b = None
+
+class Bracket:
+    """
+    Single elimination. Round one is padded with byes up to a power of two;
+    every match in a round runs at once and the next round is built as soon
+    as the last one finishes. `by_player` routes a pick to its match in O(1),
+    and `dirty` tells the renderer something changed since the last draw.
+    """
+    def __init__(self, players: List[int], best_of: int = 1, pick_timeout: float = 30.0,
+                 rng: Optional[random.Random] = None, now: Optional[float] = None):
+        if len(players) < 2:
+            raise ValueError("need at least two players")
+        self.rng = rng or random.Random()
+        self.need = best_of // 2 + 1
+        self.timeout = pick_timeout
+        seeds = list(players)
+        self.rng.shuffle(seeds)
+        size = 1
+        while size < len(seeds):
+            size *= 2
+        self.total_rounds = size.bit_length() - 1
+        # spread the byes: top seeds of each pair get them, never bye vs bye
+        byes = size - len(seeds)
+        firsts, seconds = seeds[:size // 2], seeds[size // 2:] + [None] * byes
+        self.rounds: List[List[Match]] = []
+        self.by_player: Dict[int, Match] = {}
+        self.champion: Optional[int] = None
+        self.dirty = True
+        self._start_round(list(zip(firsts, seconds)), time.monotonic() if now is None else now)
+
+    @property
+    def current(self) -> List[Match]:
+        return self.rounds[-1]
+
+    @property
+    def round_no(self) -> int:
+        return len(self.rounds)
+
+    def live_count(self) -> int:
+        return sum(1 for m in self.current if m.state == LIVE)
+
+    def _start_round(self, pairs: List[Tuple[int, Optional[int]]], now: float):
+        matches = [Match(a, b, self.need, now + self.timeout) for a, b in pairs]
+        self.rounds.append(matches)
+        self.by_player = {}
+        for m in matches:
+            if m.state == LIVE:
+                self.by_player[m.a] = m
+                self.by_player[m.b] = m
+        self.dirty = True
+        self._maybe_advance(now)
+
+    def _maybe_advance(self, now: float):
+        if any(m.state == LIVE for m in self.current):
+            return
+        winners = [m.winner for m in self.current]
+        if len(winners) == 1:
+            self.champion = winners[0]
+            self.by_player = {}
+            self.dirty = True
+            return
+        self._start_round(list(zip(winners[0::2], winners[1::2])), now)
+
+    def match_of(self, uid: int) -> Optional[Match]:
+        return self.by_player.get(uid)
+
+    def pick(self, uid: int, choice: str, now: Optional[float] = None) -> Tuple[Match, Optional[int]]:
+        """Route a pick; raises KeyError if uid has no live match."""
+        now = time.monotonic() if now is None else now
+        m = self.by_player[uid]
+        result = m.pick(uid, choice, now, self.timeout)
+        if result is not None:
+            self.dirty = True
+            if m.state == DONE:
+                self.by_player.pop(m.a, None)
+                self.by_player.pop(m.b, None)
+                self._maybe_advance(now)
+        return m, result
+
+    def expire(self, now: Optional[float] = None) -> List[Match]:
+        """Forfeit every live match past its deadline; returns the ones decided."""
+        now = time.monotonic() if now is None else now
+        decided = []
+        for m in self.current:
+            if m.state == LIVE and m.deadline <= now:
+                m.expire(self.rng)
+                self.by_player.pop(m.a, None)
+                self.by_player.pop(m.b, None)
+                decided.append(m)
+        if decided:
+            self.dirty = True
+            self._maybe_advance(now)
+        return decided
+
+    def forfeit_all(self) -> List[Match]:
+        """
+        End the tournament now (e.g. the view timed out): expire everything
+        until a champion exists. Returns every match decided this way.
+        """
+        decided = []
+        while self.champion is None:
+            for m in self.current:
+                if m.state == LIVE:
+                    m.deadline = 0.0
+            decided.extend(self.expire(float("inf")))
+        return decided
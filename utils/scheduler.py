@@ -0,0 +1,198 @@
+# utils/scheduler.py
+import asyncio
+import heapq
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from utils.common import STATE_DIR
+
+BATCH_WINDOW = 1.0     # entries due within this many seconds of each other fire together
+RETRY_AFTER = 60.0     # seconds before a failed action is tried again
+MAX_ATTEMPTS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    id        INTEGER PRIMARY KEY,
+    kind      TEXT    NOT NULL,
+    guild_id  INTEGER NOT NULL,
+    user_id   INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    due       REAL    NOT NULL,
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (kind, guild_id, user_id, target_id)
+);
+"""
+
+class Entry(NamedTuple):
+    id: int
+    kind: str          # e.g. "unjail"
+    guild_id: int
+    user_id: int
+    target_id: int     # e.g. the role to remove
+    due: float         # unix time
+    attempts: int
+
+# gets every entry that fell due together; returns the ones to try again later
+Handler = Callable[[List[Entry]], Awaitable[List[Entry]]]
+
+class Scheduler:
+    """
+    Timed actions that survive restarts. Entries live in SQLite and in a
+    min-heap keyed by due time; one waker task sleeps until the earliest
+    entry (or until something earlier is scheduled) and hands everything due
+    within BATCH_WINDOW to the handler in one call. On start() pending rows
+    are reloaded, so anything that fell due while the bot was down fires
+    straight away. Scheduling the same (kind, guild, user, target) again
+    replaces its due time.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scheduler")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._heap: List[Tuple[float, int]] = []
+        self._live: Dict[int, Entry] = {}   # id -> entry; heap items not in here (or with another due) are stale
+        self._handler: Optional[Handler] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.metrics = {"fired": 0, "batches": 0, "retried": 0, "dropped": 0}
+
+    # -- runs on the db thread ----------------------------------------------
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _load(self) -> List[Entry]:
+        cur = self._db().execute("SELECT id, kind, guild_id, user_id, target_id, due, attempts FROM pending")
+        return [Entry(*r) for r in cur]
+
+    def _upsert(self, kind: str, guild_id: int, user_id: int, target_id: int, due: float) -> Entry:
+        # read the row back in the same transaction rather than with RETURNING, which needs SQLite 3.35+
+        db = self._db()
+        key = (kind, guild_id, user_id, target_id)
+        db.execute("BEGIN")
+        try:
+            db.execute(
+                "INSERT INTO pending (kind, guild_id, user_id, target_id, due) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, guild_id, user_id, target_id) DO UPDATE SET due = excluded.due, attempts = 0",
+                (*key, due))
+            row = db.execute(
+                "SELECT id, kind, guild_id, user_id, target_id, due, attempts FROM pending "
+                "WHERE kind = ? AND guild_id = ? AND user_id = ? AND target_id = ?", key).fetchone()
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return Entry(*row)
+
+    def _settle(self, done: List[Entry], retry: List[Tuple[Entry, Entry]]):
+        # matching on the old due leaves alone anything re-scheduled while the batch ran
+        db = self._db()
+        db.execute("BEGIN")
+        try:
+            db.executemany("DELETE FROM pending WHERE id = ? AND due = ?", [(e.id, e.due) for e in done])
+            db.executemany("UPDATE pending SET due = ?, attempts = ? WHERE id = ? AND due = ?",
+                           [(new.due, new.attempts, old.id, old.due) for old, new in retry])
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _close_db(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # -- event loop side ----------------------------------------------------
+
+    def _push(self, e: Entry):
+        self._live[e.id] = e
+        heapq.heappush(self._heap, (e.due, e.id))
+
+    async def start(self, handler: Handler):
+        """Reload pending entries and start the waker; idempotent."""
+        self._handler = handler
+        if self._task is not None and not self._task.done():
+            return
+        for e in await self._run(self._load):
+            self._push(e)
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._waker())
+
+    async def schedule(self, kind: str, guild_id: int, user_id: int, target_id: int, due: float) -> Entry:
+        e = await self._run(self._upsert, kind, guild_id, user_id, target_id, due)
+        self._push(e)
+        if self._wake is not None and self._heap[0][1] == e.id:
+            self._wake.set()   # new earliest entry: re-arm the sleep
+        return e
+
+    def pending(self) -> int:
+        return len(self._live)
+
+    def _pop_due(self, now: float) -> List[Entry]:
+        due = []
+        while self._heap and self._heap[0][0] <= now + BATCH_WINDOW:
+            t, i = heapq.heappop(self._heap)
+            e = self._live.get(i)
+            if e is not None and e.due == t:
+                del self._live[i]
+                due.append(e)
+        return due
+
+    async def _waker(self):
+        while True:
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            if delay is None or delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            batch = self._pop_due(time.time())
+            if batch:
+                try:
+                    await self._fire(batch)
+                except Exception as e:
+                    print(f"[scheduler] batch of {len(batch)} failed: {e}")
+
+    async def _fire(self, batch: List[Entry]):
+        try:
+            failed = await self._handler(batch)
+        except Exception as e:
+            print(f"[scheduler] handler error: {e}")
+            failed = batch
+        failed_ids = {e.id for e in failed}
+        now = time.time()
+        retry = [(e, e._replace(due=now + RETRY_AFTER, attempts=e.attempts + 1))
+                 for e in failed if e.attempts + 1 < MAX_ATTEMPTS]
+        dropped = [e for e in failed if e.attempts + 1 >= MAX_ATTEMPTS]
+        done = [e for e in batch if e.id not in failed_ids]
+        await self._run(self._settle, done + dropped, retry)
+        for _, e in retry:
+            if e.id not in self._live:   # not re-scheduled meanwhile
+                self._push(e)
+        self.metrics["fired"] += len(done)
+        self.metrics["batches"] += 1
+        self.metrics["retried"] += len(retry)
+        self.metrics["dropped"] += len(dropped)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._run(self._close_db)
+
+SCHEDULER = Scheduler(STATE_DIR / "scheduler.sqlite3")
@@ -0,0 +1,101 @@
+# utils/shuffle_bag.py
+import base64
+import random
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from utils.common import load_json_state, save_json_state
+
+class ShuffleBag:
+    """
+    Draws every index in [0, n) once before any repeats. The permutation is
+    built lazily (one Fisher-Yates step per draw), so a draw is O(1) and
+    starting a new pass is just resetting the cursor.
+    """
+    __slots__ = ("perm", "pos", "used")
+
+    def __init__(self, n: int, perm: Optional[array] = None, pos: int = 0):
+        self.perm = perm if perm is not None else array("H" if n <= 0xFFFF else "I", range(n))
+        self.pos = pos
+        self.used = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.perm)
+
+    def draw(self, rng=random) -> int:
+        perm, n = self.perm, len(self.perm)
+        hi = n
+        if self.pos >= n:
+            # new pass: the last one ended on perm[n-1], keep it out of the first pick
+            self.pos = 0
+            if n > 1:
+                hi = n - 1
+        i = self.pos
+        j = rng.randrange(i, hi) if hi > i else i
+        perm[i], perm[j] = perm[j], perm[i]
+        self.pos = i + 1
+        self.used = time.monotonic()
+        return perm[i]
+
+class BagDealer:
+    """
+    One ShuffleBag per key (e.g. channel id). The caller passes the current
+    prompt count on each draw; a bag built for a different count (the pack
+    was reloaded, or the guild has extras) starts over. Bags idle for
+    `idle_ttl` seconds, or beyond `max_bags`, are dropped (least recently
+    used first). With `persist` set, bags survive restarts via state/<persist>.
+    """
+    def __init__(self, idle_ttl: float = 6 * 3600, max_bags: int = 10000,
+                 persist: Optional[str] = None, rng: Optional[random.Random] = None):
+        self.idle_ttl = idle_ttl
+        self.max_bags = max_bags
+        self.persist = persist
+        self.rng = rng or random.Random()
+        self.bags: "OrderedDict[int, ShuffleBag]" = OrderedDict()
+        self._draws = 0
+        if persist:
+            self.load()
+
+    def draw(self, key: int, size: int) -> int:
+        bag = self.bags.get(key)
+        if bag is None or len(bag) != size:
+            self.bags.pop(key, None)
+            bag = self.bags[key] = ShuffleBag(size)
+            if len(self.bags) > self.max_bags:
+                self.bags.popitem(last=False)
+        else:
+            self.bags.move_to_end(key)
+        self._draws += 1
+        if self._draws % 256 == 0:
+            self.evict_idle()
+        return bag.draw(self.rng)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Bags are kept in LRU order, so stale ones are all at the front."""
+        cutoff = (time.monotonic() if now is None else now) - self.idle_ttl
+        dropped = 0
+        while self.bags:
+            key, bag = next(iter(self.bags.items()))
+            if bag.used > cutoff:
+                break
+            del self.bags[key]
+            dropped += 1
+        return dropped
+
+    def save(self):
+        if not self.persist:
+            return
+        out: Dict[str, list] = {
+            str(k): [b.perm.typecode, base64.b64encode(b.perm.tobytes()).decode(), b.pos]
+            for k, b in self.bags.items()
+        }
+        save_json_state(self.persist, {"bags": out})
+
+    def load(self):
+        data = load_json_state(self.persist, {})
+        for k, (code, raw, pos) in data.get("bags", {}).items():
+            perm = array(code)
+            perm.frombytes(base64.b64decode(raw))
+            self.bags[int(k)] = ShuffleBag(len(perm), perm, pos)
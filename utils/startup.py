@@ -0,0 +1,140 @@
+# utils/startup.py
+import ast
+import asyncio
+import importlib
+import importlib.util
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+def module_imports(name: str) -> List[Tuple[str, List[str]]]:
+    """(module, from-names) an extension imports at top level, read from its source without running it."""
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return []
+    with open(spec.origin, "rb") as f:
+        tree = ast.parse(f.read(), spec.origin)
+    out = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            out.extend((a.name, []) for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            out.append((node.module, [a.name for a in node.names]))
+    return out
+
+def import_dependencies(name: str) -> float:
+    """
+    Import what `name` depends on, so loading the extension itself only
+    runs its own module body. Returns the seconds spent importing.
+    """
+    t = time.perf_counter()
+    for mod, names in module_imports(name):
+        module = sys.modules.get(mod) or importlib.import_module(mod)
+        for n in names:
+            # `from utils import trivia_api` names a submodule, not an attribute
+            if n != "*" and not hasattr(module, n):
+                try:
+                    importlib.import_module(f"{mod}.{n}")
+                except ModuleNotFoundError:
+                    pass
+    return time.perf_counter() - t
+
+class StartupTimeline:
+    """Per-extension import / load / warm-up times plus a few wall-clock marks, for the startup log."""
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.rows: Dict[str, Dict[str, float]] = {}
+        self.marks: List[Tuple[str, float]] = []
+
+    def record(self, name: str, phase: str, seconds: float):
+        row = self.rows.setdefault(name, {})
+        row[phase] = row.get(phase, 0.0) + seconds
+
+    def mark(self, label: str):
+        self.marks.append((label, time.perf_counter() - self.t0))
+
+    def report(self, warmups: Optional["Warmups"] = None) -> str:
+        lines = [f"{'extension':<22} {'import':>8} {'load':>8} {'warm-up':>10}"]
+        for name, row in self.rows.items():
+            warm = "-"
+            if warmups is not None:
+                states = [w for w in warmups.jobs.values() if w.owner == name]
+                if states:
+                    warm = " ".join(w.describe() for w in states)
+            lines.append(f"{name:<22} {row.get('import', 0) * 1000:>6.0f}ms {row.get('load', 0) * 1000:>6.0f}ms {warm:>10}")
+        lines.extend(f"  {label} at +{t * 1000:.0f}ms" for label, t in self.marks)
+        return "\n".join(lines)
+
+PENDING, READY, FAILED = "pending", "ready", "failed"
+
+class _Job:
+    __slots__ = ("name", "owner", "state", "seconds", "error", "event", "task")
+
+    def __init__(self, name: str, owner: Optional[str]):
+        self.name = name
+        self.owner = owner
+        self.state = PENDING
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+        self.event = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def describe(self) -> str:
+        if self.state == PENDING:
+            return f"{self.name}: running"
+        if self.state == FAILED:
+            return f"{self.name}: failed after {self.seconds * 1000:.0f}ms"
+        return f"{self.name}: {self.seconds * 1000:.0f}ms"
+
+class Warmups:
+    """
+    Background warm-ups (network fetches, caches) started from cog_load so
+    they don't hold up connecting. Each has a name a cog can check with
+    ready() or await with wait(); a failed warm-up counts as done, and the
+    cog falls back to whatever it does without that data.
+    """
+    def __init__(self):
+        self.jobs: Dict[str, _Job] = {}
+        self.on_done: Optional[Callable[[_Job], None]] = None
+
+    def start(self, name: str, fn: Callable[[], Awaitable], owner: Optional[str] = None):
+        job = self.jobs.get(name)
+        if job is not None and job.state == PENDING:
+            return
+        job = self.jobs[name] = _Job(name, owner)
+        job.task = asyncio.get_running_loop().create_task(self._run(job, fn))
+
+    async def _run(self, job: _Job, fn: Callable[[], Awaitable]):
+        t = time.perf_counter()
+        try:
+            await fn()
+            job.state = READY
+        except Exception as e:
+            job.state, job.error = FAILED, str(e)
+            print(f"[startup] warm-up {job.name} failed: {e}")
+        finally:
+            job.seconds = time.perf_counter() - t
+            job.event.set()
+            if self.on_done is not None:
+                self.on_done(job)
+
+    def ready(self, name: str) -> bool:
+        job = self.jobs.get(name)
+        return job is not None and job.state == READY
+
+    async def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """True once the warm-up succeeded; False on failure, timeout, or if it was never started."""
+        job = self.jobs.get(name)
+        if job is None:
+            return False
+        try:
+            await asyncio.wait_for(job.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return job.state == READY
+
+    def pending(self) -> List[str]:
+        return [n for n, j in self.jobs.items() if j.state == PENDING]
+
+TIMELINE = StartupTimeline()
+WARMUPS = Warmups()
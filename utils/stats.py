@@ -0,0 +1,221 @@
+# utils/stats.py
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from utils.common import STATE_DIR
+
+GLOBAL = 0          # guild_id used for the cross-server rows
+ALL_GAMES = "all"   # game used for the cross-game rows
+
+FLUSH_EVERY = 2.0   # seconds between write-behind flushes
+FLUSH_AT = 500      # flush early once this many results are queued
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id       INTEGER PRIMARY KEY,
+    ts       INTEGER NOT NULL,
+    game     TEXT    NOT NULL,
+    guild_id INTEGER NOT NULL,
+    user_id  INTEGER NOT NULL,
+    points   INTEGER NOT NULL,
+    outcome  INTEGER
+);
+CREATE TABLE IF NOT EXISTS totals (
+    game     TEXT    NOT NULL,
+    guild_id INTEGER NOT NULL,
+    user_id  INTEGER NOT NULL,
+    points   INTEGER NOT NULL DEFAULT 0,
+    wins     INTEGER NOT NULL DEFAULT 0,
+    draws    INTEGER NOT NULL DEFAULT 0,
+    losses   INTEGER NOT NULL DEFAULT 0,
+    played   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (game, guild_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS totals_rank ON totals (game, guild_id, points DESC, wins DESC);
+"""
+
+_UPSERT = """
+INSERT INTO totals (game, guild_id, user_id, points, wins, draws, losses, played)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (game, guild_id, user_id) DO UPDATE SET
+    points = points + excluded.points,
+    wins   = wins   + excluded.wins,
+    draws  = draws  + excluded.draws,
+    losses = losses + excluded.losses,
+    played = played + excluded.played
+"""
+
+class Result(NamedTuple):
+    ts: int
+    game: str
+    guild_id: int
+    user_id: int
+    points: int
+    outcome: Optional[int]   # 1 win, 0 draw, -1 loss, None = just played
+
+class Row(NamedTuple):
+    user_id: int
+    points: int
+    wins: int
+    draws: int
+    losses: int
+    played: int
+
+class StatsStore:
+    """
+    Game results in SQLite (WAL). record() only appends to an in-memory
+    queue; a background task hands batches to a single writer thread, which
+    folds them into the per-(game, guild, user) totals in one transaction.
+    Every result also counts toward the server-wide (GLOBAL) and cross-game
+    (ALL_GAMES) rows, so leaderboards are plain index range reads.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self._queue: List[Result] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.metrics = {"recorded": 0, "flushed": 0, "batches": 0, "last_flush_ms": 0.0}
+
+    # -- runs on the writer thread ------------------------------------------
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-65536")   # 64 MiB: keeps the hot index pages resident
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def write_batch(self, batch: List[Result]):
+        # pre-aggregate so a user's many results in one batch cost one upsert per row key
+        agg: Dict[Tuple[str, int, int], List[int]] = {}
+        for r in batch:
+            w, d, l = r.outcome == 1, r.outcome == 0, r.outcome == -1
+            for game in (r.game, ALL_GAMES):
+                for guild in {r.guild_id, GLOBAL}:
+                    a = agg.get((game, guild, r.user_id))
+                    if a is None:
+                        a = agg[(game, guild, r.user_id)] = [0, 0, 0, 0, 0]
+                    a[0] += r.points
+                    a[1] += w
+                    a[2] += d
+                    a[3] += l
+                    a[4] += 1
+        db = self._db()
+        db.execute("BEGIN")
+        try:
+            db.executemany("INSERT INTO results (ts, game, guild_id, user_id, points, outcome) VALUES (?, ?, ?, ?, ?, ?)", batch)
+            # key order walks the primary-key B-tree sequentially instead of at random
+            db.executemany(_UPSERT, [(*k, *agg[k]) for k in sorted(agg)])
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def top(self, game: str, guild_id: int, limit: int = 10) -> List[Row]:
+        cur = self._db().execute(
+            "SELECT user_id, points, wins, draws, losses, played FROM totals "
+            "WHERE game = ? AND guild_id = ? ORDER BY points DESC, wins DESC LIMIT ?",
+            (game, guild_id, limit))
+        return [Row(*r) for r in cur]
+
+    def rank(self, game: str, guild_id: int, user_id: int) -> Optional[Tuple[int, Row]]:
+        """1-based rank by (points, wins), counted over the index range above the user."""
+        db = self._db()
+        r = db.execute("SELECT user_id, points, wins, draws, losses, played FROM totals "
+                       "WHERE game = ? AND guild_id = ? AND user_id = ?", (game, guild_id, user_id)).fetchone()
+        if r is None:
+            return None
+        row = Row(*r)
+        above = db.execute("SELECT COUNT(*) FROM totals WHERE game = ? AND guild_id = ? AND points > ?",
+                           (game, guild_id, row.points)).fetchone()[0]
+        above += db.execute("SELECT COUNT(*) FROM totals WHERE game = ? AND guild_id = ? AND points = ? AND wins > ?",
+                            (game, guild_id, row.points, row.wins)).fetchone()[0]
+        return above + 1, row
+
+    def close_db(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # -- event loop side ----------------------------------------------------
+
+    def record(self, game: str, guild_id: Optional[int], user_id: int, points: int = 0, outcome: Optional[int] = None):
+        """Queue one result; never touches the database on the caller's path."""
+        self._queue.append(Result(int(time.time()), game, guild_id or GLOBAL, user_id, int(points), outcome))
+        self.metrics["recorded"] += 1
+        self._ensure_task()
+        if len(self._queue) >= FLUSH_AT:
+            self._wake.set()
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._flusher())
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), FLUSH_EVERY)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[stats] flush failed: {e}")
+
+    async def flush(self):
+        if not self._queue:
+            return
+        batch, self._queue = self._queue, []
+        t = time.perf_counter()
+        try:
+            await self._run(self.write_batch, batch)
+        except Exception:
+            self._queue[:0] = batch   # keep them for the next attempt
+            raise
+        self.metrics["flushed"] += len(batch)
+        self.metrics["batches"] += 1
+        self.metrics["last_flush_ms"] = (time.perf_counter() - t) * 1000
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def leaderboard(self, game: str, guild_id: int, limit: int = 10) -> List[Row]:
+        await self.flush()
+        return await self._run(self.top, game, guild_id, limit)
+
+    async def rank_of(self, game: str, guild_id: int, user_id: int) -> Optional[Tuple[int, Row]]:
+        await self.flush()
+        return await self._run(self.rank, game, guild_id, user_id)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        finally:
+            await self._run(self.close_db)
+
+STATS = StatsStore(STATE_DIR / "stats.sqlite3")
+
+def record_scores(game: str, guild_id: Optional[int], scores: Dict[int, int]):
+    """Points games: everyone keeps their points; with 2+ players the top score(s) win, the rest lose."""
+    if not scores:
+        return
+    best = max(scores.values())
+    multi = len(scores) > 1
+    for uid, pts in scores.items():
+        outcome = (1 if pts == best else -1) if multi else None
+        STATS.record(game, guild_id, uid, pts, outcome)
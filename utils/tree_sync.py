@@ -0,0 +1,60 @@
+# utils/tree_sync.py
+import hashlib
+import json
+import time
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from utils.common import load_json_state, save_json_state
+
+STATE_FILE = "command_tree.json"
+
+def tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Hash of exactly what sync() would upload for `guild` (None = global commands)."""
+    payload = sorted((cmd.to_dict(tree) for cmd in tree.get_commands(guild=guild)),
+                     key=lambda d: (d.get("type", 1), d["name"]))
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+async def sync_tree(tree: app_commands.CommandTree, app_id: int, dev_guild_id: Optional[int] = None,
+                    force: bool = False) -> str:
+    """
+    Upload the command tree only if it differs from the last successful
+    sync recorded in state/command_tree.json. With dev_guild_id set, the
+    global commands are copied into that guild and synced there instead,
+    which Discord applies instantly, and the application's global set is
+    cleared (once) so the guild doesn't list every command twice. The next
+    run without dev_guild_id sees the global hash changed and re-uploads.
+    The hash only covers the local tree: commands deleted on Discord's side
+    come back only with force. Returns a line for the startup log.
+    """
+    state = load_json_state(STATE_FILE, {})
+    guild = discord.Object(id=dev_guild_id) if dev_guild_id else None
+    lines = []
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+        global_key = f"{app_id}:global"
+        tree.clear_commands(guild=None)
+        empty = tree_hash(tree)
+        if force or state.get(global_key, {}).get("hash") != empty:
+            await tree.sync()
+            state[global_key] = {"hash": empty, "seconds": 0.0, "at": int(time.time())}
+            save_json_state(STATE_FILE, state)
+            lines.append("Cleared global commands (dev guild mode)")
+    key = f"{app_id}:{dev_guild_id or 'global'}"
+    where = f"guild {dev_guild_id}" if guild else "global"
+    digest = tree_hash(tree, guild)
+    last = state.get(key, {})
+    if not force and last.get("hash") == digest:
+        lines.append(f"Command tree unchanged ({where}, {digest[:12]}), skipped sync; "
+                     f"saved ~{last.get('seconds', 0.0):.2f}s (FORCE_SYNC=1 restores commands deleted on Discord's side)")
+        return "\n".join(lines)
+    t = time.perf_counter()
+    synced = await tree.sync(guild=guild)
+    seconds = time.perf_counter() - t
+    state[key] = {"hash": digest, "seconds": round(seconds, 3), "at": int(time.time())}
+    save_json_state(STATE_FILE, state)
+    lines.append(f"Synced {len(synced)} commands ({where}, {digest[:12]}) in {seconds:.2f}s")
+    return "\n".join(lines)
@@ -0,0 +1,156 @@
+# utils/ttt_engine.py
+import random
+from typing import Dict, List, Optional, Tuple
+
+# Cells are bits 0..8 (row-major). Each side is a 9-bit int.
+T3_WIN = [(0,1,2),(3,4,5),(6,7,8),(0,3,6),(1,4,7),(2,5,8),(0,4,8),(2,4,6)]
+WIN_MASKS = tuple(sum(1 << i for i in line) for line in T3_WIN)
+FULL = (1 << 9) - 1
+
+# WIN_TABLE[bits] == 1 iff that set of cells contains a line: a win check is one index.
+WIN_TABLE = bytes(any(b & m == m for m in WIN_MASKS) for b in range(1 << 9))
+
+def is_win(bits: int) -> bool:
+    return WIN_TABLE[bits] == 1
+
+def legal_moves(x: int, o: int) -> List[int]:
+    free = ~(x | o) & FULL
+    return [i for i in range(9) if free >> i & 1]
+
+def x_to_move(x: int, o: int) -> bool:
+    return bin(x).count("1") == bin(o).count("1")
+
+# --- solved game -----------------------------------------------------------
+# Negamax over every reachable position, run once at import (~5.5k states).
+# Scores are from the side to move: win > draw(0) > loss, faster wins score higher.
+
+_SCORES: Dict[int, int] = {}
+BEST_MOVES: Dict[int, Tuple[int, ...]] = {}   # (x | o << 9) -> optimal moves
+
+def _key(x: int, o: int) -> int:
+    return x | (o << 9)
+
+def _solve(me: int, opp: int, me_is_x: bool) -> int:
+    x, o = (me, opp) if me_is_x else (opp, me)
+    k = _key(x, o)
+    if k in _SCORES:
+        return _SCORES[k]
+    empties = 9 - bin(me | opp).count("1")
+    if is_win(opp):
+        score = -(empties + 1)
+    elif empties == 0:
+        score = 0
+    else:
+        best, moves = None, []
+        free = ~(me | opp) & FULL
+        for i in range(9):
+            if free >> i & 1:
+                s = -_solve(opp, me | (1 << i), not me_is_x)
+                if best is None or s > best:
+                    best, moves = s, [i]
+                elif s == best:
+                    moves.append(i)
+        score = best
+        BEST_MOVES[k] = tuple(moves)
+    _SCORES[k] = score
+    return score
+
+_solve(0, 0, True)
+
+def best_move(x: int, o: int, rng: Optional[random.Random] = None) -> int:
+    """Optimal move for the side to move; ties broken at random for variety."""
+    moves = BEST_MOVES[_key(x, o)]
+    return (rng or random).choice(moves) if len(moves) > 1 else moves[0]
+
+def position_score(x: int, o: int) -> int:
+    return _SCORES[_key(x, o)]
+
+# --- N×N, k-in-a-row -------------------------------------------------------
+
+_DIRS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+class Board:
+    """
+    size×size board (3..5, Discord allows 25 buttons) where k in a row wins.
+    Only lines through the last move are checked (O(k)), and a move counter
+    detects draws.
+    """
+    __slots__ = ("size", "k", "x", "o", "moves", "full", "winner")
+
+    def __init__(self, size: int = 3, k: int = 3):
+        if not 3 <= size <= 5 or not 3 <= k <= size:
+            raise ValueError("size must be 3-5 and 3 <= k <= size")
+        self.size = size
+        self.k = k
+        self.x = 0
+        self.o = 0
+        self.moves = 0
+        self.full = size * size
+        self.winner: Optional[str] = None   # 'X' / 'O' once someone wins
+
+    def x_to_move(self) -> bool:
+        return self.moves % 2 == 0
+
+    def taken(self, idx: int) -> bool:
+        return bool((self.x | self.o) >> idx & 1)
+
+    def mark(self, idx: int) -> str:
+        if self.x >> idx & 1: return 'X'
+        if self.o >> idx & 1: return 'O'
+        return ' '
+
+    def is_draw(self) -> bool:
+        return self.winner is None and self.moves == self.full
+
+    def is_over(self) -> bool:
+        return self.winner is not None or self.moves == self.full
+
+    def _line_through(self, bits: int, idx: int) -> bool:
+        n, k = self.size, self.k
+        r, c = divmod(idx, n)
+        for dr, dc in _DIRS:
+            count = 1
+            for sgn in (1, -1):
+                rr, cc = r + dr * sgn, c + dc * sgn
+                while count < k and 0 <= rr < n and 0 <= cc < n and bits >> (rr * n + cc) & 1:
+                    count += 1
+                    rr += dr * sgn
+                    cc += dc * sgn
+            if count >= k:
+                return True
+        return False
+
+    def play(self, idx: int) -> bool:
+        """Place the mark of the side to move; returns True if it wins."""
+        if self.taken(idx) or self.is_over():
+            raise ValueError("illegal move")
+        bit = 1 << idx
+        if self.x_to_move():
+            self.x |= bit
+            won, mark = self._line_through(self.x, idx), 'X'
+        else:
+            self.o |= bit
+            won, mark = self._line_through(self.o, idx), 'O'
+        self.moves += 1
+        if won:
+            self.winner = mark
+        return won
+
+    def free_cells(self) -> List[int]:
+        occ = self.x | self.o
+        return [i for i in range(self.full) if not occ >> i & 1]
+
+    def bot_move(self, rng: Optional[random.Random] = None) -> int:
+        """Perfect play on 3×3 (solved table); win/block/centre heuristic otherwise."""
+        if self.size == 3 and self.k == 3:
+            return best_move(self.x, self.o, rng)
+        me, opp = (self.x, self.o) if self.x_to_move() else (self.o, self.x)
+        free = self.free_cells()
+        for bits in (me, opp):  # take a win, else block one
+            for i in free:
+                if self._line_through(bits | (1 << i), i):
+                    return i
+        mid = (self.size - 1) / 2
+        dist = lambda i: abs(i // self.size - mid) + abs(i % self.size - mid)
+        best = min(dist(i) for i in free)
+        return (rng or random).choice([i for i in free if dist(i) == best])
@@ -0,0 +1,102 @@
+# utils/webhooks.py
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+import discord
+
+POOL_NAME = "Mega Bot clone"       # the webhooks this pool owns; any per-message username/avatar goes on top
+MAX_PER_CHANNEL = 15               # Discord's webhook cap per channel
+IDLE_TTL = 3600.0                  # seconds unused before a pooled webhook is deleted
+MAX_CACHED = 1000
+
+class WebhookCapReached(Exception):
+    pass
+
+WebhookChannel = Union[discord.TextChannel, discord.VoiceChannel, discord.StageChannel, discord.ForumChannel]
+
+class WebhookPool:
+    """
+    One webhook per channel, reused for every clone in it regardless of who
+    is being cloned (username and avatar are set per message), so a clone is
+    a single execute call instead of create + send + delete. Webhooks are
+    created lazily, adopted if a previous run left one behind, dropped and
+    recreated when Discord says they're gone (404), and deleted after
+    IDLE_TTL without use.
+    """
+    def __init__(self, idle_ttl: float = IDLE_TTL, max_cached: int = MAX_CACHED):
+        self.idle_ttl = idle_ttl
+        self.max_cached = max_cached
+        self._hooks: "OrderedDict[int, Tuple[discord.Webhook, float]]" = OrderedDict()
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self.metrics = {"hits": 0, "created": 0, "adopted": 0, "evicted": 0}
+
+    async def _acquire(self, channel: WebhookChannel, me: discord.abc.Snowflake) -> discord.Webhook:
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:   # concurrent clones in a new channel create one webhook, not several
+            cached = self._hooks.get(channel.id)
+            if cached is not None:
+                return cached[0]
+            existing = await channel.webhooks()
+            hook = next((w for w in existing if w.name == POOL_NAME and w.token and w.user and w.user.id == me.id), None)
+            if hook is not None:
+                self.metrics["adopted"] += 1
+            else:
+                if len(existing) >= MAX_PER_CHANNEL:
+                    raise WebhookCapReached(f"{channel.mention} already has {MAX_PER_CHANNEL} webhooks")
+                hook = await channel.create_webhook(name=POOL_NAME, reason="clone webhook pool")
+                self.metrics["created"] += 1
+            self._hooks[channel.id] = (hook, time.monotonic())
+            if len(self._hooks) > self.max_cached:
+                self._hooks.popitem(last=False)   # forgotten, not deleted: adopted again next time
+            return hook
+
+    async def get(self, channel: WebhookChannel, me: discord.abc.Snowflake) -> discord.Webhook:
+        cached = self._hooks.get(channel.id)
+        if cached is not None:
+            self.metrics["hits"] += 1
+            self._hooks[channel.id] = (cached[0], time.monotonic())
+            self._hooks.move_to_end(channel.id)
+            return cached[0]
+        return await self._acquire(channel, me)
+
+    def forget(self, channel_id: int):
+        if self._hooks.pop(channel_id, None) is not None:
+            self.metrics["evicted"] += 1
+
+    async def send(self, channel: Union[WebhookChannel, discord.Thread], me: discord.abc.Snowflake, **kwargs) -> None:
+        """webhook.send into `channel` (threads go through their parent's webhook); retries once on a 404."""
+        thread = channel if isinstance(channel, discord.Thread) else discord.utils.MISSING
+        parent = channel.parent if isinstance(channel, discord.Thread) else channel
+        for attempt in range(2):
+            hook = await self.get(parent, me)
+            try:
+                await hook.send(thread=thread, **kwargs)
+                return
+            except discord.NotFound:
+                # deleted from under us (or the token was reset): make a fresh one
+                self.forget(parent.id)
+                if attempt:
+                    raise
+
+    async def evict_idle(self, now: Optional[float] = None) -> int:
+        """Delete webhooks unused for idle_ttl; they're in LRU order, so stale ones are at the front."""
+        cutoff = (time.monotonic() if now is None else now) - self.idle_ttl
+        stale = []
+        while self._hooks:
+            channel_id, (hook, used) = next(iter(self._hooks.items()))
+            if used > cutoff:
+                break
+            del self._hooks[channel_id]
+            lock = self._locks.get(channel_id)
+            if lock is not None and not lock.locked():
+                del self._locks[channel_id]
+            stale.append(hook)
+        for hook in stale:
+            try:
+                await hook.delete(reason="clone webhook idle")
+            except discord.HTTPException:
+                pass
+        self.metrics["evicted"] += len(stale)
+        return len(stale)